@@ -0,0 +1,348 @@
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+
+def _formato(ruta, formato):
+    if formato is not None:
+        return formato
+    return 'parquet' if os.path.splitext(ruta)[1].lower() in ('.parquet', '.pq') else 'csv'
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("El formato Parquet requiere pyarrow (pip install pyarrow)") from error
+    return pyarrow
+
+
+class EscritorCSV:
+    """Escribe bloques de columnas (dict de arreglos) al final de un CSV"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.columnas = None
+        self.filas = 0
+        self._archivo = open(ruta, 'w', newline='', encoding='utf-8')
+        self._escritor = csv.writer(self._archivo)
+
+    def escribir(self, bloque):
+        if self.columnas is None:
+            self.columnas = list(bloque)
+            self._escritor.writerow(self.columnas)
+        columnas = [np.asarray(bloque[c]).tolist() for c in self.columnas]
+        self._escritor.writerows(zip(*columnas))
+        self.filas += len(columnas[0]) if columnas else 0
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+class EscritorParquet:
+    """
+    Escribe bloques de columnas como grupos de filas de un archivo Parquet
+
+    `esquema` fija el tipo de las columnas al abrir el escritor (tipos de
+    pyarrow o alias como 'float64'); las demás toman el tipo del primer bloque.
+    Cada bloque se convierte a ese esquema, así un bloque con una columna toda
+    vacía o con otro tipo inferido no choca con el archivo.
+    """
+
+    def __init__(self, ruta, esquema=None):
+        self.ruta = ruta
+        self.filas = 0
+        self._pa = _importar_pyarrow()
+        self._tipos = {
+            nombre: tipo if isinstance(tipo, self._pa.DataType) else self._pa.type_for_alias(tipo)
+            for nombre, tipo in (esquema or {}).items()
+        }
+        self._esquema = None
+        self._escritor = None
+
+    def _columna(self, valores, tipo):
+        columna = self._pa.array(np.asarray(valores))
+        if tipo is None or columna.type == tipo:
+            return columna
+        # NaN como nulo para poder pasar, p. ej., de double a int64 o string
+        return self._pa.array(np.asarray(valores), from_pandas=True).cast(tipo)
+
+    def escribir(self, bloque):
+        if self._esquema is None:
+            tabla = self._pa.table({nombre: self._columna(valores, self._tipos.get(nombre))
+                                    for nombre, valores in bloque.items()})
+            self._esquema = tabla.schema
+            self._escritor = self._pa.parquet.ParquetWriter(self.ruta, self._esquema)
+        else:
+            tabla = self._pa.table(
+                [self._columna(bloque[campo.name], campo.type) for campo in self._esquema],
+                schema=self._esquema
+            )
+        self._escritor.write_table(tabla)
+        self.filas += tabla.num_rows
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def abrir_escritor(ruta, formato=None, esquema=None):
+    """Escritor incremental según la extensión (.parquet/.pq o CSV); `esquema` sólo aplica a Parquet"""
+    if _formato(ruta, formato) == 'parquet':
+        return EscritorParquet(ruta, esquema)
+    return EscritorCSV(ruta)
+
+
+def esquema_entrada(ruta, formato=None):
+    """
+    Tipos de las columnas de un archivo de entrada, para fijar el esquema de salida
+
+    Returns:
+        dict: Nombre -> tipo de pyarrow para Parquet, o 'string' para cada
+            columna de un CSV (el texto no tiene un tipo fijo entre bloques)
+    """
+    if _formato(ruta, formato) == 'parquet':
+        pa = _importar_pyarrow()
+        return {campo.name: campo.type for campo in pa.parquet.ParquetFile(ruta).schema_arrow}
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        return {nombre: 'string' for nombre in next(csv.reader(archivo), [])}
+
+
+def _convertir_columna(valores):
+    """Convierte una columna de texto a enteros o reales cuando es posible"""
+    columna = np.asarray(valores)
+    for tipo in (np.int64, np.float64):
+        try:
+            return columna.astype(tipo)
+        except ValueError:
+            continue
+    return columna
+
+
+def leer_bloques(ruta, tam_bloque=100_000, formato=None, columnas=None):
+    """
+    Lee un CSV o Parquet bloque a bloque sin cargarlo completo
+
+    Yields:
+        dict: Columnas del bloque como arreglos NumPy
+    """
+    if _formato(ruta, formato) == 'parquet':
+        pa = _importar_pyarrow()
+        archivo = pa.parquet.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=tam_bloque, columns=columnas):
+            yield {nombre: lote.column(nombre).to_numpy(zero_copy_only=False)
+                   for nombre in lote.schema.names}
+        return
+
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        lector = csv.reader(archivo)
+        encabezado = next(lector, None)
+        if encabezado is None:
+            return
+        indices = [encabezado.index(c) for c in columnas] if columnas else range(len(encabezado))
+        nombres = [encabezado[i] for i in indices]
+
+        filas = []
+        for fila in lector:
+            filas.append(fila)
+            if len(filas) == tam_bloque:
+                yield _bloque_desde_filas(filas, nombres, indices)
+                filas = []
+        if filas:
+            yield _bloque_desde_filas(filas, nombres, indices)
+
+
+def _bloque_desde_filas(filas, nombres, indices):
+    columnas = list(zip(*filas))
+    return {nombre: _convertir_columna(columnas[i]) for nombre, i in zip(nombres, indices)}
+
+
+# Número con separador de miles ',' y decimal '.', p. ej. "$1,234.56" o "-1,000"
+_MILES = re.compile(r'-?\$?-?\d{1,3}(,\d{3})+(\.\d*)?')
+
+
+def _numero_flujo(campo):
+    """Convierte un campo a float quitando '$', espacios y separadores de miles"""
+    campo = campo.strip().replace('$', '').replace(' ', '')
+    if ',' in campo:
+        if not _MILES.fullmatch(campo):
+            raise ValueError(campo)
+        campo = campo.replace(',', '')
+    return float(campo)
+
+
+def _es_numero(campo):
+    try:
+        _numero_flujo(campo)
+    except ValueError:
+        return False
+    return True
+
+
+def _es_encabezado(linea):
+    return not _es_numero(linea) and not all(_es_numero(campo) for campo in re.split('[;\t,]', linea))
+
+
+def _separador_columnas(lineas, encabezado):
+    """
+    Separador de columnas del texto completo, o None si es una sola columna
+
+    La ',' sólo separa columnas si no puede ser separador de miles: cuando un
+    encabezado tiene las mismas comas que cada línea de datos, o cuando alguna
+    línea no es un número con miles y todas tienen la misma cantidad de comas.
+    En cualquier otro caso con comas ambiguas se rechaza el texto.
+    """
+    for separador in (';', '\t'):
+        if any(separador in linea for linea in lineas):
+            return separador
+
+    comas = {linea.count(',') for linea in lineas}
+    if comas == {0}:
+        return None
+    datos = lineas[1:] if encabezado else lineas
+    if encabezado and ',' in lineas[0]:
+        if {linea.count(',') for linea in datos} <= {lineas[0].count(',')}:
+            return ','
+    elif all(_es_numero(linea) for linea in datos):
+        return None
+    elif len(comas) == 1:
+        return ','
+    raise ValueError("No se puede distinguir si ',' separa columnas o miles: "
+                     "use ';' o tabulador entre columnas")
+
+
+def leer_columna_flujos(texto):
+    """
+    Flujos de caja desde una columna pegada o un archivo de texto
+
+    Acepta un valor por línea (copiado de una hoja de cálculo) o un CSV con
+    varias columnas, del que se toma la última. Las columnas se separan con
+    ';', tabulador o ','; el separador decimal es el punto y los valores
+    pueden llevar '$' y ',' como separador de miles ("$1,000.00"). Una
+    primera línea no numérica se toma como encabezado.
+
+    Returns:
+        np.ndarray: Flujos como float64
+
+    Raises:
+        ValueError: Si una línea que no es el encabezado no es numérica, o si
+            no se puede saber si la ',' separa columnas o miles
+    """
+    lineas = [(numero, linea.strip()) for numero, linea in enumerate(texto.splitlines(), 1) if linea.strip()]
+    if not lineas:
+        return np.empty(0)
+    encabezado = _es_encabezado(lineas[0][1])
+    separador = _separador_columnas([linea for _, linea in lineas], encabezado)
+
+    valores = []
+    for numero, linea in lineas[1:] if encabezado else lineas:
+        campo = linea.split(separador)[-1] if separador else linea
+        try:
+            valores.append(_numero_flujo(campo))
+        except ValueError:
+            raise ValueError(f"Línea {numero}: '{linea}' no es un número") from None
+    return np.asarray(valores, dtype=float)
+
+
+ARCHIVO_METADATOS = 'metadatos.json'
+
+
+def crear_resultados_mapeados(directorio, campos, metadatos=None):
+    """
+    Crea arreglos .npy respaldados por archivos (numpy.memmap) para resultados grandes
+
+    Args:
+        directorio (str): Carpeta donde se guardan los arreglos
+        campos (dict): nombre -> (forma, dtype)
+        metadatos (dict): Datos adicionales de la simulación (serializables a JSON)
+
+    Returns:
+        dict: nombre -> arreglo mapeado en modo escritura
+    """
+    os.makedirs(directorio, exist_ok=True)
+    arreglos = {}
+    for nombre, (forma, tipo) in campos.items():
+        arreglos[nombre] = np.lib.format.open_memmap(
+            os.path.join(directorio, f"{nombre}.npy"), mode='w+', dtype=tipo, shape=tuple(forma)
+        )
+
+    with open(os.path.join(directorio, ARCHIVO_METADATOS), 'w', encoding='utf-8') as archivo:
+        json.dump({
+            'campos': {nombre: {'forma': list(a.shape), 'dtype': a.dtype.str} for nombre, a in arreglos.items()},
+            **(metadatos or {})
+        }, archivo, indent=2, default=str)
+    return arreglos
+
+
+def leer_metadatos(directorio):
+    with open(os.path.join(directorio, ARCHIVO_METADATOS), encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def abrir_resultados(directorio, modo='r'):
+    """
+    Reabre sin copiar los arreglos guardados por crear_resultados_mapeados
+
+    Returns:
+        dict: nombre -> arreglo mapeado (sólo lectura por defecto)
+    """
+    return {
+        nombre: np.load(os.path.join(directorio, f"{nombre}.npy"), mmap_mode=modo)
+        for nombre in leer_metadatos(directorio)['campos']
+    }
+
+
+def histograma_por_bloques(arreglo, bins=50, rango=None, tam_bloque=10_000_000):
+    """
+    Histograma de un arreglo (posiblemente mapeado) leyendo un bloque a la vez
+
+    Returns:
+        tuple: (conteos, bordes) como numpy.histogram
+    """
+    arreglo = arreglo.reshape(-1)
+    if rango is None:
+        minimo, maximo = np.inf, -np.inf
+        for inicio in range(0, len(arreglo), tam_bloque):
+            bloque = arreglo[inicio:inicio + tam_bloque]
+            bloque = bloque[np.isfinite(bloque)]
+            if len(bloque):
+                minimo, maximo = min(minimo, bloque.min()), max(maximo, bloque.max())
+        rango = (minimo, maximo) if minimo <= maximo else (0.0, 1.0)
+
+    bordes = np.histogram_bin_edges([], bins=bins, range=rango)
+    conteos = np.zeros(len(bordes) - 1, dtype=np.int64)
+    for inicio in range(0, len(arreglo), tam_bloque):
+        bloque = arreglo[inicio:inicio + tam_bloque]
+        conteos += np.histogram(bloque[np.isfinite(bloque)], bins=bordes)[0]
+    return conteos, bordes
+
+
+def percentiles_por_bloques(arreglo, percentiles, bins=200_000, tam_bloque=10_000_000):
+    """
+    Percentiles aproximados de un arreglo grande a partir de un histograma fino
+
+    El error es a lo sumo el ancho de un intervalo del histograma
+    ((máximo - mínimo) / bins).
+    """
+    conteos, bordes = histograma_por_bloques(arreglo, bins=bins, tam_bloque=tam_bloque)
+    acumulado = np.cumsum(conteos)
+    if acumulado[-1] == 0:
+        return np.full(len(percentiles), np.nan)
+    objetivo = np.asarray(percentiles, dtype=float) / 100 * acumulado[-1]
+    return np.interp(objetivo, np.concatenate(([0], acumulado)), bordes)
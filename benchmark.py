@@ -0,0 +1,314 @@
+"""
+Benchmarks reproducibles de los cálculos de VAN/TIR y del simulador de proyectos
+
+Cada caso se mide a varias escalas con semillas fijas y el resultado se guarda
+como JSON para comparar contra una corrida anterior.
+
+Uso:
+    python benchmark.py --salida base.json                  # escala rápida
+    python benchmark.py --escala completa --salida nuevo.json
+    python benchmark.py --comparar base.json nuevo.json --tolerancia 0.15
+    python benchmark.py --filtro tir --escala completa      # sólo casos que contienen "tir"
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from finanzas import (ModeloVanIncremental, calcular_tir, calcular_tir_lote, calcular_van, calcular_van_lote,
+                      tasa_periodica)
+from simulador import SimuladorProyectos
+
+SEMILLA = 12345
+TASAS_SENSIBILIDAD = np.arange(0.01, 0.30, 0.01)  # Mismas tasas de prueba que van.main
+
+# Tamaños por escala: períodos o proyectos según el caso, y meses simulados
+ESCALAS = {
+    'rapida': {
+        'periodos': (5, 100, 10_000),
+        'proyectos': (5, 1_000, 10_000),
+        'meses': (1, 1_000, 10_000)
+    },
+    'completa': {
+        'periodos': (5, 100, 10_000, 100_000),
+        'proyectos': (5, 1_000, 10_000, 100_000),
+        'meses': (1, 1_000, 100_000, 1_000_000)
+    }
+}
+
+
+def _flujos(rng, n):
+    return rng.normal(25_000, 10_000, n).round(2).tolist()
+
+
+def _simulador(n_proyectos, semilla):
+    simulador = SimuladorProyectos()
+    simulador.generar_proyectos(n_proyectos, semilla=semilla)
+    return simulador
+
+
+# Cada caso: (nombre, dimensión de ESCALAS, preparar(tamaño, rng) -> función sin argumentos)
+def _van(n, rng):
+    flujos = _flujos(rng, n)
+    periodos = list(range(1, n + 1))
+    return lambda: calcular_van(100_000, flujos, 0.1, periodos)
+
+
+def _van_lote(n, rng):
+    flujos = rng.normal(25_000, 10_000, (n, 10))
+    tasas = rng.uniform(0.05, 0.2, n)
+    return lambda: calcular_van_lote(100_000, flujos, tasas)
+
+
+def _tir(n, rng):
+    flujos = _flujos(rng, n)
+    return lambda: calcular_tir(100_000, flujos)
+
+
+def _tir_lote(n, rng):
+    flujos = rng.normal(25_000, 10_000, (n, 10))
+    return lambda: calcular_tir_lote(100_000, flujos)
+
+
+def _modelo_sensibilidad(n, rng):
+    """Modelo como el de van.main, con la curva de sensibilidad en TASAS_SENSIBILIDAD"""
+    flujos = np.array(_flujos(rng, n))
+    modelo = ModeloVanIncremental(100_000, flujos, tasa_periodica(0.1, "Anual"),
+                                  [tasa_periodica(float(t), "Anual") for t in TASAS_SENSIBILIDAD], "Anual")
+    return modelo, flujos
+
+
+def _sensibilidad_flujo(n, rng):
+    modelo, flujos = _modelo_sensibilidad(n, rng)
+    # Alterna entre dos columnas que difieren en un período, como una edición en van.main
+    editados = flujos.copy()
+    editados[int(rng.integers(n))] += 1_000
+    columnas = [editados, flujos]
+
+    def editar():
+        columnas.reverse()
+        modelo.actualizar_flujos(columnas[0])
+        return modelo.vans_sensibilidad
+    return editar
+
+
+def _sensibilidad_tasa(n, rng):
+    modelo, _ = _modelo_sensibilidad(n, rng)
+    tasas = [tasa_periodica(0.11, "Anual"), tasa_periodica(0.1, "Anual")]
+
+    def cambiar_tasa():
+        tasas.reverse()
+        modelo.actualizar_tasa(tasas[0])
+        return modelo.vans_sensibilidad
+    return cambiar_tasa
+
+
+def _modelo_edicion(n, rng):
+    flujos = _flujos(rng, n)
+    modelo = ModeloVanIncremental(100_000, flujos, tasa_periodica(0.1, "Anual"),
+                                  [tasa_periodica(float(t), "Anual") for t in TASAS_SENSIBILIDAD])
+    indices = rng.integers(0, n, 64).tolist()
+    valores = _flujos(rng, 64)
+
+    def editar():
+        for indice, valor in zip(indices, valores):
+            modelo.actualizar_flujo(indice, valor)
+            modelo.periodo_recuperacion()
+    return editar
+
+
+def _generar_proyectos(n, rng):
+    simulador = SimuladorProyectos()
+    semilla = int(rng.integers(2**32))
+    return lambda: simulador.generar_proyectos(n, semilla=semilla)
+
+
+def _generar_monto(n, rng):
+    simulador = SimuladorProyectos()
+    duraciones = rng.integers(1, 30, n).tolist()
+
+    def generar():
+        random.seed(SEMILLA)
+        return [simulador.generar_monto(d) for d in duraciones]
+    return generar
+
+
+def _generar_montos(n, rng):
+    simulador = SimuladorProyectos()
+    duraciones = rng.integers(1, 30, n)
+    return lambda: simulador.generar_montos(duraciones, np.random.default_rng(SEMILLA))
+
+
+def _generar_meses(n, rng):
+    simulador = SimuladorProyectos()
+    return lambda: simulador.generar_meses(n, 3, semilla=SEMILLA)
+
+
+def _obtener_resumen(n, rng):
+    return _simulador(n, int(rng.integers(2**32))).obtener_resumen
+
+
+def _analizar_duraciones(n, rng):
+    return _simulador(n, int(rng.integers(2**32))).analizar_duraciones
+
+
+def _calcular_correlacion(n, rng):
+    simulador = _simulador(n, int(rng.integers(2**32)))
+    duraciones, montos = simulador.proyectos.duracion, simulador.proyectos.monto
+    return lambda: simulador.calcular_correlacion(duraciones, montos)
+
+
+def _obtener_dataframe(n, rng):
+    return _simulador(n, int(rng.integers(2**32))).obtener_dataframe
+
+
+def _analizar_meses(n, rng):
+    simulador = SimuladorProyectos()
+    meses = simulador.generar_meses(n, 3, semilla=SEMILLA)
+    return lambda: simulador.analizar_meses(meses)
+
+
+CASOS = (
+    ('calcular_van', 'periodos', _van),
+    ('calcular_van_lote', 'proyectos', _van_lote),
+    ('calcular_tir', 'periodos', _tir),
+    ('calcular_tir_lote', 'proyectos', _tir_lote),
+    ('sensibilidad.flujo', 'periodos', _sensibilidad_flujo),
+    ('sensibilidad.tasa', 'periodos', _sensibilidad_tasa),
+    ('modelo_van.edicion', 'periodos', _modelo_edicion),
+    ('generar_proyectos', 'proyectos', _generar_proyectos),
+    ('generar_monto', 'proyectos', _generar_monto),
+    ('generar_montos', 'proyectos', _generar_montos),
+    ('generar_meses', 'meses', _generar_meses),
+    ('obtener_resumen', 'proyectos', _obtener_resumen),
+    ('analizar_duraciones', 'proyectos', _analizar_duraciones),
+    ('calcular_correlacion', 'proyectos', _calcular_correlacion),
+    ('obtener_dataframe', 'proyectos', _obtener_dataframe),
+    ('analizar_meses', 'meses', _analizar_meses),
+)
+
+
+def medir(funcion, repeticiones=5, tiempo_minimo=0.05):
+    """
+    Mide una función sin argumentos
+
+    Las funciones muy rápidas se ejecutan en lotes de varias llamadas para que
+    cada medición dure al menos `tiempo_minimo` segundos.
+
+    Returns:
+        dict: segundos por llamada (mínimo y mediana), repeticiones y llamadas por lote
+    """
+    funcion()  # Calentamiento (imports diferidos, caches de una sola vez)
+    lote = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(lote):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        if duracion >= tiempo_minimo or lote >= 1_000_000:
+            break
+        lote *= max(2, min(10, int(tiempo_minimo / max(duracion, 1e-9)) + 1))
+
+    tiempos = [duracion / lote]
+    for _ in range(repeticiones - 1):
+        inicio = time.perf_counter()
+        for _ in range(lote):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / lote)
+
+    return {
+        'segundos_min': min(tiempos),
+        'segundos_mediana': statistics.median(tiempos),
+        'repeticiones': repeticiones,
+        'lote': lote
+    }
+
+
+def ejecutar(escala='rapida', filtro=None, repeticiones=5, semilla=SEMILLA, mostrar=True):
+    """
+    Ejecuta los casos seleccionados
+
+    Returns:
+        dict: 'metadatos' del entorno y 'resultados' (uno por caso y tamaño)
+    """
+    resultados = []
+    for nombre, dimension, preparar in CASOS:
+        if filtro and filtro not in nombre:
+            continue
+        for tamano in ESCALAS[escala][dimension]:
+            funcion = preparar(tamano, np.random.default_rng([semilla, tamano]))
+            medicion = {'caso': nombre, 'tamano': tamano, **medir(funcion, repeticiones)}
+            resultados.append(medicion)
+            if mostrar:
+                print(f"{nombre:<22} {tamano:>10,}  {medicion['segundos_min'] * 1000:12.3f} ms", flush=True)
+
+    return {
+        'metadatos': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'escala': escala,
+            'semilla': semilla,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'procesador': platform.processor() or platform.machine()
+        },
+        'resultados': resultados
+    }
+
+
+def comparar(base, nuevo, tolerancia=0.10):
+    """
+    Compara dos corridas por (caso, tamaño) usando el tiempo mínimo
+
+    Returns:
+        list: (caso, tamaño, segundos base, segundos nuevo, razón nuevo/base, es_regresion)
+    """
+    tiempos_base = {(r['caso'], r['tamano']): r['segundos_min'] for r in base['resultados']}
+    filas = []
+    for r in nuevo['resultados']:
+        clave = (r['caso'], r['tamano'])
+        if clave not in tiempos_base:
+            continue
+        razon = r['segundos_min'] / tiempos_base[clave] if tiempos_base[clave] > 0 else float('inf')
+        filas.append((*clave, tiempos_base[clave], r['segundos_min'], razon, razon > 1 + tolerancia))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de VAN/TIR y del simulador de proyectos")
+    parser.add_argument('--escala', choices=tuple(ESCALAS), default='rapida')
+    parser.add_argument('--filtro', help="Ejecutar sólo los casos cuyo nombre contiene este texto")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'),
+                        help="Comparar dos archivos JSON en lugar de ejecutar")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="Aumento relativo de tiempo tolerado antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        with open(args.comparar[0], encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        with open(args.comparar[1], encoding='utf-8') as archivo:
+            nuevo = json.load(archivo)
+        filas = comparar(base, nuevo, args.tolerancia)
+        for caso, tamano, t_base, t_nuevo, razon, regresion in filas:
+            print(f"{caso:<22} {tamano:>10,}  {t_base * 1000:10.3f} -> {t_nuevo * 1000:10.3f} ms"
+                  f"  x{razon:6.2f}{'  REGRESIÓN' if regresion else ''}")
+        return 1 if any(fila[-1] for fila in filas) else 0
+
+    resultado = ejecutar(args.escala, args.filtro, args.repeticiones)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Cache de resultados por sesión para las reejecuciones de Streamlit
+
+Cada interacción reejecuta main() completo; las secciones cuyo resultado sólo
+depende de entradas que no cambiaron se sirven desde esta cache. La clave es un
+hash estable del contenido de las entradas (no de la identidad de los objetos),
+así que una lista de flujos igual a la anterior acierta aunque sea otra lista.
+"""
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from metricas import REGISTRO
+
+_ACIERTOS = REGISTRO.contador('cache_sesion_aciertos_total', "Secciones servidas desde la cache de sesión")
+_FALLOS = REGISTRO.contador('cache_sesion_fallos_total', "Secciones recalculadas por la cache de sesión")
+
+
+def _alimentar(resumen, valor):
+    """Agrega `valor` al hash con una marca de tipo, para que 1, 1.0 y '1' no choquen"""
+    if valor is None or isinstance(valor, bool):
+        resumen.update(b'N' if valor is None else (b'T' if valor else b'F'))
+    elif isinstance(valor, (int, np.integer)):
+        resumen.update(b'i' + str(int(valor)).encode())
+    elif isinstance(valor, (float, np.floating)):
+        resumen.update(b'f' + struct.pack('<d', float(valor)))
+    elif isinstance(valor, str):
+        datos = valor.encode('utf-8')
+        resumen.update(b's' + struct.pack('<q', len(datos)) + datos)
+    elif isinstance(valor, np.ndarray):
+        arreglo = np.ascontiguousarray(valor)
+        resumen.update(b'a' + arreglo.dtype.str.encode() + repr(arreglo.shape).encode())
+        resumen.update(arreglo.tobytes() if arreglo.dtype != object else repr(arreglo.tolist()).encode())
+    elif isinstance(valor, (list, tuple)):
+        resumen.update(b'l' + struct.pack('<q', len(valor)))
+        for elemento in valor:
+            _alimentar(resumen, elemento)
+    elif isinstance(valor, dict):
+        resumen.update(b'd' + struct.pack('<q', len(valor)))
+        for clave in sorted(valor, key=repr):
+            _alimentar(resumen, clave)
+            _alimentar(resumen, valor[clave])
+    else:
+        resumen.update(b'r' + repr(valor).encode())
+
+
+def clave_estable(*entradas):
+    """Hash hexadecimal del contenido de las entradas (estable entre reejecuciones y procesos)"""
+    resumen = hashlib.blake2b(digest_size=16)
+    _alimentar(resumen, entradas)
+    return resumen.hexdigest()
+
+
+class CacheSesion:
+    """
+    Cache LRU acotada de resultados por sección
+
+    Las entradas más antiguas se descartan al superar `max_entradas`; cada
+    sección guarda a lo sumo una versión por combinación de entradas.
+    """
+
+    def __init__(self, max_entradas=64):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, seccion, entradas, calcular):
+        """
+        Resultado de `calcular()` para estas entradas, calculándolo sólo si no está guardado
+
+        Args:
+            seccion (str): Nombre de la sección (separa resultados de igual entrada)
+            entradas: Valores de los que depende el resultado (números, textos,
+                listas, diccionarios o arreglos NumPy)
+            calcular (callable): Función sin argumentos que produce el resultado
+        """
+        clave = (seccion, clave_estable(entradas))
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                if REGISTRO.habilitado:
+                    _ACIERTOS.incrementar()
+                return self._entradas[clave]
+            self.fallos += 1
+        if REGISTRO.habilitado:
+            _FALLOS.incrementar()
+
+        resultado = calcular()
+        with self._candado:
+            self._entradas[clave] = resultado
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return resultado
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'max_entradas': self.max_entradas,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+        }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+
+
+def cache_de_sesion(st, max_entradas=64, clave='cache_sesion'):
+    """CacheSesion guardada en st.session_state (una por sesión de usuario)"""
+    if clave not in st.session_state:
+        st.session_state[clave] = CacheSesion(max_entradas)
+    return st.session_state[clave]
@@ -0,0 +1,145 @@
+"""
+Tiempos por sección de cada ejecución de las apps de Streamlit
+
+Cada ejecución de main() crea un Diagnostico y marca el inicio de cada sección
+con `seccion(nombre)`; la sección anterior termina ahí. Los nombres con punto
+separan las partes de una misma sección (p. ej. 'grafico_flujos.figura' y
+'grafico_flujos.envio': construir la figura de Plotly y enviarla con
+st.plotly_chart, que es donde Streamlit la serializa).
+
+Al terminar se escribe una línea JSON por ejecución en el logger 'diagnostico'
+(y en el archivo de la variable de entorno DIAGNOSTICO_LOG si está definida).
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import time
+from datetime import datetime
+
+from metricas import REGISTRO
+
+_registro = logging.getLogger('diagnostico')
+if not _registro.handlers:
+    _manejador = logging.StreamHandler()
+    _manejador.setFormatter(logging.Formatter('%(message)s'))
+    _registro.addHandler(_manejador)
+    _registro.setLevel(logging.INFO)
+    _registro.propagate = False
+
+# Clave de session_state del checkbox que activa cProfile en la siguiente ejecución
+CLAVE_PERFILAR = 'diagnostico_perfilar'
+
+
+class Diagnostico:
+    """Tiempos de las secciones de una ejecución y, opcionalmente, su perfil cProfile"""
+
+    def __init__(self, app, perfilar=False):
+        self.app = app
+        self.fecha = datetime.now().isoformat(timespec='seconds')
+        self.secciones = []
+        self.total = None
+        self._actual = None
+        self._inicio = time.perf_counter()
+        self._perfil = cProfile.Profile() if perfilar else None
+        if self._perfil is not None:
+            self._perfil.enable()
+
+    def seccion(self, nombre):
+        """Termina la sección en curso y empieza `nombre`"""
+        ahora = time.perf_counter()
+        self._cerrar(ahora)
+        self._actual = (nombre, ahora)
+
+    def _cerrar(self, ahora):
+        if self._actual is not None:
+            nombre, inicio = self._actual
+            self.secciones.append((nombre, ahora - inicio))
+            self._actual = None
+
+    def finalizar(self):
+        """Cierra la última sección y detiene el perfil (se puede llamar más de una vez)"""
+        if self.total is None:
+            ahora = time.perf_counter()
+            self._cerrar(ahora)
+            self.total = ahora - self._inicio
+            if self._perfil is not None:
+                self._perfil.disable()
+        return self
+
+    def como_dict(self):
+        self.finalizar()
+        return {
+            'app': self.app,
+            'fecha': self.fecha,
+            'total_ms': round(self.total * 1000, 2),
+            'perfilado': self._perfil is not None,
+            'secciones': {nombre: round(segundos * 1000, 2) for nombre, segundos in self.secciones},
+            'grupos': {grupo: round(ms, 2) for grupo, ms in self.por_grupo().items()}
+        }
+
+    def por_grupo(self):
+        """Milisegundos sumados por sección principal (parte antes del primer punto)"""
+        grupos = {}
+        for nombre, segundos in self.finalizar().secciones:
+            grupo = nombre.split('.')[0]
+            grupos[grupo] = grupos.get(grupo, 0.0) + segundos * 1000
+        return grupos
+
+    def texto_perfil(self, limite=30, orden='cumulative'):
+        """Funciones más costosas del perfil cProfile, o '' si no se perfiló"""
+        if self._perfil is None:
+            return ''
+        self.finalizar()
+        salida = io.StringIO()
+        pstats.Stats(self._perfil, stream=salida).strip_dirs().sort_stats(orden).print_stats(limite)
+        return salida.getvalue()
+
+    def registrar(self):
+        """Escribe la ejecución como una línea JSON"""
+        linea = json.dumps(self.como_dict(), ensure_ascii=False)
+        _registro.info(linea)
+        ruta = os.environ.get('DIAGNOSTICO_LOG')
+        if ruta:
+            with open(ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + '\n')
+        return linea
+
+
+def iniciar(st, app):
+    """Diagnostico de la ejecución actual; perfila si se activó en el panel"""
+    return Diagnostico(app, perfilar=st.session_state.get(CLAVE_PERFILAR, False))
+
+
+def de_fragmento(st, diagnostico, nombre):
+    """
+    Diagnostico para el cuerpo de un fragmento
+
+    En la ejecución completa es el mismo de la app. Si el fragmento se
+    reejecuta solo, el de la app ya terminó y se devuelve uno nuevo llamado
+    'app.nombre', que el fragmento debe registrar al terminar.
+    """
+    if diagnostico.total is None:
+        return diagnostico
+    return iniciar(st, f"{diagnostico.app}.{nombre}")
+
+
+def mostrar_panel(st, diagnostico):
+    """Panel plegable con los tiempos de la ejecución y el perfil si se pidió"""
+    diagnostico.finalizar()
+    with st.expander(f"🩺 Diagnóstico de rendimiento ({diagnostico.total * 1000:,.0f} ms)"):
+        st.checkbox("Perfilar la próxima ejecución con cProfile", key=CLAVE_PERFILAR)
+        st.dataframe(
+            [{'Sección': nombre, 'ms': round(segundos * 1000, 2),
+              '%': round(100 * segundos / diagnostico.total, 1) if diagnostico.total else 0.0}
+             for nombre, segundos in diagnostico.secciones],
+            hide_index=True, use_container_width=True
+        )
+        if REGISTRO.habilitado:
+            st.markdown("**Métricas del proceso**")
+            st.json(REGISTRO.instantanea(), expanded=False)
+        perfil = diagnostico.texto_perfil()
+        if perfil:
+            st.code(perfil, language=None)
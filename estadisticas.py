@@ -0,0 +1,255 @@
+import numpy as np
+
+# Coeficientes de la aproximación racional de Acklam para la inversa de la normal
+_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+      6.680131188771972e+01, -1.328068155288572e+01)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+      3.754408661907416e+00)
+_P_BAJO = 0.02425
+
+
+def _polinomio(coeficientes, x):
+    resultado = np.zeros_like(x)
+    for coeficiente in coeficientes:
+        resultado = resultado * x + coeficiente
+    return resultado
+
+
+def ppf_normal(p):
+    """
+    Inversa de la función de distribución normal estándar (error relativo < 1.2e-9)
+
+    Args:
+        p (float | array): Probabilidades en (0, 1)
+
+    Returns:
+        np.ndarray: Cuantiles z tales que P(Z <= z) = p
+    """
+    p = np.asarray(p, dtype=float)
+    z = np.empty_like(p)
+
+    bajo = p < _P_BAJO
+    alto = p > 1 - _P_BAJO
+    centro = ~(bajo | alto)
+
+    q = p[centro] - 0.5
+    r = q * q
+    z[centro] = _polinomio(_A, r) * q / (_polinomio(_B, r) * r + 1)
+
+    with np.errstate(divide='ignore'):
+        q = np.sqrt(-2 * np.log(p[bajo]))
+        z[bajo] = _polinomio(_C, q) / (_polinomio(_D, q) * q + 1)
+        q = np.sqrt(-2 * np.log1p(-p[alto]))
+        z[alto] = -_polinomio(_C, q) / (_polinomio(_D, q) * q + 1)
+
+    return z
+
+
+def z_confianza(confianza):
+    """Valor z bilateral para un nivel de confianza (0.95 -> 1.96)"""
+    return float(ppf_normal(0.5 + confianza / 2))
+
+
+class AcumuladorEstadistico:
+    """
+    Media, varianza, mínimo, máximo y cuantiles que se actualizan bloque a bloque
+
+    La media y la varianza se combinan con la fórmula de Chan et al. (Welford
+    por bloques) y son exactas; los cuantiles salen de un t-digest de a lo sumo
+    `compresion` centroides, así que la memoria no depende del número de
+    valores. Dos acumuladores (de otros bloques o procesos) se unen con
+    `combinar` sin volver a ver los datos.
+    """
+
+    def __init__(self, compresion=200):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.compresion = compresion
+        self._centroides = np.empty(0)
+        self._pesos = np.empty(0)
+
+    def actualizar(self, valores):
+        valores = np.asarray(valores, dtype=float).ravel()
+        if len(valores) == 0:
+            return self
+        media = valores.mean()
+        self._unir_momentos(len(valores), media, ((valores - media) ** 2).sum(),
+                            valores.min(), valores.max())
+        self._comprimir(np.concatenate((self._centroides, valores)),
+                        np.concatenate((self._pesos, np.ones(len(valores)))))
+        return self
+
+    def combinar(self, otro):
+        """Une otro acumulador a éste (el resultado no depende del orden de los bloques)"""
+        if otro.n == 0:
+            return self
+        self._unir_momentos(otro.n, otro.media, otro._m2, otro.minimo, otro.maximo)
+        self._comprimir(np.concatenate((self._centroides, otro._centroides)),
+                        np.concatenate((self._pesos, otro._pesos)))
+        return self
+
+    def _unir_momentos(self, m, media, m2, minimo, maximo):
+        total = self.n + m
+        delta = media - self.media
+        self.media += delta * m / total
+        self._m2 += m2 + delta ** 2 * self.n * m / total
+        self.n = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    def _comprimir(self, centroides, pesos):
+        """Agrupa los centroides ordenados según la escala k1 del t-digest (más finos en las colas)"""
+        orden = np.argsort(centroides, kind='stable')
+        centroides, pesos = centroides[orden], pesos[orden]
+        total = pesos.sum()
+        q = (np.cumsum(pesos) - pesos / 2) / total
+        grupos = np.floor(self.compresion * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype(np.int64)
+        _, grupos = np.unique(grupos, return_inverse=True)
+        self._pesos = np.bincount(grupos, weights=pesos)
+        self._centroides = np.bincount(grupos, weights=centroides * pesos) / self._pesos
+
+    @property
+    def varianza(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self):
+        return float(np.sqrt(self.varianza))
+
+    @property
+    def error_estandar(self):
+        return np.sqrt(self.varianza / self.n) if self.n > 0 else float('inf')
+
+    def semiancho(self, confianza=0.95):
+        """Semiancho del intervalo de confianza de la media"""
+        return z_confianza(confianza) * self.error_estandar
+
+    def cuantiles(self, probabilidades):
+        if self.n == 0:
+            return np.full(len(probabilidades), np.nan)
+        posiciones = np.concatenate(([0.0], np.cumsum(self._pesos) - self._pesos / 2, [self.n]))
+        valores = np.concatenate(([self.minimo], self._centroides, [self.maximo]))
+        return np.interp(np.asarray(probabilidades, dtype=float) * self.n, posiciones, valores)
+
+    def resumen(self, cuantiles=(0.05, 0.5, 0.95)):
+        return {
+            'n': self.n,
+            'media': float(self.media),
+            'desviacion': self.desviacion,
+            'minimo': float(self.minimo),
+            'maximo': float(self.maximo),
+            'cuantiles': dict(zip(cuantiles, self.cuantiles(cuantiles).tolist()))
+        }
+
+
+class AcumuladorCovarianza:
+    """Covarianza y correlación de pares (x, y) acumuladas por bloques y combinables"""
+
+    def __init__(self):
+        self.n = 0
+        self.media_x = 0.0
+        self.media_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self._c_xy = 0.0
+
+    def actualizar(self, x, y):
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) != len(y):
+            raise ValueError("x e y deben tener la misma cantidad de valores")
+        if len(x) == 0:
+            return self
+        media_x, media_y = x.mean(), y.mean()
+        dx, dy = x - media_x, y - media_y
+        return self._unir(len(x), media_x, media_y, dx @ dx, dy @ dy, dx @ dy)
+
+    def combinar(self, otro):
+        if otro.n == 0:
+            return self
+        return self._unir(otro.n, otro.media_x, otro.media_y, otro._m2_x, otro._m2_y, otro._c_xy)
+
+    def _unir(self, m, media_x, media_y, m2_x, m2_y, c_xy):
+        total = self.n + m
+        delta_x = media_x - self.media_x
+        delta_y = media_y - self.media_y
+        factor = self.n * m / total
+        self._m2_x += m2_x + delta_x ** 2 * factor
+        self._m2_y += m2_y + delta_y ** 2 * factor
+        self._c_xy += c_xy + delta_x * delta_y * factor
+        self.media_x += delta_x * m / total
+        self.media_y += delta_y * m / total
+        self.n = total
+        return self
+
+    @property
+    def covarianza(self):
+        return self._c_xy / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def correlacion(self):
+        denominador = np.sqrt(self._m2_x * self._m2_y)
+        return float(self._c_xy / denominador) if denominador > 0 else 0.0
+
+
+def simular_hasta_precision(generar_bloque, precision_relativa=0.005, confianza=0.95,
+                            tam_bloque=10_000, max_muestras=1_000_000, min_muestras=None,
+                            precision_absoluta=None, semilla=None, cuantiles=(0.05, 0.5, 0.95)):
+    """
+    Ejecuta una simulación por bloques hasta alcanzar la precisión pedida
+
+    Args:
+        generar_bloque (callable): generar_bloque(rng, n) -> array con n muestras
+        precision_relativa (float): Semiancho máximo del intervalo relativo a |media|
+            (0.005 = ±0.5 %)
+        confianza (float): Nivel de confianza del intervalo
+        tam_bloque (int): Muestras por bloque
+        max_muestras (int): Presupuesto máximo de muestras
+        min_muestras (int): Muestras mínimas antes de evaluar el criterio (por defecto un bloque)
+        precision_absoluta (float): Semiancho máximo absoluto; si se indica reemplaza
+            al criterio relativo (útil para probabilidades cercanas a 0)
+        semilla (int | np.random.Generator): Semilla del generador
+
+    Returns:
+        dict: media, semiancho, intervalo, cuantiles, muestras usadas, bloques y
+            si se alcanzó la precisión
+    """
+    rng = np.random.default_rng(semilla)
+    estimador = AcumuladorEstadistico()
+    min_muestras = tam_bloque if min_muestras is None else min_muestras
+    bloques = 0
+    convergio = False
+
+    while estimador.n < max_muestras:
+        n = min(tam_bloque, max_muestras - estimador.n)
+        estimador.actualizar(generar_bloque(rng, n))
+        bloques += 1
+
+        if estimador.n >= min_muestras and estimador.n > 1:
+            semiancho = estimador.semiancho(confianza)
+            objetivo = (precision_absoluta if precision_absoluta is not None
+                        else precision_relativa * abs(estimador.media))
+            if semiancho <= objetivo:
+                convergio = True
+                break
+
+    semiancho = float(estimador.semiancho(confianza))
+    media = float(estimador.media)
+    return {
+        'media': media,
+        'desviacion': estimador.desviacion,
+        'semiancho': semiancho,
+        'intervalo': (media - semiancho, media + semiancho),
+        'confianza': confianza,
+        'cuantiles': dict(zip(cuantiles, estimador.cuantiles(cuantiles).tolist())),
+        'muestras': estimador.n,
+        'bloques': bloques,
+        'convergio': convergio
+    }
@@ -0,0 +1,794 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from metricas import REGISTRO
+
+
+@lru_cache(maxsize=1024)
+def tasa_periodica(tasa_anual, tipo_periodo):
+    """Convierte una tasa anual a la tasa equivalente del tipo de período"""
+    if tipo_periodo == "Mensual":
+        return (1 + tasa_anual) ** (1/12) - 1
+    return tasa_anual
+
+
+def tasa_periodica_lote(tasas_anuales, tipos_periodo):
+    """Versión vectorizada de tasa_periodica: una tasa y un tipo de período por proyecto"""
+    tasas_anuales = np.asarray(tasas_anuales, dtype=float)
+    mensual = np.asarray(tipos_periodo) == "Mensual"
+    return np.where(mensual, (1 + tasas_anuales) ** (1/12) - 1, tasas_anuales)
+
+
+class CacheFactores:
+    """
+    Cache LRU acotada de vectores de factores de descuento (1 + r) ** t, t = 1..n
+
+    Las claves son (tasa por período, horizonte, tipo de período); cualquier tipo
+    distinto de "Mensual" (incluido None) se guarda como "Anual", igual que en
+    tasa_periodica. Los vectores devueltos son de sólo lectura porque se
+    comparten entre llamadas y sesiones.
+    """
+
+    def __init__(self, max_entradas=256):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, tasa_periodo, horizonte, tipo_periodo=None):
+        tipo_periodo = "Mensual" if tipo_periodo == "Mensual" else "Anual"
+        clave = (float(tasa_periodo), int(horizonte), tipo_periodo)
+        with self._candado:
+            factores = self._entradas.get(clave)
+            if factores is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return factores
+            self.fallos += 1
+
+        with np.errstate(over='ignore'):
+            # En horizontes muy largos el factor llega a inf: el flujo descontado es 0
+            factores = (1 + clave[0]) ** np.arange(1, clave[1] + 1)
+        factores.flags.writeable = False
+
+        with self._candado:
+            self._entradas[clave] = factores
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return factores
+
+    def matriz(self, tasas_periodo, horizonte, tipo_periodo=None):
+        """Factores para varias tasas: matriz tasas x períodos"""
+        return np.stack([self.obtener(tasa, horizonte, tipo_periodo) for tasa in tasas_periodo])
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'max_entradas': self.max_entradas,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+        }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+
+# Cache compartida por todos los cálculos de VAN, TIR y sensibilidad
+CACHE_FACTORES = CacheFactores()
+
+REGISTRO.indicador('cache_factores_tasa_aciertos', "Aciertos / consultas de CACHE_FACTORES",
+                   lambda: CACHE_FACTORES.estadisticas()['tasa_aciertos'])
+REGISTRO.indicador('cache_factores_aciertos', "Consultas de CACHE_FACTORES resueltas sin calcular",
+                   lambda: CACHE_FACTORES.aciertos)
+REGISTRO.indicador('cache_factores_fallos', "Consultas de CACHE_FACTORES que calcularon factores",
+                   lambda: CACHE_FACTORES.fallos)
+
+
+def calcular_van_lote(inversiones, flujos, tasas, detalle=False, tipo_periodo=None):
+    """
+    Calcula el VAN de muchos proyectos en una sola pasada de NumPy
+
+    Args:
+        inversiones (float | array): Inversión inicial (una por proyecto o común a todos)
+        flujos (array): Matriz proyectos x períodos con los flujos de caja.
+            Los proyectos de horizonte más corto se rellenan con ceros.
+        tasas (float | array): Tasa de descuento por período (una común o una por proyecto)
+        detalle (bool): Si es True también devuelve flujos descontados y factores
+        tipo_periodo (str): Tipo de período de la tasa, parte de la clave de CACHE_FACTORES
+
+    Returns:
+        np.ndarray | tuple: VAN por proyecto, o (VAN, flujos_descontados, factores_descuento)
+            cuando se pide el detalle
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    n_proyectos, n_periodos = flujos.shape
+    inversiones = np.broadcast_to(np.asarray(inversiones, dtype=float), (n_proyectos,))
+    tasas = np.asarray(tasas, dtype=float)
+    periodos = np.arange(1, n_periodos + 1)
+
+    if tasas.ndim == 0:
+        # Un único vector de factores compartido por todos los proyectos
+        factores = CACHE_FACTORES.obtener(tasas, n_periodos, tipo_periodo)
+        if not detalle:
+            return flujos @ (1 / factores) - inversiones
+        factores = np.broadcast_to(factores, flujos.shape)
+    else:
+        # Tasas distintas por proyecto casi nunca se repiten: no pasan por la cache
+        tasas = np.broadcast_to(tasas, (n_proyectos,))
+        factores = (1 + tasas[:, None]) ** periodos
+
+    flujos_descontados = flujos / factores
+    vans = flujos_descontados.sum(axis=1) - inversiones
+
+    if detalle:
+        return vans, flujos_descontados, factores
+    return vans
+
+
+def analisis_sensibilidad(inversion_inicial, flujos_caja, tasas_anuales, tipo_periodo="Anual"):
+    """
+    VAN de un proyecto para cada tasa anual de prueba
+
+    Returns:
+        np.ndarray: VAN por tasa de prueba
+    """
+    flujos_caja = np.asarray(flujos_caja, dtype=float)
+    tasas = [tasa_periodica(float(tasa), tipo_periodo) for tasa in tasas_anuales]
+    factores = CACHE_FACTORES.matriz(tasas, len(flujos_caja), tipo_periodo)
+    return (flujos_caja / factores).sum(axis=1) - inversion_inicial
+
+
+def periodo_recuperacion_lote(inversiones, flujos, tasas=None):
+    """
+    Primer período con flujo acumulado positivo para cada proyecto
+
+    Args:
+        inversiones (float | array): Inversión inicial (una por proyecto o común)
+        flujos (array): Matriz proyectos x períodos
+        tasas (float | array): Si se indica, se acumulan los flujos descontados
+            (período de recuperación descontado)
+
+    Returns:
+        np.ndarray: Período de recuperación, NaN si el proyecto no se recupera
+            en el horizonte. Con inversión negativa es 0; con inversión 0 el
+            período 0 no cuenta (su acumulado no es positivo) y se devuelve el
+            primer período con acumulado positivo.
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    inversiones = np.broadcast_to(np.asarray(inversiones, dtype=float), (len(flujos),))
+    if tasas is not None:
+        _, flujos, _ = calcular_van_lote(inversiones, flujos, tasas, detalle=True)
+
+    acumulados = np.cumsum(np.column_stack((-inversiones, flujos)), axis=1)
+    recuperado = acumulados > 0
+    periodo = recuperado.argmax(axis=1).astype(float)
+    periodo[~recuperado.any(axis=1)] = np.nan
+    return periodo
+
+
+# Estados devueltos por calcular_tir_lote
+TIR_CONVERGIO = 0
+TIR_SIN_CAMBIO_SIGNO = 1
+TIR_NO_CONVERGIO = 2
+
+_TIR_PROYECTOS = REGISTRO.contador('tir_proyectos_total', "Proyectos procesados por calcular_tir_lote")
+_TIR_ITERACIONES = REGISTRO.histograma('tir_iteraciones', "Iteraciones hasta converger por proyecto")
+_TIR_NO_CONVERGIO = REGISTRO.contador('tir_no_convergio_total', "Proyectos que agotaron max_iter")
+_TIR_SIN_CAMBIO_SIGNO = REGISTRO.contador('tir_sin_cambio_signo_total', "Proyectos sin intervalo con raíz")
+_TIR_DERIVADA_NULA = REGISTRO.contador(
+    'tir_derivada_nula_total', "Pasos de Newton descartados por derivada nula o no finita"
+)
+_TIR_BISECCION = REGISTRO.contador('tir_pasos_biseccion_total', "Pasos de bisección en lugar de Newton")
+_TIR_SIN_INTERVALO = REGISTRO.contador(
+    'tir_sin_intervalo_resueltos_total', "Proyectos sin intervalo con raíz resueltos por Newton libre o rejilla"
+)
+
+# Límites sucesivos para buscar un intervalo con cambio de signo
+LIMITES_INFERIORES = (0.0, -0.2, -0.4, -0.6, -0.8, -0.9, -0.99, -0.999)
+LIMITES_SUPERIORES = (1.0, 2.0, 5.0, 10.0, 100.0, 1000.0, 1e4, 1e5)
+
+# Estimación inicial de Newton (la misma del calcular_tir original)
+TIR_SEMILLA = 0.1
+
+# Rejilla fina de tasas (entre -0.999 y 999) para el último intento
+REJILLA_TIR = np.geomspace(1e-3, 1e3, 512) - 1
+_ORDEN_REJILLA = np.argsort(np.abs(REJILLA_TIR[:-1] - TIR_SEMILLA), kind='stable')
+
+
+def _van_y_derivada(inversiones, flujos, tasas):
+    """
+    Evalúa VAN y dVAN/dtasa fila por fila (una tasa por fila)
+
+    No pasa por CACHE_FACTORES: cada iteración de Newton usa tasas nuevas
+    por fila que no se repiten y sólo desplazarían entradas útiles.
+    """
+    periodos = np.arange(1, flujos.shape[1] + 1)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        descuento = np.exp(-np.log1p(tasas)[:, None] * periodos)
+        descontados = flujos * descuento
+        van = descontados.sum(axis=1) - inversiones
+        derivada = -(descontados @ periodos) / (1 + tasas)
+    return van, derivada
+
+
+def _van_tasa_fija(inversiones, flujos, tasa):
+    """VAN de todas las filas a una misma tasa, con factores de CACHE_FACTORES"""
+    factores = CACHE_FACTORES.obtener(tasa, flujos.shape[1])
+    with np.errstate(over='ignore', invalid='ignore'):
+        return flujos @ (1 / factores) - inversiones
+
+
+def _tir_newton_libre(inversiones, flujos, max_iter, precision):
+    """
+    Newton-Raphson sin intervalo desde TIR_SEMILLA, para filas sin cambio de signo
+
+    Reproduce al calcular_tir original: dos raíces cercanas dentro de un mismo
+    intervalo de búsqueda, o raíces por debajo de -1, no dejan cambio de signo
+    en los límites pero Newton sí las encuentra. Los pasos no finitos o que caen
+    en -1 se descartan, y sólo se acepta una tasa cuyo VAN es despreciable
+    frente a los flujos descontados.
+
+    Returns:
+        tuple: (tir, convergio, iteraciones) por fila
+    """
+    periodos = np.arange(1, flujos.shape[1] + 1)
+    n_filas = flujos.shape[0]
+    tir = np.full(n_filas, np.nan)
+    convergio = np.zeros(n_filas, dtype=bool)
+    iteraciones = np.zeros(n_filas, dtype=np.int32)
+
+    activos = np.arange(n_filas)
+    inv, flu = inversiones, flujos
+    tasa = np.full(n_filas, TIR_SEMILLA)
+    for iteracion in range(1, max_iter + 1):
+        if activos.size == 0:
+            break
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            # Potencias enteras: válidas también para tasas menores que -1
+            descontados = flu / (1 + tasa)[:, None] ** periodos
+            van = descontados.sum(axis=1) - inv
+            derivada = -(descontados @ periodos) / (1 + tasa)
+            tasa_nueva = tasa - van / derivada
+            escala_van = np.abs(descontados).sum(axis=1) + np.abs(inv)
+
+        paso = np.abs(tasa_nueva - tasa)
+        listo = np.isfinite(van) & (
+            (van == 0) | (np.isfinite(tasa_nueva) & (paso < precision * (1 + np.abs(tasa_nueva))))
+        )
+        listo &= np.abs(van) <= 1e-8 * escala_van
+        fallo = ~listo & (~np.isfinite(tasa_nueva) | (tasa_nueva == -1))
+
+        terminado = listo | fallo
+        if terminado.any():
+            filas = activos[listo]
+            tir[filas] = np.where(van[listo] == 0, tasa[listo], tasa_nueva[listo])
+            convergio[filas] = True
+            iteraciones[activos[terminado]] = iteracion
+            sigue = ~terminado
+            activos, inv, flu = activos[sigue], inv[sigue], flu[sigue]
+            tasa_nueva = tasa_nueva[sigue]
+        tasa = tasa_nueva
+
+    iteraciones[activos] = max_iter
+    return tir, convergio, iteraciones
+
+
+def _tir_rejilla(inversiones, flujos, max_iter, precision):
+    """
+    Busca cambios de signo del VAN sobre REJILLA_TIR y refina por bisección
+
+    De los intervalos con cambio de signo se usa el más cercano a TIR_SEMILLA.
+
+    Returns:
+        tuple: (tir, convergio) por fila
+    """
+    periodos = np.arange(1, flujos.shape[1] + 1)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        descuentos = (1 + REJILLA_TIR)[:, None] ** -periodos
+
+    indice = np.zeros(len(flujos), dtype=np.intp)
+    convergio = np.zeros(len(flujos), dtype=bool)
+    van_a = np.zeros(len(flujos))
+    # Por bloques para acotar la matriz filas x rejilla
+    for inicio in range(0, len(flujos), 4096):
+        bloque = slice(inicio, inicio + 4096)
+        with np.errstate(over='ignore', invalid='ignore'):
+            vans = flujos[bloque] @ descuentos.T - inversiones[bloque, None]
+        finito = np.isfinite(vans)
+        positivo = vans > 0
+        cambio = (positivo[:, :-1] != positivo[:, 1:]) & finito[:, :-1] & finito[:, 1:]
+        filas = np.flatnonzero(cambio.any(axis=1))
+        # Intervalo con cambio de signo más cercano a la semilla
+        primero = _ORDEN_REJILLA[cambio[filas][:, _ORDEN_REJILLA].argmax(axis=1)]
+        indice[inicio + filas] = primero
+        convergio[inicio + filas] = True
+        van_a[inicio + filas] = vans[filas, primero]
+
+    tir = np.full(len(flujos), np.nan)
+    filas = np.flatnonzero(convergio)
+    a, b = REJILLA_TIR[indice[filas]], REJILLA_TIR[indice[filas] + 1]
+    van_a = van_a[filas]
+    flu, inv = flujos[filas], inversiones[filas]
+    for _ in range(max_iter):
+        medio = (a + b) / 2
+        if np.all(b - a < precision * (1 + np.abs(medio))):
+            break
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            van = (flu / (1 + medio)[:, None] ** periodos).sum(axis=1) - inv
+        mismo_signo = np.sign(van) == np.sign(van_a)
+        a = np.where(mismo_signo, medio, a)
+        van_a = np.where(mismo_signo, van, van_a)
+        b = np.where(mismo_signo, b, medio)
+    tir[filas] = (a + b) / 2
+    return tir, convergio
+
+
+def calcular_tir_lote(inversiones, flujos, max_iter=100, precision=1e-9):
+    """
+    Calcula la TIR de muchos proyectos a la vez
+
+    Cada fila usa Newton-Raphson protegido por un intervalo con cambio de signo:
+    si el paso de Newton sale del intervalo, la derivada es casi nula o el paso no
+    reduce el error lo suficiente, se toma un paso de bisección. Las filas sin
+    intervalo con raíz prueban además Newton sin intervalo desde TIR_SEMILLA y,
+    si tampoco converge, una búsqueda de cambio de signo sobre REJILLA_TIR
+    antes de darse por perdidas. Si el VAN en TIR_SEMILLA ya es exactamente 0
+    (p. ej. todos los flujos nulos) la TIR es TIR_SEMILLA, como en el
+    calcular_tir original.
+
+    Args:
+        inversiones (float | array): Inversión inicial (una por proyecto o común a todos)
+        flujos (array): Matriz proyectos x períodos con los flujos de caja
+        max_iter (int): Máximo de iteraciones por proyecto
+        precision (float): Tolerancia relativa sobre la tasa
+
+    Returns:
+        tuple: (tir, estado, iteraciones). `tir` es NaN cuando el estado no es
+            TIR_CONVERGIO; `estado` indica TIR_SIN_CAMBIO_SIGNO si no existe
+            intervalo con raíz y ningún intento sin intervalo la encontró, o
+            TIR_NO_CONVERGIO si se agotaron las iteraciones.
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    n_proyectos = flujos.shape[0]
+    inversiones = np.broadcast_to(np.asarray(inversiones, dtype=float), (n_proyectos,)).copy()
+
+    tir = np.full(n_proyectos, np.nan)
+    estado = np.full(n_proyectos, TIR_SIN_CAMBIO_SIGNO, dtype=np.int8)
+    iteraciones = np.zeros(n_proyectos, dtype=np.int32)
+
+    # La semilla ya es raíz: se devuelve tal cual
+    en_semilla = _van_tasa_fija(inversiones, flujos, TIR_SEMILLA) == 0
+    tir[en_semilla] = TIR_SEMILLA
+    estado[en_semilla] = TIR_CONVERGIO
+
+    # Buscar intervalo [inferior, superior] con cambio de signo
+    inferior = np.full(n_proyectos, LIMITES_INFERIORES[0])
+    superior = np.full(n_proyectos, LIMITES_SUPERIORES[0])
+    van_inf = _van_tasa_fija(inversiones, flujos, LIMITES_INFERIORES[0])
+    van_sup = _van_tasa_fija(inversiones, flujos, LIMITES_SUPERIORES[0])
+    van_inf[en_semilla] = van_sup[en_semilla] = np.nan
+
+    for limite_inf, limite_sup in zip(LIMITES_INFERIORES[1:], LIMITES_SUPERIORES[1:]):
+        sin_cambio = ~(np.sign(van_inf) * np.sign(van_sup) <= 0)
+        if not sin_cambio.any():
+            break
+        filas = np.flatnonzero(sin_cambio)
+
+        van_cand = _van_tasa_fija(inversiones[filas], flujos[filas], limite_sup)
+        acepta = np.isfinite(van_cand) & (np.sign(van_cand) != np.sign(van_inf[filas]))
+        superior[filas[acepta]] = limite_sup
+        van_sup[filas[acepta]] = van_cand[acepta]
+
+        filas = filas[~acepta]
+        van_cand = _van_tasa_fija(inversiones[filas], flujos[filas], limite_inf)
+        acepta = np.isfinite(van_cand) & (np.sign(van_cand) != np.sign(van_sup[filas]))
+        inferior[filas[acepta]] = limite_inf
+        van_inf[filas[acepta]] = van_cand[acepta]
+
+    con_raiz = np.sign(van_inf) * np.sign(van_sup) <= 0
+    con_raiz &= np.isfinite(van_inf) & np.isfinite(van_sup)
+    estado[con_raiz] = TIR_NO_CONVERGIO
+
+    # Raíz exacta en un extremo del intervalo
+    for extremo, van_extremo in ((inferior, van_inf), (superior, van_sup)):
+        exacta = con_raiz & (van_extremo == 0)
+        tir[exacta] = extremo[exacta]
+        estado[exacta] = TIR_CONVERGIO
+        con_raiz &= ~exacta
+    activos = np.flatnonzero(con_raiz)
+
+    # Estado de trabajo sólo para las filas con raíz
+    inv = inversiones[activos]
+    flu = flujos[activos]
+    a, b = inferior[activos], superior[activos]
+    van_a = van_inf[activos]
+    tasa = np.where((a < TIR_SEMILLA) & (TIR_SEMILLA < b), TIR_SEMILLA, (a + b) / 2)
+    paso_anterior = b - a
+    medir = REGISTRO.habilitado
+    derivada_nula = pasos_biseccion = 0
+
+    for iteracion in range(1, max_iter + 1):
+        if activos.size == 0:
+            break
+        van, derivada = _van_y_derivada(inv, flu, tasa)
+
+        # Reducir el intervalo con el signo del VAN en la tasa actual
+        mismo_signo = np.sign(van) == np.sign(van_a)
+        a = np.where(mismo_signo, tasa, a)
+        van_a = np.where(mismo_signo, van, van_a)
+        b = np.where(mismo_signo, b, tasa)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tasa_newton = tasa - van / derivada
+        biseccion = (
+            ~np.isfinite(tasa_newton)
+            | (tasa_newton <= a) | (tasa_newton >= b)
+            | (np.abs(tasa_newton - tasa) > 0.5 * np.abs(paso_anterior))
+        )
+        tasa_nueva = np.where(biseccion, (a + b) / 2, tasa_newton)
+        if medir:
+            derivada_nula += int(np.count_nonzero(~np.isfinite(tasa_newton)))
+            pasos_biseccion += int(np.count_nonzero(biseccion))
+        paso_anterior = tasa_nueva - tasa
+
+        escala = precision * (1 + np.abs(tasa_nueva))
+        listo = (van == 0) | (np.abs(paso_anterior) < escala) | (b - a < escala)
+        tasa = np.where(van == 0, tasa, tasa_nueva)
+
+        if listo.any():
+            filas = activos[listo]
+            tir[filas] = tasa[listo]
+            estado[filas] = TIR_CONVERGIO
+            iteraciones[filas] = iteracion
+            sigue = ~listo
+            activos, inv, flu = activos[sigue], inv[sigue], flu[sigue]
+            a, b, van_a = a[sigue], b[sigue], van_a[sigue]
+            tasa, paso_anterior = tasa[sigue], paso_anterior[sigue]
+
+    iteraciones[activos] = max_iter
+
+    # Sin intervalo con raíz: Newton sin intervalo antes de devolver NaN
+    sin_raiz = np.flatnonzero(estado == TIR_SIN_CAMBIO_SIGNO)
+    resueltas = 0
+    if sin_raiz.size:
+        tir_libre, convergio_libre, iteraciones_libre = _tir_newton_libre(
+            inversiones[sin_raiz], flujos[sin_raiz], max_iter, precision
+        )
+        filas = sin_raiz[convergio_libre]
+        tir[filas] = tir_libre[convergio_libre]
+        estado[filas] = TIR_CONVERGIO
+        iteraciones[sin_raiz] = iteraciones_libre
+        resueltas = filas.size
+
+        # Si Newton tampoco converge, último intento con la rejilla fina
+        sin_raiz = sin_raiz[~convergio_libre]
+        if sin_raiz.size:
+            tir_rejilla, convergio_rejilla = _tir_rejilla(
+                inversiones[sin_raiz], flujos[sin_raiz], max_iter, precision
+            )
+            filas = sin_raiz[convergio_rejilla]
+            tir[filas] = tir_rejilla[convergio_rejilla]
+            estado[filas] = TIR_CONVERGIO
+            resueltas += filas.size
+
+    if medir:
+        convergio = estado == TIR_CONVERGIO
+        _TIR_PROYECTOS.incrementar(n_proyectos)
+        _TIR_ITERACIONES.observar(iteraciones[convergio])
+        _TIR_NO_CONVERGIO.incrementar(np.count_nonzero(estado == TIR_NO_CONVERGIO))
+        _TIR_SIN_CAMBIO_SIGNO.incrementar(np.count_nonzero(estado == TIR_SIN_CAMBIO_SIGNO))
+        _TIR_DERIVADA_NULA.incrementar(derivada_nula)
+        _TIR_BISECCION.incrementar(pasos_biseccion)
+        _TIR_SIN_INTERVALO.incrementar(resueltas)
+    return tir, estado, iteraciones
+
+
+def calcular_van(inversion_inicial, flujos_caja, tasa_descuento, periodos, detalle=True):
+    """
+    Calcula el Valor Actual Neto (VAN)
+
+    Args:
+        inversion_inicial (float): Inversión inicial del proyecto
+        flujos_caja (list): Lista de flujos de caja por período
+        tasa_descuento (float): Tasa de descuento (como decimal)
+        periodos (list): Lista de períodos
+        detalle (bool): Si es False sólo se calcula el VAN, sin flujos
+            descontados ni tabla de detalle
+
+    Returns:
+        tuple: (VAN, flujos_descontados, detalles_calculo); sin detalle los dos
+            últimos son None
+    """
+    if not detalle:
+        if len(flujos_caja) == 0:
+            return -inversion_inicial, None, None
+        van = calcular_van_lote(inversion_inicial, [flujos_caja], tasa_descuento)
+        return float(van[0]), None, None
+
+    if len(flujos_caja) == 0:
+        return -inversion_inicial, [], []
+
+    van, flujos_descontados, factores = calcular_van_lote(
+        inversion_inicial, [flujos_caja], tasa_descuento, detalle=True
+    )
+    flujos_descontados = flujos_descontados[0]
+
+    detalles_calculo = [
+        {
+            'Período': i + 1,
+            'Flujo de Caja': flujo,
+            'Factor de Descuento': factor,
+            'Flujo Descontado': descontado
+        }
+        for i, (flujo, factor, descontado) in enumerate(
+            zip(flujos_caja, factores[0].tolist(), flujos_descontados.tolist())
+        )
+    ]
+
+    return float(van[0]), flujos_descontados.tolist(), detalles_calculo
+
+
+def calcular_tir(inversion_inicial, flujos_caja, max_iter=1000, precision=1e-6):
+    """
+    Calcula la Tasa Interna de Retorno (TIR) usando Newton-Raphson protegido
+    por bisección (ver finanzas.calcular_tir_lote)
+
+    Returns:
+        float | None: TIR por período, o None si los flujos no tienen TIR
+    """
+    if len(flujos_caja) == 0:
+        return None
+
+    tir, estado, _ = calcular_tir_lote(
+        inversion_inicial, [flujos_caja], max_iter=max_iter, precision=precision
+    )
+    if estado[0] != TIR_CONVERGIO:
+        return None
+    return float(tir[0])
+
+
+class _ArbolPrefijos:
+    """Árbol de segmentos con sumas y máximos prefijos para consultas en O(log n)"""
+
+    def __init__(self, valores):
+        self.n = len(valores)
+        self.tam = 1
+        while self.tam < max(1, self.n):
+            self.tam *= 2
+        self.suma = [0.0] * (2 * self.tam)
+        self.max_prefijo = [float('-inf')] * (2 * self.tam)
+        for i, valor in enumerate(valores):
+            self.suma[self.tam + i] = valor
+            self.max_prefijo[self.tam + i] = valor
+        for nodo in range(self.tam - 1, 0, -1):
+            self._recalcular(nodo)
+
+    def _recalcular(self, nodo):
+        izq, der = 2 * nodo, 2 * nodo + 1
+        self.suma[nodo] = self.suma[izq] + self.suma[der]
+        self.max_prefijo[nodo] = max(self.max_prefijo[izq], self.suma[izq] + self.max_prefijo[der])
+
+    @property
+    def total(self):
+        return self.suma[1]
+
+    def actualizar(self, indice, valor):
+        nodo = self.tam + indice
+        self.suma[nodo] = valor
+        self.max_prefijo[nodo] = valor
+        nodo //= 2
+        while nodo:
+            self._recalcular(nodo)
+            nodo //= 2
+
+    def prefijo(self, cantidad):
+        """Suma de los primeros `cantidad` valores"""
+        total = 0.0
+        izq, der = self.tam, self.tam + cantidad
+        while izq < der:
+            if izq & 1:
+                total += self.suma[izq]
+                izq += 1
+            if der & 1:
+                der -= 1
+                total += self.suma[der]
+            izq //= 2
+            der //= 2
+        return total
+
+    def primer_prefijo_mayor(self, umbral):
+        """Menor k tal que la suma de los primeros k valores supera el umbral (o None)"""
+        if self.n == 0 or self.max_prefijo[1] <= umbral:
+            return None
+        nodo, acumulado = 1, 0.0
+        while nodo < self.tam:
+            izq = 2 * nodo
+            if acumulado + self.max_prefijo[izq] > umbral:
+                nodo = izq
+            else:
+                acumulado += self.suma[izq]
+                nodo = izq + 1
+        return nodo - self.tam + 1
+
+
+class ModeloVanIncremental:
+    """
+    Mantiene VAN, flujos acumulados y períodos de recuperación de un proyecto
+    de forma incremental: editar un período cuesta O(log n) en lugar de
+    recalcular todo el proyecto.
+
+    Las salidas derivadas más caras (TIR, tabla de detalle, flujos acumulados
+    completos) se guardan hasta que una edición las invalida. La curva de
+    sensibilidad se actualiza sumando la diferencia de cada edición y se
+    recalcula completa cada EDICIONES_SENSIBILIDAD ediciones para que el error
+    de redondeo no se acumule en sesiones largas.
+    """
+
+    EDICIONES_SENSIBILIDAD = 256
+
+    # Salidas que invalida cada tipo de cambio
+    DEPENDENCIAS = {
+        'flujo': {'tir', 'detalle', 'acumulados'},
+        'inversion': {'tir', 'acumulados'},
+        'tasa': {'detalle'},
+    }
+
+    def __init__(self, inversion_inicial, flujos_caja, tasa_periodo, tasas_sensibilidad=None,
+                 tipo_periodo=None):
+        self.inversion_inicial = float(inversion_inicial)
+        self.tipo_periodo = tipo_periodo
+        self.flujos = np.array(flujos_caja, dtype=float)
+        self.periodos = np.arange(1, len(self.flujos) + 1)
+        self.version = 0
+        self._salidas = {}
+        self._arbol_flujos = _ArbolPrefijos(self.flujos.tolist())
+
+        # Curva de sensibilidad: VAN para cada tasa de prueba (por período)
+        self.tasas_sensibilidad = None
+        self.vans_sensibilidad = None
+        if tasas_sensibilidad is not None:
+            self.tasas_sensibilidad = np.asarray(tasas_sensibilidad, dtype=float)
+            self._descuentos_sensibilidad = 1 / CACHE_FACTORES.matriz(
+                self.tasas_sensibilidad, len(self.flujos), tipo_periodo
+            )
+            self._recalcular_sensibilidad()
+
+        self._fijar_tasa(tasa_periodo)
+
+    @property
+    def num_periodos(self):
+        return len(self.flujos)
+
+    @property
+    def van(self):
+        return self._arbol_descontados.total - self.inversion_inicial
+
+    def _fijar_tasa(self, tasa_periodo):
+        self.tasa_periodo = float(tasa_periodo)
+        self.factores = CACHE_FACTORES.obtener(self.tasa_periodo, len(self.flujos), self.tipo_periodo)
+        self.flujos_descontados = self.flujos / self.factores
+        self._arbol_descontados = _ArbolPrefijos(self.flujos_descontados.tolist())
+
+    def _recalcular_sensibilidad(self):
+        self.vans_sensibilidad = self._descuentos_sensibilidad @ self.flujos - self.inversion_inicial
+        self._ediciones_sensibilidad = 0
+
+    def _editar_sensibilidad(self, delta):
+        """Suma `delta` (escalar o una diferencia por tasa) a la curva de sensibilidad"""
+        if self.vans_sensibilidad is None:
+            return
+        self._ediciones_sensibilidad += 1
+        if self._ediciones_sensibilidad >= self.EDICIONES_SENSIBILIDAD:
+            self._recalcular_sensibilidad()
+        else:
+            self.vans_sensibilidad += delta
+
+    def _invalidar(self, cambio):
+        invalidadas = {nombre for nombre in self.DEPENDENCIAS[cambio] if nombre in self._salidas}
+        for nombre in invalidadas:
+            del self._salidas[nombre]
+        self.version += 1
+        return invalidadas
+
+    def actualizar_flujo(self, indice, valor):
+        """
+        Cambia el flujo de un período (índice desde 0)
+
+        Returns:
+            set: Nombres de las salidas guardadas que quedaron invalidadas
+        """
+        valor = float(valor)
+        anterior = self.flujos[indice]
+        if valor == anterior:
+            return set()
+
+        self.flujos[indice] = valor
+        self.flujos_descontados[indice] = valor / self.factores[indice]
+        self._arbol_flujos.actualizar(indice, valor)
+        self._arbol_descontados.actualizar(indice, self.flujos_descontados[indice])
+        if self.vans_sensibilidad is not None:
+            self._editar_sensibilidad((valor - anterior) * self._descuentos_sensibilidad[:, indice])
+        return self._invalidar('flujo')
+
+    def actualizar_flujos(self, flujos_caja):
+        """
+        Aplica sólo los períodos que cambiaron respecto al estado actual
+
+        Si cambió una fracción grande de los períodos (p. ej. al pegar una
+        columna completa) reconstruye los árboles de una vez, que es más barato
+        que actualizarlos período por período.
+        """
+        flujos_caja = np.asarray(flujos_caja, dtype=float)
+        if flujos_caja.shape != self.flujos.shape:
+            raise ValueError("El número de períodos cambió; crea un modelo nuevo")
+        cambiados = np.flatnonzero(flujos_caja != self.flujos)
+        if len(cambiados) > max(8, len(self.flujos) // 8):
+            self.flujos = flujos_caja.copy()
+            self._arbol_flujos = _ArbolPrefijos(self.flujos.tolist())
+            if self.vans_sensibilidad is not None:
+                self._recalcular_sensibilidad()
+            self._fijar_tasa(self.tasa_periodo)
+            return self._invalidar('flujo')
+
+        invalidadas = set()
+        for indice in cambiados:
+            invalidadas |= self.actualizar_flujo(indice, flujos_caja[indice])
+        return invalidadas
+
+    def actualizar_inversion(self, inversion_inicial):
+        inversion_inicial = float(inversion_inicial)
+        if inversion_inicial == self.inversion_inicial:
+            return set()
+        delta = self.inversion_inicial - inversion_inicial
+        self.inversion_inicial = inversion_inicial
+        self._editar_sensibilidad(delta)
+        return self._invalidar('inversion')
+
+    def actualizar_tasa(self, tasa_periodo):
+        if float(tasa_periodo) == self.tasa_periodo:
+            return set()
+        self._fijar_tasa(tasa_periodo)
+        return self._invalidar('tasa')
+
+    def flujo_acumulado(self, periodo):
+        """Flujo acumulado (incluida la inversión) al cierre de un período"""
+        return self._arbol_flujos.prefijo(periodo) - self.inversion_inicial
+
+    def periodo_recuperacion(self, descontado=False):
+        """Primer período con flujo acumulado positivo, o None si no se recupera"""
+        if -self.inversion_inicial > 0:
+            return 0
+        arbol = self._arbol_descontados if descontado else self._arbol_flujos
+        return arbol.primer_prefijo_mayor(self.inversion_inicial)
+
+    def flujos_acumulados(self):
+        """Flujos acumulados desde el período 0 (inversión) hasta el último"""
+        if 'acumulados' not in self._salidas:
+            self._salidas['acumulados'] = np.cumsum(np.concatenate(([-self.inversion_inicial], self.flujos)))
+        return self._salidas['acumulados']
+
+    def tir(self):
+        """TIR por período, o None si los flujos no tienen TIR (mismos parámetros que calcular_tir)"""
+        if 'tir' not in self._salidas:
+            self._salidas['tir'] = calcular_tir(self.inversion_inicial, self.flujos)
+        return self._salidas['tir']
+
+    def detalle(self):
+        """Tabla de detalle por período como columnas (copias, no cambian con ediciones posteriores)"""
+        if 'detalle' not in self._salidas:
+            self._salidas['detalle'] = {
+                'Período': self.periodos.copy(),
+                'Flujo de Caja': self.flujos.copy(),
+                'Factor de Descuento': np.array(self.factores, dtype=float),
+                'Flujo Descontado': self.flujos_descontados.copy()
+            }
+        return self._salidas['detalle']
@@ -0,0 +1,38 @@
+"""
+Reejecución parcial de las apps de Streamlit
+
+Un fragmento (st.fragment) es un panel que se reejecuta solo cuando cambia uno
+de sus propios widgets, sin volver a correr main(). Sus datos de entrada se
+pasan como argumentos: Streamlit los guarda de la última ejecución completa,
+así que cada panel depende sólo de lo que recibe y de sus widgets.
+
+Los expansores con estado (on_change="rerun") permiten además no calcular el
+contenido de una sección mientras está cerrada.
+"""
+
+
+def decorador_fragmento(st):
+    """st.fragment, st.experimental_fragment en versiones anteriores, o un decorador que no hace nada"""
+    decorador = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    return decorador if decorador is not None else (lambda funcion: funcion)
+
+
+def ejecutar_fragmento(st, panel, *argumentos, **opciones):
+    """Ejecuta `panel(*argumentos, **opciones)` como fragmento"""
+    return decorador_fragmento(st)(panel)(*argumentos, **opciones)
+
+
+def expansor(st, etiqueta, clave, expandido=False):
+    """
+    st.expander que informa si está abierto
+
+    Returns:
+        tuple: (contenedor, abierto). Sin soporte de estado en st.expander
+            (versiones anteriores de Streamlit) `abierto` es siempre True y el contenido se
+            calcula como en un expander normal.
+    """
+    try:
+        contenedor = st.expander(etiqueta, expanded=expandido, key=clave, on_change="rerun")
+    except TypeError:
+        return st.expander(etiqueta, expanded=expandido), True
+    return contenedor, contenedor.open is not False
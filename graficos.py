@@ -0,0 +1,233 @@
+"""
+Trazas de Plotly con carga acotada para horizontes largos y simulaciones grandes
+
+Cada traza envía a lo sumo MAX_PUNTOS puntos al navegador:
+- las series de líneas se reducen con LTTB (Largest-Triangle-Three-Buckets),
+  que conserva la forma visual (picos y valles) con pocos puntos;
+- los histogramas se agrupan en el servidor y se envían como barras (un valor
+  por intervalo en lugar de todas las muestras);
+- las barras por período pasan a una línea reducida cuando son demasiadas.
+
+Por encima de UMBRAL_WEBGL puntos las líneas usan Scattergl (WebGL).
+Plotly se importa al construir la traza, no al importar el módulo.
+
+FabricaFiguras guarda la figura de cada gráfico entre reejecuciones: armar el
+layout (títulos, líneas de referencia con anotaciones) se hace una vez, y un
+cambio de datos sólo reemplaza las trazas.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from almacenamiento import histograma_por_bloques
+from cache_sesion import clave_estable
+from metricas import REGISTRO
+
+MAX_PUNTOS = 2_000
+MAX_BARRAS = 500
+UMBRAL_WEBGL = 1_000
+
+_REUTILIZADAS = REGISTRO.contador('figuras_reutilizadas_total', "Figuras devueltas sin cambios por FabricaFiguras")
+_REEMPLAZADAS = REGISTRO.contador('figuras_trazas_reemplazadas_total', "Figuras a las que sólo se les cambiaron las trazas")
+_ARMADAS = REGISTRO.contador('figuras_armadas_total', "Figuras armadas desde cero (layout y trazas)")
+
+
+def lttb(x, y, n_salida):
+    """
+    Índices de los puntos elegidos por Largest-Triangle-Three-Buckets
+
+    Conserva el primer y el último punto; de cada uno de los n_salida - 2
+    intervalos intermedios elige el punto que forma el triángulo de mayor área
+    con el punto elegido antes y el promedio del intervalo siguiente.
+
+    Returns:
+        np.ndarray: Índices crecientes (todos si n_salida >= len(x))
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(np.int64)
+    indices = np.empty(n_salida, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    elegido = 0
+    for i in range(n_salida - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        # Promedio del intervalo siguiente (el último punto para el último intervalo)
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        x_siguiente = x[fin:siguiente_fin].mean()
+        y_siguiente = y[fin:siguiente_fin].mean()
+
+        areas = np.abs(
+            (x[elegido] - x_siguiente) * (y[inicio:fin] - y[elegido])
+            - (x[elegido] - x[inicio:fin]) * (y_siguiente - y[elegido])
+        )
+        elegido = inicio + int(np.argmax(areas))
+        indices[i + 1] = elegido
+    return indices
+
+
+def reducir_serie(x, y, max_puntos=MAX_PUNTOS):
+    """(x, y) como arreglos, reducidos con LTTB si superan `max_puntos`"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= max_puntos:
+        return x, y
+    indices = lttb(x, y, max_puntos)
+    return x[indices], y[indices]
+
+
+def traza_linea(x, y, max_puntos=MAX_PUNTOS, **opciones):
+    """
+    go.Scatter de una serie, reducida con LTTB y en WebGL si es larga
+
+    Los marcadores de mode='lines+markers' se quitan en series reducidas
+    (dejarían de marcar un punto por período).
+    """
+    import plotly.graph_objects as go
+
+    n_original = len(x)
+    x, y = reducir_serie(x, y, max_puntos)
+    if len(x) < n_original and opciones.get('mode') == 'lines+markers':
+        opciones['mode'] = 'lines'
+    clase = go.Scattergl if n_original > UMBRAL_WEBGL else go.Scatter
+    return clase(x=x, y=y, **opciones)
+
+
+def traza_barras(x, y, color_positivo=None, color_negativo=None, max_barras=MAX_BARRAS, **opciones):
+    """
+    Barras por categoría o período, coloreadas por signo si se indican colores
+
+    Con más de `max_barras` valores se dibujan como área bajo una línea
+    reducida con LTTB (Scattergl), porque las barras no tienen versión WebGL.
+    """
+    import plotly.graph_objects as go
+
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_barras:
+        if color_positivo is not None:
+            opciones['marker_color'] = np.where(y < 0, color_negativo, color_positivo)
+        return go.Bar(x=np.asarray(x), y=y, **opciones)
+
+    x, y = reducir_serie(x, y)
+    return go.Scattergl(x=x, y=y, mode='lines', fill='tozeroy',
+                        line=dict(color=color_positivo, width=1), **opciones)
+
+
+def bordes_histograma(valores, bins=50, rango=None):
+    """
+    Bordes de los intervalos de un histograma
+
+    Para valores enteros los bordes caen en medios enteros y el ancho es
+    entero, así cada barra cubre días o montos completos.
+    """
+    valores = np.asarray(valores)
+    if rango is None:
+        finitos = valores[np.isfinite(valores)] if valores.dtype.kind == 'f' else valores
+        rango = (finitos.min(), finitos.max()) if len(finitos) else (0.0, 1.0)
+    if valores.dtype.kind in 'iu':
+        ancho = max(1, int(np.ceil((rango[1] - rango[0] + 1) / bins)))
+        return np.arange(rango[0] - 0.5, rango[1] + ancho, ancho, dtype=float)
+    return np.histogram_bin_edges([], bins=bins, range=rango)
+
+
+def traza_histograma(valores, bins=50, bordes=None, **opciones):
+    """
+    Histograma agrupado en el servidor como go.Bar (un valor por intervalo)
+
+    Admite arreglos mapeados en disco: el conteo se hace por bloques.
+    """
+    import plotly.graph_objects as go
+
+    valores = np.asarray(valores)
+    if bordes is None:
+        bordes = bordes_histograma(valores, bins)
+    conteos, bordes = histograma_por_bloques(valores, bins=bordes, rango=(bordes[0], bordes[-1]))
+    return go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2,
+        y=conteos,
+        width=np.diff(bordes),
+        **opciones
+    )
+
+
+class FabricaFiguras:
+    """
+    Figuras de Plotly reutilizadas entre reejecuciones, una por gráfico
+
+    - Datos y plantilla iguales a la vez anterior: devuelve la misma figura.
+    - Sólo cambiaron los datos: reemplaza las trazas de la figura guardada,
+      sin volver a armar el layout.
+    - Cambió la plantilla (lo que define el layout): la arma de nuevo.
+
+    Las claves son hashes del contenido (ver cache_sesion.clave_estable).
+    Streamlit valida y serializa la figura en cada st.plotly_chart; lo que se
+    ahorra es armarla.
+    """
+
+    def __init__(self, max_figuras=32):
+        self.max_figuras = max_figuras
+        self.reutilizadas = 0
+        self.reemplazadas = 0
+        self.armadas = 0
+        self._figuras = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, nombre, plantilla, datos, armar, trazas):
+        """
+        Figura del gráfico `nombre` para estos datos
+
+        Args:
+            nombre (str): Gráfico (se guarda una figura por nombre)
+            plantilla: Valores de los que depende el layout (títulos, líneas de referencia)
+            datos: Valores de los que dependen las trazas
+            armar (callable): Sin argumentos; devuelve la go.Figure con el layout, sin trazas
+            trazas (callable): Sin argumentos; devuelve la lista de trazas
+        """
+        clave_plantilla, clave_datos = clave_estable(plantilla), clave_estable(datos)
+        with self._candado:
+            guardada = self._figuras.get(nombre)
+            if guardada is not None:
+                self._figuras.move_to_end(nombre)
+
+        if guardada is not None and guardada[0] == clave_plantilla:
+            figura = guardada[2]
+            if guardada[1] == clave_datos:
+                self.reutilizadas += 1
+                if REGISTRO.habilitado:
+                    _REUTILIZADAS.incrementar()
+                return figura
+            self.reemplazadas += 1
+            if REGISTRO.habilitado:
+                _REEMPLAZADAS.incrementar()
+        else:
+            figura = armar()
+            self.armadas += 1
+            if REGISTRO.habilitado:
+                _ARMADAS.incrementar()
+
+        figura.data = ()
+        figura.add_traces(trazas())
+        with self._candado:
+            self._figuras[nombre] = (clave_plantilla, clave_datos, figura)
+            while len(self._figuras) > self.max_figuras:
+                self._figuras.popitem(last=False)
+        return figura
+
+    def estadisticas(self):
+        return {
+            'figuras': len(self._figuras),
+            'reutilizadas': self.reutilizadas,
+            'reemplazadas': self.reemplazadas,
+            'armadas': self.armadas
+        }
+
+
+def fabrica_de_sesion(st, max_figuras=32, clave='fabrica_figuras'):
+    """FabricaFiguras guardada en st.session_state (una por sesión de usuario)"""
+    if clave not in st.session_state:
+        st.session_state[clave] = FabricaFiguras(max_figuras)
+    return st.session_state[clave]
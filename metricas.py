@@ -0,0 +1,212 @@
+"""
+Registro de métricas en proceso (contadores, histogramas e indicadores)
+
+Las funciones de cálculo sólo actualizan métricas si REGISTRO.habilitado es
+True; deshabilitado (por defecto) el costo es una comparación por llamada.
+
+Activación:
+    METRICAS=1                 habilita el registro al importar
+    METRICAS_PUERTO=9464       además sirve /metrics (Prometheus) y /metrics.json
+    METRICAS_ARCHIVO=ruta      iniciar_desde_entorno() y guardar() escriben ahí
+                               (.json para JSON, cualquier otra extensión para texto Prometheus)
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+PREFIJO = 'fyep_'
+LIMITES_ITERACIONES = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda=''):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.valor = 0
+        self._candado = threading.Lock()
+
+    def incrementar(self, cantidad=1):
+        with self._candado:
+            self.valor += int(cantidad)
+
+    def instantanea(self):
+        return self.valor
+
+    def reiniciar(self):
+        with self._candado:
+            self.valor = 0
+
+    def lineas_prometheus(self):
+        return [f"{PREFIJO}{self.nombre} {self.valor}"]
+
+
+class Histograma:
+    """Histograma con límites fijos (cada intervalo cuenta los valores <= límite)"""
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda='', limites=LIMITES_ITERACIONES):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.limites = np.asarray(sorted(limites), dtype=float)
+        self.conteos = np.zeros(len(self.limites) + 1, dtype=np.int64)
+        self.suma = 0.0
+        self.n = 0
+        self._candado = threading.Lock()
+
+    def observar(self, valores):
+        """Registra uno o muchos valores (en un arreglo) de una vez"""
+        valores = np.asarray(valores, dtype=float).ravel()
+        if len(valores) == 0:
+            return
+        conteos = np.bincount(np.searchsorted(self.limites, valores), minlength=len(self.conteos))
+        with self._candado:
+            self.conteos += conteos
+            self.suma += float(valores.sum())
+            self.n += len(valores)
+
+    def reiniciar(self):
+        with self._candado:
+            self.conteos[:] = 0
+            self.suma = 0.0
+            self.n = 0
+
+    def instantanea(self):
+        return {
+            'n': self.n,
+            'suma': self.suma,
+            'media': self.suma / self.n if self.n else None,
+            'intervalos': {f"{limite:g}": int(c) for limite, c in zip(self.limites, np.cumsum(self.conteos))}
+        }
+
+    def lineas_prometheus(self):
+        acumulados = np.cumsum(self.conteos)
+        lineas = [f'{PREFIJO}{self.nombre}_bucket{{le="{limite:g}"}} {c}'
+                  for limite, c in zip(self.limites, acumulados)]
+        lineas.append(f'{PREFIJO}{self.nombre}_bucket{{le="+Inf"}} {self.n}')
+        lineas.append(f"{PREFIJO}{self.nombre}_sum {self.suma}")
+        lineas.append(f"{PREFIJO}{self.nombre}_count {self.n}")
+        return lineas
+
+
+class Indicador:
+    """Valor calculado al momento de leer las métricas (p. ej. la tasa de aciertos de una cache)"""
+    tipo = 'gauge'
+
+    def __init__(self, nombre, ayuda, funcion):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+
+    def instantanea(self):
+        return float(self.funcion())
+
+    def lineas_prometheus(self):
+        return [f"{PREFIJO}{self.nombre} {self.instantanea()}"]
+
+
+class RegistroMetricas:
+    def __init__(self, habilitado=False):
+        self.habilitado = habilitado
+        self._metricas = {}
+        self._candado = threading.Lock()
+        self._servidor = None
+
+    def _obtener(self, clase, nombre, *argumentos):
+        with self._candado:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = clase(nombre, *argumentos)
+            elif not isinstance(metrica, clase):
+                raise ValueError(f"La métrica {nombre} ya existe con otro tipo")
+            return metrica
+
+    def contador(self, nombre, ayuda=''):
+        return self._obtener(Contador, nombre, ayuda)
+
+    def histograma(self, nombre, ayuda='', limites=LIMITES_ITERACIONES):
+        return self._obtener(Histograma, nombre, ayuda, limites)
+
+    def indicador(self, nombre, ayuda, funcion):
+        return self._obtener(Indicador, nombre, ayuda, funcion)
+
+    def instantanea(self):
+        """Todas las métricas como diccionario serializable a JSON"""
+        return {nombre: metrica.instantanea() for nombre, metrica in sorted(self._metricas.items())}
+
+    def texto_prometheus(self):
+        lineas = []
+        for nombre, metrica in sorted(self._metricas.items()):
+            if metrica.ayuda:
+                lineas.append(f"# HELP {PREFIJO}{nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {PREFIJO}{nombre} {metrica.tipo}")
+            lineas.extend(metrica.lineas_prometheus())
+        return '\n'.join(lineas) + '\n'
+
+    def guardar(self, ruta):
+        """Escribe las métricas en un archivo (.json o texto Prometheus) de forma atómica"""
+        contenido = (json.dumps(self.instantanea(), indent=2) if ruta.endswith('.json')
+                     else self.texto_prometheus())
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+
+    def servir(self, puerto=9464, direccion='127.0.0.1'):
+        """Sirve /metrics y /metrics.json en un hilo de fondo (una sola vez por proceso)"""
+        if self._servidor is not None:
+            return self._servidor
+        registro = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    cuerpo, tipo = json.dumps(registro.instantanea()), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    cuerpo, tipo = registro.texto_prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                datos = cuerpo.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *_):
+                pass
+
+        self._servidor = ThreadingHTTPServer((direccion, puerto), Manejador)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor
+
+    def reiniciar(self):
+        """Pone a cero contadores e histogramas (los indicadores se recalculan al leer)"""
+        for metrica in list(self._metricas.values()):
+            if not isinstance(metrica, Indicador):
+                metrica.reiniciar()
+
+
+# Registro global usado por finanzas, montecarlo y simulador
+REGISTRO = RegistroMetricas(habilitado=bool(os.environ.get('METRICAS')))
+
+
+def habilitar(activo=True):
+    REGISTRO.habilitado = activo
+
+
+def iniciar_desde_entorno():
+    """Arranca el servidor o guarda el archivo según METRICAS_PUERTO / METRICAS_ARCHIVO"""
+    if not REGISTRO.habilitado:
+        return
+    puerto = os.environ.get('METRICAS_PUERTO')
+    if puerto:
+        REGISTRO.servir(int(puerto))
+    ruta = os.environ.get('METRICAS_ARCHIVO')
+    if ruta:
+        REGISTRO.guardar(ruta)
@@ -0,0 +1,425 @@
+import importlib.util
+import warnings
+
+import numpy as np
+
+from estadisticas import ppf_normal, simular_hasta_precision
+from finanzas import calcular_van_lote, calcular_tir_lote
+from metricas import REGISTRO
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# pseudo: muestreo aleatorio simple; antitetico: pares u / 1 - u;
+# control: variable de control con el VAN determinista; hipercubo: hipercubo latino;
+# sobol: secuencia de Sobol aleatorizada (requiere scipy)
+MUESTREADORES = ('pseudo', 'antitetico', 'control', 'hipercubo', 'sobol')
+
+_ESCENARIOS = REGISTRO.contador('montecarlo_escenarios_total', "Escenarios simulados por simular_van")
+
+
+def muestreadores_disponibles():
+    """Muestreadores utilizables en este entorno ('sobol' sólo si scipy está instalado)"""
+    if importlib.util.find_spec('scipy') is None:
+        return tuple(m for m in MUESTREADORES if m != 'sobol')
+    return MUESTREADORES
+
+
+class Distribucion:
+    """Distribución de un flujo de caja o de la tasa de descuento"""
+
+    TIPOS = ('constante', 'normal', 'triangular', 'lognormal')
+
+    def __init__(self, tipo, *parametros):
+        if tipo not in self.TIPOS:
+            raise ValueError(f"Tipo de distribución desconocido: {tipo}")
+        self.tipo = tipo
+        self.parametros = tuple(float(p) for p in parametros)
+
+    @classmethod
+    def constante(cls, valor):
+        return cls('constante', valor)
+
+    @classmethod
+    def normal(cls, media, desviacion):
+        return cls('normal', media, desviacion)
+
+    @classmethod
+    def triangular(cls, minimo, moda, maximo):
+        return cls('triangular', minimo, moda, maximo)
+
+    @classmethod
+    def lognormal(cls, media, desviacion):
+        """Lognormal definida por la media y desviación del propio flujo (no del logaritmo)"""
+        return cls('lognormal', media, desviacion)
+
+    def parametros_log(self):
+        """(mu, sigma) del logaritmo para una lognormal"""
+        media, desviacion = self.parametros
+        sigma2 = np.log1p((desviacion / media) ** 2)
+        return np.log(media) - sigma2 / 2, np.sqrt(sigma2)
+
+    def media(self):
+        if self.tipo == 'triangular':
+            return sum(self.parametros) / 3
+        return self.parametros[0]
+
+    def muestrear(self, rng, n):
+        return muestrear_flujos([self], n, rng)[:, 0]
+
+    def transformar(self, uniformes):
+        return transformar_uniformes([self], np.asarray(uniformes)[:, None])[:, 0]
+
+    def __repr__(self):
+        return f"Distribucion({self.tipo!r}, {', '.join(map(str, self.parametros))})"
+
+
+def como_distribucion(valor):
+    """Convierte un número en una distribución constante"""
+    return valor if isinstance(valor, Distribucion) else Distribucion.constante(valor)
+
+
+def flujos_inciertos(flujos_caja, tipo, variacion):
+    """
+    Convierte flujos fijos en distribuciones centradas en cada flujo
+
+    Args:
+        flujos_caja (list): Flujos de caja deterministas
+        tipo (str): 'normal', 'triangular' o 'lognormal'
+        variacion (float): Desviación (o semiancho en la triangular) relativa al flujo
+
+    Los flujos nulos quedan constantes y los negativos usan una normal en lugar
+    de una lognormal.
+    """
+    distribuciones = []
+    for flujo in flujos_caja:
+        dispersion = abs(flujo) * variacion
+        if dispersion == 0:
+            distribuciones.append(Distribucion.constante(flujo))
+        elif tipo == 'triangular':
+            distribuciones.append(Distribucion.triangular(flujo - dispersion, flujo, flujo + dispersion))
+        elif tipo == 'lognormal' and flujo > 0:
+            distribuciones.append(Distribucion.lognormal(flujo, dispersion))
+        else:
+            distribuciones.append(Distribucion.normal(flujo, dispersion))
+    return distribuciones
+
+
+def muestrear_flujos(distribuciones, n_escenarios, rng):
+    """
+    Genera una matriz escenarios x períodos con una muestra por escenario
+
+    Las columnas del mismo tipo de distribución se generan juntas en una sola
+    llamada al generador.
+    """
+    distribuciones = [como_distribucion(d) for d in distribuciones]
+    muestras = np.empty((n_escenarios, len(distribuciones)))
+
+    for tipo in Distribucion.TIPOS:
+        columnas = [i for i, d in enumerate(distribuciones) if d.tipo == tipo]
+        if not columnas:
+            continue
+        parametros = np.array([distribuciones[i].parametros for i in columnas]).T
+        tamano = (n_escenarios, len(columnas))
+
+        if tipo == 'constante':
+            muestras[:, columnas] = parametros[0]
+        elif tipo == 'normal':
+            muestras[:, columnas] = rng.normal(parametros[0], parametros[1], tamano)
+        elif tipo == 'triangular':
+            muestras[:, columnas] = rng.triangular(parametros[0], parametros[1], parametros[2], tamano)
+        else:
+            mu, sigma = zip(*(distribuciones[i].parametros_log() for i in columnas))
+            muestras[:, columnas] = rng.lognormal(np.array(mu), np.array(sigma), tamano)
+
+    return muestras
+
+
+def muestrear_uniformes(muestreador, n_escenarios, dimension, rng):
+    """Matriz escenarios x dimensión de uniformes en (0, 1) según el muestreador"""
+    if muestreador == 'antitetico':
+        mitad = rng.random(((n_escenarios + 1) // 2, dimension))
+        uniformes = np.concatenate((mitad, 1 - mitad))[:n_escenarios]
+    elif muestreador == 'hipercubo':
+        # Un estrato por escenario en cada dimensión, en orden aleatorio independiente
+        estratos = rng.permuted(np.tile(np.arange(n_escenarios), (dimension, 1)), axis=1).T
+        uniformes = (estratos + rng.random((n_escenarios, dimension))) / n_escenarios
+    elif muestreador == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError as error:
+            raise ImportError("El muestreador 'sobol' requiere scipy (pip install scipy)") from error
+        with warnings.catch_warnings():
+            # Sobol advierte si n no es potencia de 2; sigue siendo válido
+            warnings.simplefilter('ignore', UserWarning)
+            uniformes = qmc.Sobol(dimension, scramble=True, seed=rng).random(n_escenarios)
+    elif muestreador in ('pseudo', 'control'):
+        uniformes = rng.random((n_escenarios, dimension))
+    else:
+        raise ValueError(f"Muestreador desconocido: {muestreador}")
+
+    return np.clip(uniformes, np.finfo(float).tiny, 1 - np.finfo(float).epsneg)
+
+
+def transformar_uniformes(distribuciones, uniformes):
+    """Aplica la inversa de la función de distribución de cada columna"""
+    distribuciones = [como_distribucion(d) for d in distribuciones]
+    muestras = np.empty_like(uniformes)
+
+    for tipo in Distribucion.TIPOS:
+        columnas = [i for i, d in enumerate(distribuciones) if d.tipo == tipo]
+        if not columnas:
+            continue
+        parametros = np.array([distribuciones[i].parametros for i in columnas]).T
+        u = uniformes[:, columnas]
+
+        if tipo == 'constante':
+            muestras[:, columnas] = parametros[0]
+        elif tipo == 'normal':
+            muestras[:, columnas] = parametros[0] + parametros[1] * ppf_normal(u)
+        elif tipo == 'triangular':
+            minimo, moda, maximo = parametros
+            ancho = maximo - minimo
+            corte = np.divide(moda - minimo, ancho, out=np.zeros_like(ancho), where=ancho > 0)
+            muestras[:, columnas] = np.where(
+                u < corte,
+                minimo + np.sqrt(u * ancho * (moda - minimo)),
+                maximo - np.sqrt((1 - u) * ancho * (maximo - moda))
+            )
+        else:
+            mu, sigma = zip(*(distribuciones[i].parametros_log() for i in columnas))
+            muestras[:, columnas] = np.exp(np.array(mu) + np.array(sigma) * ppf_normal(u))
+
+    return muestras
+
+
+def _muestrear_escenarios(flujos, tasa, n_escenarios, rng, muestreador):
+    """Muestras de flujos (escenarios x períodos) y tasas según el muestreador"""
+    tasa_incierta = isinstance(tasa, Distribucion)
+    if muestreador in ('pseudo', 'control'):
+        muestras = muestrear_flujos(flujos, n_escenarios, rng)
+        tasas = tasa.muestrear(rng, n_escenarios) if tasa_incierta else tasa
+        return muestras, tasas
+
+    distribuciones = list(flujos) + ([tasa] if tasa_incierta else [])
+    uniformes = muestrear_uniformes(muestreador, n_escenarios, len(distribuciones), rng)
+    muestras = transformar_uniformes(distribuciones, uniformes)
+    if tasa_incierta:
+        return muestras[:, :-1], muestras[:, -1]
+    return muestras, tasa
+
+
+def _media_y_error(unidades):
+    """Media de unidades independientes y su error estándar"""
+    unidades = np.asarray(unidades, dtype=float)
+    if len(unidades) < 2:
+        return float(unidades.mean()), None
+    return float(unidades.mean()), float(unidades.std(ddof=1) / np.sqrt(len(unidades)))
+
+
+def resumir_simulacion(vans, tirs=None, percentiles=PERCENTILES, estimaciones=None):
+    """
+    Resume la distribución simulada del VAN (y de la TIR si se calculó)
+
+    `estimaciones` permite reemplazar la media, P(VAN<0) y sus errores por los de
+    un estimador con reducción de varianza.
+    """
+    vans = np.asarray(vans)
+    n = len(vans)
+    prob_negativo = float(np.mean(vans < 0))
+
+    resumen = {
+        'escenarios': n,
+        'van_medio': float(vans.mean()),
+        'error_van_medio': float(vans.std(ddof=1) / np.sqrt(n)) if n > 1 else None,
+        'van_desviacion': float(vans.std(ddof=1)) if n > 1 else 0.0,
+        'prob_van_negativo': prob_negativo,
+        'error_prob_van_negativo': float(np.sqrt(prob_negativo * (1 - prob_negativo) / n)),
+        'percentiles_van': dict(zip(percentiles, np.percentile(vans, percentiles).tolist())),
+        'vans': vans
+    }
+    if estimaciones:
+        resumen.update(estimaciones)
+
+    if tirs is not None:
+        tirs = np.asarray(tirs)
+        validas = tirs[~np.isnan(tirs)]
+        resumen['tir_no_calculable'] = 1 - len(validas) / n
+        resumen['tir_media'] = float(validas.mean()) if len(validas) else None
+        resumen['percentiles_tir'] = (
+            dict(zip(percentiles, np.percentile(validas, percentiles).tolist())) if len(validas) else {}
+        )
+        resumen['tirs'] = tirs
+
+    return resumen
+
+
+def simular_van(inversion_inicial, flujos, tasa, n_escenarios, semilla=None, incluir_tir=True,
+                tam_bloque=100_000, percentiles=PERCENTILES, tipo_periodo=None,
+                muestreador='pseudo', replicas=8):
+    """
+    Simulación Monte Carlo del VAN con flujos (y tasa) inciertos
+
+    Args:
+        inversion_inicial (float): Inversión inicial del proyecto
+        flujos (list): Un flujo por período: número fijo o Distribucion
+        tasa (float | Distribucion): Tasa de descuento por período
+        n_escenarios (int): Número de escenarios a simular
+        semilla (int | np.random.Generator): Semilla para reproducir la simulación
+        incluir_tir (bool): Calcular también la TIR de cada escenario
+        tam_bloque (int): Escenarios generados por bloque (acota la memoria)
+        tipo_periodo (str): Tipo de período de la tasa fija (clave de la cache de factores)
+        muestreador (str): Uno de MUESTREADORES
+        replicas (int): Aleatorizaciones independientes para 'hipercubo' y 'sobol',
+            necesarias para estimar el error
+
+    Returns:
+        dict: Resumen de la distribución del VAN/TIR (ver resumir_simulacion)
+    """
+    if muestreador not in MUESTREADORES:
+        raise ValueError(f"Muestreador desconocido: {muestreador}")
+
+    rng = np.random.default_rng(semilla)
+    vans = np.empty(n_escenarios)
+    tirs = np.empty(n_escenarios) if incluir_tir else None
+    controles = np.empty(n_escenarios) if muestreador == 'control' else None
+    unidades_van, unidades_prob = [], []
+
+    if muestreador in ('hipercubo', 'sobol'):
+        # Cada bloque es una aleatorización independiente del diseño completo
+        tam_bloque = -(-n_escenarios // max(1, replicas))
+    elif muestreador == 'antitetico':
+        tam_bloque += tam_bloque % 2
+
+    for inicio in range(0, n_escenarios, tam_bloque):
+        fin = min(inicio + tam_bloque, n_escenarios)
+        muestras, tasas = _muestrear_escenarios(flujos, tasa, fin - inicio, rng, muestreador)
+
+        vans[inicio:fin] = calcular_van_lote(inversion_inicial, muestras, tasas, tipo_periodo=tipo_periodo)
+        if incluir_tir:
+            tirs[inicio:fin], _, _ = calcular_tir_lote(inversion_inicial, muestras)
+
+        bloque = vans[inicio:fin]
+        if muestreador == 'control':
+            # El VAN a la tasa media es lineal en los flujos: su media exacta es el VAN determinista
+            tasa_media = tasa.media() if isinstance(tasa, Distribucion) else tasa
+            controles[inicio:fin] = (
+                calcular_van_lote(inversion_inicial, muestras, tasa_media, tipo_periodo=tipo_periodo)
+                if isinstance(tasa, Distribucion) else bloque
+            )
+        elif muestreador == 'antitetico':
+            # muestrear_uniformes ordena el bloque como [u, 1 - u]: con un bloque
+            # impar la fila u central (índice n // 2) queda sin pareja
+            mitad, centro = len(bloque) // 2, (len(bloque) + 1) // 2
+            pares = (bloque[:mitad] + bloque[centro:]) / 2
+            pares_prob = ((bloque[:mitad] < 0).astype(float) + (bloque[centro:] < 0)) / 2
+            unidades_van.append(np.concatenate((pares, bloque[mitad:centro])))
+            unidades_prob.append(np.concatenate((pares_prob, bloque[mitad:centro] < 0)))
+        elif muestreador in ('hipercubo', 'sobol'):
+            unidades_van.append([bloque.mean()])
+            unidades_prob.append([np.mean(bloque < 0)])
+
+    estimaciones = {'muestreador': muestreador}
+    if muestreador == 'control':
+        media_control = float(calcular_van_lote(
+            inversion_inicial, [[como_distribucion(f).media() for f in flujos]],
+            tasa.media() if isinstance(tasa, Distribucion) else tasa
+        )[0])
+        for clave, valores in (('van_medio', vans), ('prob_van_negativo', (vans < 0).astype(float))):
+            covarianza = np.cov(valores, controles)
+            beta = covarianza[0, 1] / covarianza[1, 1] if covarianza[1, 1] > 0 else 0.0
+            estimaciones[clave], estimaciones[f'error_{clave}'] = _media_y_error(
+                valores - beta * (controles - media_control)
+            )
+    elif unidades_van:
+        estimaciones['van_medio'], estimaciones['error_van_medio'] = _media_y_error(
+            np.concatenate(unidades_van)
+        )
+        estimaciones['prob_van_negativo'], estimaciones['error_prob_van_negativo'] = _media_y_error(
+            np.concatenate(unidades_prob)
+        )
+
+    if REGISTRO.habilitado:
+        _ESCENARIOS.incrementar(n_escenarios)
+    return resumir_simulacion(vans, tirs, percentiles, estimaciones)
+
+
+def comparar_muestreadores(inversion_inicial, flujos, tasa, n_escenarios, repeticiones=20,
+                           muestreadores=None, semilla=None, tipo_periodo=None):
+    """
+    Compara la varianza de los estimadores de cada muestreador contra el muestreo simple
+
+    Cada muestreador se ejecuta `repeticiones` veces con semillas independientes
+    y se mide la varianza empírica de P(VAN<0) y del VAN medio. Sin
+    `muestreadores` se comparan todos los disponibles en el entorno.
+
+    Returns:
+        list: Un diccionario por muestreador con varianzas, factor de reducción
+            y escenarios de muestreo simple equivalentes
+    """
+    if muestreadores is None:
+        muestreadores = muestreadores_disponibles()
+    semillas = np.random.SeedSequence(semilla).spawn(len(muestreadores) * repeticiones)
+    estimaciones = {}
+    for i, muestreador in enumerate(muestreadores):
+        resultados = [
+            simular_van(inversion_inicial, flujos, tasa, n_escenarios,
+                        semilla=np.random.default_rng(semillas[i * repeticiones + j]),
+                        incluir_tir=False, tipo_periodo=tipo_periodo, muestreador=muestreador)
+            for j in range(repeticiones)
+        ]
+        estimaciones[muestreador] = (
+            np.var([r['prob_van_negativo'] for r in resultados], ddof=1),
+            np.var([r['van_medio'] for r in resultados], ddof=1),
+            float(np.mean([r['prob_van_negativo'] for r in resultados]))
+        )
+
+    var_prob_base, var_van_base, _ = estimaciones.get('pseudo', next(iter(estimaciones.values())))
+    reporte = []
+    for muestreador, (var_prob, var_van, prob) in estimaciones.items():
+        reduccion_prob = var_prob_base / var_prob if var_prob > 0 else float('inf')
+        reduccion_van = var_van_base / var_van if var_van > 0 else float('inf')
+        reporte.append({
+            'muestreador': muestreador,
+            'prob_van_negativo': prob,
+            'varianza_prob': float(var_prob),
+            'varianza_van_medio': float(var_van),
+            'reduccion_prob': float(reduccion_prob),
+            'reduccion_van_medio': float(reduccion_van),
+            'escenarios_equivalentes': float(n_escenarios * reduccion_prob)
+        })
+    return reporte
+
+
+def simular_van_adaptativo(inversion_inicial, flujos, tasa, objetivo='van_medio', precision_relativa=0.005,
+                           precision_absoluta=None, confianza=0.95, tam_bloque=20_000,
+                           max_escenarios=1_000_000, semilla=None, tipo_periodo=None):
+    """
+    Simula escenarios por bloques hasta que la estimación alcanza la precisión pedida
+
+    Args:
+        objetivo (str): 'van_medio' o 'prob_van_negativo'
+        precision_relativa (float): Semiancho máximo relativo del intervalo
+        precision_absoluta (float): Semiancho máximo absoluto (recomendado para
+            'prob_van_negativo', p. ej. 0.005 = ±0.5 puntos)
+        max_escenarios (int): Presupuesto máximo de escenarios
+
+    Returns:
+        dict: Resultado de estadisticas.simular_hasta_precision
+    """
+    if objetivo not in ('van_medio', 'prob_van_negativo'):
+        raise ValueError(f"Objetivo desconocido: {objetivo}")
+
+    def generar_bloque(rng, n):
+        muestras, tasas = _muestrear_escenarios(flujos, tasa, n, rng, 'pseudo')
+        vans = calcular_van_lote(inversion_inicial, muestras, tasas, tipo_periodo=tipo_periodo)
+        return vans if objetivo == 'van_medio' else (vans < 0).astype(float)
+
+    return simular_hasta_precision(
+        generar_bloque,
+        precision_relativa=precision_relativa,
+        precision_absoluta=precision_absoluta,
+        confianza=confianza,
+        tam_bloque=tam_bloque,
+        max_muestras=max_escenarios,
+        semilla=semilla
+    )
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from montecarlo import resumir_simulacion, simular_van
+from simulador import SimuladorProyectos
+
+
+def particionar_trabajo(n_total, tam_bloque, semilla):
+    """
+    Divide el trabajo en bloques de tamaño fijo con una semilla independiente cada uno
+
+    Los bloques y sus semillas dependen sólo de n_total, tam_bloque y la semilla,
+    nunca del número de procesos: así el resultado es el mismo con 1 o con N procesos.
+    Sin trabajo devuelve un único bloque vacío, para que el resultado tenga la misma
+    forma que el de la versión serie con n_total=0.
+    """
+    tamanos = [min(tam_bloque, n_total - inicio) for inicio in range(0, n_total, tam_bloque)] or [0]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    return list(zip(tamanos, semillas))
+
+
+def _ejecutar(funcion, tareas, max_workers):
+    """Ejecuta las tareas en orden, en un pool de procesos si hay más de un proceso"""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tareas))
+    if max_workers <= 1:
+        return [funcion(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(funcion, tareas))
+
+
+def _bloque_meses(tarea):
+    n_meses, semilla, cantidad_proyectos, duracion_promedio = tarea
+    return SimuladorProyectos().generar_meses(n_meses, cantidad_proyectos, duracion_promedio, semilla=semilla)
+
+
+def _bloque_acumulado(tarea):
+    simulador = SimuladorProyectos()
+    n_meses, semilla, cantidad_proyectos, duracion_promedio = tarea
+    return simulador.acumular_meses(
+        simulador.generar_meses(n_meses, cantidad_proyectos, duracion_promedio, semilla=semilla)
+    )
+
+
+def _bloque_escenarios(tarea):
+    n_escenarios, semilla, inversion_inicial, flujos, tasa, incluir_tir, tipo_periodo = tarea
+    resultado = simular_van(inversion_inicial, flujos, tasa, n_escenarios, semilla=semilla,
+                            incluir_tir=incluir_tir, tipo_periodo=tipo_periodo)
+    return resultado['vans'], resultado.get('tirs')
+
+
+def simular_meses_paralelo(n_meses, cantidad_proyectos, duracion_promedio=None, semilla=None,
+                           max_workers=None, tam_bloque=50_000):
+    """
+    Genera meses con SimuladorProyectos.generar_meses repartidos entre procesos
+
+    Cada proceso devuelve sólo arreglos NumPy por columna; se concatenan en el
+    orden de los bloques.
+
+    Args:
+        max_workers (int): Procesos a usar (por defecto todos los núcleos)
+        tam_bloque (int): Meses por bloque; junto con la semilla fija el resultado
+
+    Returns:
+        dict: Mismas columnas que generar_meses
+    """
+    tareas = [(n, s, cantidad_proyectos, duracion_promedio)
+              for n, s in particionar_trabajo(n_meses, tam_bloque, semilla)]
+    bloques = _ejecutar(_bloque_meses, tareas, max_workers)
+    return {columna: np.concatenate([b[columna] for b in bloques]) for columna in bloques[0]}
+
+
+def resumir_meses_paralelo(n_meses, cantidad_proyectos, duracion_promedio=None, semilla=None,
+                           max_workers=None, tam_bloque=50_000):
+    """
+    Como procesamiento.resumir_meses pero repartido entre procesos
+
+    Cada proceso devuelve sólo sus acumuladores (tamaño fijo), no los meses.
+
+    Returns:
+        dict: Acumuladores de SimuladorProyectos.acumular_meses
+    """
+    tareas = [(n, s, cantidad_proyectos, duracion_promedio)
+              for n, s in particionar_trabajo(n_meses, tam_bloque, semilla)]
+    parciales = _ejecutar(_bloque_acumulado, tareas, max_workers)
+    acumuladores = parciales[0]
+    for otros in parciales[1:]:
+        SimuladorProyectos.combinar_acumuladores(acumuladores, otros)
+    return acumuladores
+
+
+def simular_van_paralelo(inversion_inicial, flujos, tasa, n_escenarios, semilla=None, incluir_tir=False,
+                         max_workers=None, tam_bloque=100_000, tipo_periodo=None):
+    """
+    Simulación Monte Carlo del VAN (muestreo simple) repartida entre procesos
+
+    Returns:
+        dict: Resumen de la distribución del VAN/TIR (ver montecarlo.resumir_simulacion)
+    """
+    tareas = [(n, s, inversion_inicial, flujos, tasa, incluir_tir, tipo_periodo)
+              for n, s in particionar_trabajo(n_escenarios, tam_bloque, semilla)]
+    bloques = _ejecutar(_bloque_escenarios, tareas, max_workers)
+    vans = np.concatenate([vans for vans, _ in bloques])
+    tirs = np.concatenate([tirs for _, tirs in bloques]) if incluir_tir else None
+    return resumir_simulacion(vans, tirs)
@@ -0,0 +1,189 @@
+import numpy as np
+
+from almacenamiento import abrir_escritor, crear_resultados_mapeados
+from estadisticas import AcumuladorEstadistico
+from finanzas import calcular_tir_lote, calcular_van_lote
+from montecarlo import Distribucion, muestrear_flujos
+from paralelo import particionar_trabajo
+from simulador import SimuladorProyectos
+
+
+def iterar_bloques_meses(n_meses, cantidad_proyectos, duracion_promedio=None, tam_bloque=50_000,
+                         semilla=None, simulador=None):
+    """
+    Genera los meses bloque a bloque sin guardarlos todos en memoria
+
+    Usa los mismos bloques y semillas que paralelo.simular_meses_paralelo, así
+    que ambos caminos producen los mismos meses para la misma semilla.
+
+    Yields:
+        tuple: (índice del primer mes del bloque, columnas de generar_meses)
+    """
+    simulador = simulador or SimuladorProyectos()
+    inicio = 0
+    for n, semilla_bloque in particionar_trabajo(n_meses, tam_bloque, semilla):
+        yield inicio, simulador.generar_meses(n, cantidad_proyectos, duracion_promedio, semilla=semilla_bloque)
+        inicio += n
+
+
+def agregar_meses(meses, inicio=0):
+    """Resumen por mes de un bloque de generar_meses (una fila por mes)"""
+    ingresos = meses['monto'].sum(axis=1)
+    ganancias = meses['ganancia'].sum(axis=1)
+    total_dias = meses['duracion'].sum(axis=1)
+    cantidad = meses['monto'].shape[1]
+    return {
+        'mes': np.arange(inicio, inicio + len(ingresos)),
+        'proyectos': np.full(len(ingresos), cantidad),
+        'total_dias': total_dias,
+        'ingresos': ingresos,
+        'ganancias': ganancias,
+        'margen_promedio': np.round(np.divide(ganancias * 100, ingresos, out=np.zeros(len(ingresos)),
+                                              where=ingresos > 0), 1),
+        'duracion_promedio': np.round(total_dias / cantidad, 1)
+    }
+
+
+def proyectos_por_fila(meses, inicio=0):
+    """Aplana un bloque de generar_meses a una fila por proyecto"""
+    n_meses, cantidad = meses['monto'].shape
+    return {
+        'mes': np.repeat(np.arange(inicio, inicio + n_meses), cantidad),
+        **{columna: valores.ravel() for columna, valores in meses.items()}
+    }
+
+
+def iterar_resumenes(n_meses, cantidad_proyectos, duracion_promedio=None, tam_bloque=50_000,
+                     semilla=None, detalle=False):
+    """
+    Encadena generación y agregación: produce bloques listos para escribir
+
+    Args:
+        detalle (bool): True para una fila por proyecto, False para una fila por mes
+    """
+    for inicio, meses in iterar_bloques_meses(n_meses, cantidad_proyectos, duracion_promedio,
+                                              tam_bloque, semilla):
+        yield proyectos_por_fila(meses, inicio) if detalle else agregar_meses(meses, inicio)
+
+
+def resumir_meses(n_meses, cantidad_proyectos, duracion_promedio=None, tam_bloque=50_000, semilla=None):
+    """
+    Estadísticas de muchos meses simulados con memoria constante
+
+    Returns:
+        dict: Acumuladores de SimuladorProyectos.acumular_meses
+    """
+    simulador = SimuladorProyectos()
+    acumuladores = None
+    for _, meses in iterar_bloques_meses(n_meses, cantidad_proyectos, duracion_promedio,
+                                         tam_bloque, semilla, simulador):
+        acumuladores = simulador.acumular_meses(meses, acumuladores)
+    return acumuladores
+
+
+def procesar_meses_a_disco(ruta, n_meses, cantidad_proyectos, duracion_promedio=None, tam_bloque=50_000,
+                           semilla=None, detalle=False, formato=None):
+    """
+    Simula meses y los escribe a CSV o Parquet bloque a bloque con memoria acotada
+
+    Returns:
+        dict: Filas escritas y estadísticas del ingreso mensual acumuladas en el camino
+    """
+    ingresos = AcumuladorEstadistico()
+    with abrir_escritor(ruta, formato) as escritor:
+        for bloque in iterar_resumenes(n_meses, cantidad_proyectos, duracion_promedio,
+                                       tam_bloque, semilla, detalle):
+            if detalle:
+                ingresos.actualizar(np.bincount(bloque['mes'] - bloque['mes'][0], weights=bloque['monto']))
+            else:
+                ingresos.actualizar(bloque['ingresos'])
+            escritor.escribir(bloque)
+
+    return {
+        'ruta': ruta,
+        'filas': escritor.filas,
+        'meses': ingresos.n,
+        'ingreso_medio': float(ingresos.media),
+        'ingreso_desviacion': ingresos.desviacion,
+        'ingreso_cuantiles': dict(zip((0.05, 0.5, 0.95), ingresos.cuantiles((0.05, 0.5, 0.95)).tolist()))
+    }
+
+
+def simular_van_a_disco(directorio, inversion_inicial, flujos, tasa, n_escenarios, semilla=None,
+                        incluir_tir=False, guardar_flujos=False, tam_bloque=100_000, tipo_periodo=None):
+    """
+    Simulación Monte Carlo del VAN con resultados en arreglos mapeados a disco
+
+    Genera los mismos escenarios que paralelo.simular_van_paralelo para la misma
+    semilla y tamaño de bloque. Los resultados se reabren con
+    almacenamiento.abrir_resultados sin recalcular.
+
+    Args:
+        guardar_flujos (bool): Guardar también la matriz escenarios x períodos
+
+    Returns:
+        dict: Arreglos mapeados 'van' (y 'tir', 'flujos' si se pidieron)
+    """
+    campos = {'van': ((n_escenarios,), 'f8')}
+    if incluir_tir:
+        campos['tir'] = ((n_escenarios,), 'f8')
+    if guardar_flujos:
+        campos['flujos'] = ((n_escenarios, len(flujos)), 'f8')
+    resultados = crear_resultados_mapeados(directorio, campos, {
+        'simulacion': 'van',
+        'inversion_inicial': inversion_inicial,
+        'flujos': [repr(f) for f in flujos],
+        'tasa': repr(tasa),
+        'semilla': semilla,
+        'tam_bloque': tam_bloque
+    })
+
+    inicio = 0
+    for n, semilla_bloque in particionar_trabajo(n_escenarios, tam_bloque, semilla):
+        rng = np.random.default_rng(semilla_bloque)
+        muestras = muestrear_flujos(flujos, n, rng)
+        tasas = tasa.muestrear(rng, n) if isinstance(tasa, Distribucion) else tasa
+        resultados['van'][inicio:inicio + n] = calcular_van_lote(
+            inversion_inicial, muestras, tasas, tipo_periodo=tipo_periodo
+        )
+        if incluir_tir:
+            resultados['tir'][inicio:inicio + n] = calcular_tir_lote(inversion_inicial, muestras)[0]
+        if guardar_flujos:
+            resultados['flujos'][inicio:inicio + n] = muestras
+        inicio += n
+
+    for arreglo in resultados.values():
+        arreglo.flush()
+    return resultados
+
+
+def simular_ingresos_a_disco(directorio, n_meses, cantidad_proyectos, duracion_promedio=None,
+                             tam_bloque=50_000, semilla=None):
+    """
+    Simula meses y guarda ingresos, ganancias y días por mes en arreglos mapeados a disco
+
+    Returns:
+        dict: Arreglos mapeados 'ingresos', 'ganancias' y 'total_dias'
+    """
+    resultados = crear_resultados_mapeados(directorio, {
+        'ingresos': ((n_meses,), 'i8'),
+        'ganancias': ((n_meses,), 'i8'),
+        'total_dias': ((n_meses,), 'i4')
+    }, {
+        'simulacion': 'ingresos',
+        'cantidad_proyectos': cantidad_proyectos,
+        'duracion_promedio': duracion_promedio,
+        'semilla': semilla,
+        'tam_bloque': tam_bloque
+    })
+
+    for inicio, meses in iterar_bloques_meses(n_meses, cantidad_proyectos, duracion_promedio,
+                                              tam_bloque, semilla):
+        fin = inicio + len(meses['monto'])
+        resultados['ingresos'][inicio:fin] = meses['monto'].sum(axis=1)
+        resultados['ganancias'][inicio:fin] = meses['ganancia'].sum(axis=1)
+        resultados['total_dias'][inicio:fin] = meses['duracion'].sum(axis=1)
+
+    for arreglo in resultados.values():
+        arreglo.flush()
+    return resultados
@@ -1,327 +1,372 @@
-import streamlit as st
-import pandas as pd
-import random
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
 
-class ProyectoHidraulico:
-    def __init__(self, nombre, cliente, duracion, monto):
-        self.nombre = nombre
-        self.cliente = cliente
-        self.duracion = duracion  # en días
-        self.monto = monto
-        self.ganancia = self.calcular_ganancia()
-        self.margen = round((self.ganancia / self.monto) * 100, 1) if self.monto > 0 else 0
-    
-    def calcular_ganancia(self):
-        # Margen de ganancia entre 20-35%
-        margen_porcentaje = random.uniform(20, 35)
-        return round(self.monto * margen_porcentaje / 100)
+from cache_sesion import cache_de_sesion
+from diagnostico import de_fragmento, iniciar as iniciar_diagnostico, mostrar_panel as mostrar_diagnostico
+from fragmentos import ejecutar_fragmento, expansor
+from graficos import MAX_BARRAS, bordes_histograma, fabrica_de_sesion, traza_barras, traza_histograma
+from metricas import iniciar_desde_entorno as iniciar_metricas
+from simulador import (
+    ProyectoHidraulico, FilaProyecto, TablaProyectos, SimuladorProyectos,
+    correlacion_lote, duraciones_logica_antigua, analizar_duraciones_lote
+)
 
-class SimuladorProyectos:
-    def __init__(self):
-        self.proyectos = []
-        self.dias_mes = 30
-        self.margen_dias = 7  # ±7 días de margen
-        
-        # Datos reales de la tabla original (enero-marzo 2025)
-        self.datos_reales = {
-            'proyectos': [
-                {'nombre': 'Reparación de unidad hidráulica de freno de molino SAG', 'cliente': 'Minera Colquiria S.A.', 'monto': 12800, 'estado': 'Finalizado'},
-                {'nombre': 'Fabricación de manifold hidráulico para sistema de izaje', 'cliente': 'Constructora San José S.A.', 'monto': 9450, 'estado': 'Finalizado'},
-                {'nombre': 'Proyecto de Reparación de Camión Lubricador', 'cliente': 'Transporte Pesado Cruz del Sur', 'monto': 5000, 'estado': 'Finalizado'},
-                {'nombre': 'Proyecto de Mantenimiento Neumático Industrial', 'cliente': 'Cementos Pacasmayo S.A.A.', 'monto': 4500, 'estado': 'Finalizado'},
-                {'nombre': 'Mantenimiento de central hidráulica móvil (chasis y válvulas)', 'cliente': 'Cosapi Minería S.A.C', 'monto': 7300, 'estado': 'Finalizado'},
-                {'nombre': 'Reparación de gato hidráulico de 30T – Sucursal Zárate', 'cliente': 'Maestro Perú S.A. (SJL)', 'monto': 2700, 'estado': 'Entregado'},
-                {'nombre': 'Suministro de unidad hidráulica para sistema de refrigeración de prensa', 'cliente': 'Minera Aurífera Retamas S.A.', 'monto': 14200, 'estado': 'En ejecución'},
-                {'nombre': 'Diagnóstico y prueba de banco de válvulas direccionales', 'cliente': 'Haug S.A.', 'monto': 3500, 'estado': 'Entregado'},
-                {'nombre': 'Mantenimiento de prensa hidráulica industrial – 100T', 'cliente': 'Metalurgia & Servicios EIRL', 'monto': 6800, 'estado': 'Finalizado'}
-            ],
-            'total_proyectos': 9,
-            'total_ingresos': 65250,
-            'periodo': '3 meses (enero-marzo 2025)',
-            'promedio_mensual': 21750,  # 65250 / 3 meses
-            'proyectos_por_mes': 3,  # 9 proyectos / 3 meses
-            'monto_promedio_proyecto': 7250  # 65250 / 9 proyectos
-        }
-        
-        # Datos base para generar proyectos realistas
-        self.tipos_proyecto = [
-            "Reparación de unidad hidráulica de freno",
-            "Mantenimiento de sistema hidráulico de molino",
-            "Fabricación de manifold hidráulico para izaje",
-            "Reparación de gato hidráulico de 30T",
-            "Mantenimiento de prensa hidráulica industrial",
-            "Diagnóstico y prueba de banco de válvulas",
-            "Reparación de bomba hidráulica de refrigeración",
-            "Mantenimiento de central hidráulica móvil",
-            "Suministro de unidad hidráulica para sistema",
-            "Proyecto de reparación de camión lubricador"
+def formato_tabla(st):
+    """Formato de montos y márgenes de las tablas de proyectos, aplicado al mostrarlas"""
+    return {
+        'Monto (S/.)': st.column_config.NumberColumn(format="S/. %,d"),
+        'Ganancia (S/.)': st.column_config.NumberColumn(format="S/. %,d"),
+        'Margen (%)': st.column_config.NumberColumn(format="%.1f%%")
+    }
+
+def tabla_comparacion_real(comparacion):
+    """Tabla de la simulación frente a los datos reales"""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'Métrica': ['Ingresos Mensuales', 'Proyectos por Mes', 'Monto Promedio por Proyecto'],
+        'Datos Reales': [
+            f"S/. {comparacion['real']['promedio_mensual']:,}",
+            f"{comparacion['real']['proyectos_por_mes']} proyectos",
+            f"S/. {comparacion['real']['monto_promedio_proyecto']:,}"
+        ],
+        'Simulación': [
+            f"S/. {comparacion['simulado']['total_ingresos']:,}",
+            f"{comparacion['simulado']['total_proyectos']} proyectos",
+            f"S/. {comparacion['simulado']['ingreso_promedio']:,}"
+        ],
+        'Variación (%)': [
+            f"{comparacion['variaciones']['ingresos']:+.1f}%",
+            f"{comparacion['variaciones']['proyectos']:+.1f}%",
+            f"{comparacion['variaciones']['monto_promedio']:+.1f}%"
         ]
-        
-        self.tipos_cliente = [
-            "Minera", "Constructora", "Transporte", "Cementos", "Maestro Perú",
-            "Metalurgia", "Cosapi", "Haug", "Aurífera", "Pesado Cruz"
+    })
+
+# Gráficos en dos partes para FabricaFiguras: plantilla (layout) y trazas (datos)
+
+def plantilla_comparativo_real():
+    """Layout de las barras agrupadas de datos reales frente a la simulación"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.update_layout(
+        barmode='group',
+        title="Comparación Datos Reales vs Simulación",
+        yaxis_title="Valores (S/. para montos, x1000 para proyectos)",
+        showlegend=True
+    )
+    return fig
+
+def trazas_comparativo_real(comparacion):
+    import plotly.graph_objects as go
+    
+    metricas = ['Ingresos Mensuales', 'Proyectos por Mes', 'Monto Promedio']
+    valores_reales = [
+        comparacion['real']['promedio_mensual'],
+        comparacion['real']['proyectos_por_mes'] * 1000,  # Escalar para visualización
+        comparacion['real']['monto_promedio_proyecto']
+    ]
+    valores_simulados = [
+        comparacion['simulado']['total_ingresos'],
+        comparacion['simulado']['total_proyectos'] * 1000,  # Escalar para visualización
+        comparacion['simulado']['ingreso_promedio']
+    ]
+    
+    return [
+        go.Bar(name='Datos Reales', x=metricas, y=valores_reales, marker_color='#e74c3c'),
+        go.Bar(name='Simulación', x=metricas, y=valores_simulados, marker_color='#3498db')
+    ]
+
+def plantilla_histograma(titulo, etiqueta_x, alto=None):
+    """Layout de un histograma simple de una columna de proyectos"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=etiqueta_x,
+        yaxis_title='Cantidad de Proyectos',
+        showlegend=False
+    )
+    if alto:
+        fig.update_layout(height=alto)
+    return fig
+
+def trazas_histograma(valores, nbins, color=None):
+    """Histograma agrupado en el servidor"""
+    return [traza_histograma(valores, nbins, marker_color=color or '#636efa')]
+
+def plantilla_comparacion_duraciones():
+    """Layout de los histogramas superpuestos de duraciones"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.update_layout(
+        title="Comparación de Distribuciones",
+        xaxis_title="Duración (días)",
+        yaxis_title="Cantidad de Proyectos",
+        barmode='overlay',
+        height=300
+    )
+    return fig
+
+def trazas_comparacion_duraciones(duraciones_actuales, duraciones_antiguas):
+    """Histogramas de las duraciones nuevas y las de la lógica anterior"""
+    # Mismos intervalos para las dos lógicas, así las barras se superponen
+    duraciones_actuales = np.asarray(duraciones_actuales)
+    duraciones_antiguas = np.asarray(duraciones_antiguas)
+    todas = np.concatenate((duraciones_actuales, duraciones_antiguas))
+    bordes = bordes_histograma(todas, 8)
+    
+    return [
+        # Distribución actual
+        traza_histograma(
+            duraciones_actuales,
+            bordes=bordes,
+            name='Nueva Lógica',
+            opacity=0.7,
+            marker_color='#3498db'
+        ),
+        # Distribución que habría sido con lógica antigua
+        traza_histograma(
+            duraciones_antiguas,
+            bordes=bordes,
+            name='Lógica Anterior',
+            opacity=0.7,
+            marker_color='#e74c3c'
+        )
+    ]
+
+def tabla_comparativa_duraciones(analisis_duraciones):
+    """Tabla de métricas de duración con la lógica anterior y la nueva"""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'Métrica': [
+            'Duración Promedio (días)', 
+            'Duración Mínima (días)', 
+            'Duración Máxima (días)',
+            'Variabilidad (días)',
+            'Correlación con Precio'
+        ],
+        'Lógica Anterior (basada en precio)': [
+            f"{analisis_duraciones['antigua_logica']['promedio']}",
+            f"{analisis_duraciones['antigua_logica']['minimo']}",
+            f"{analisis_duraciones['antigua_logica']['maximo']}",
+            f"{analisis_duraciones['antigua_logica']['variabilidad']}",
+            f"{analisis_duraciones['antigua_logica']['correlacion_precio']:.3f}"
+        ],
+        'Nueva Lógica (basada en promedio real)': [
+            f"{analisis_duraciones['actual']['promedio']}",
+            f"{analisis_duraciones['actual']['minimo']}",
+            f"{analisis_duraciones['actual']['maximo']}",
+            f"{analisis_duraciones['actual']['variabilidad']}",
+            f"{analisis_duraciones['actual']['correlacion_precio']:.3f}"
+        ],
+        'Cambio': [
+            f"{analisis_duraciones['comparacion']['cambio_promedio']:+.1f}",
+            "Variable",
+            "Variable",
+            f"{analisis_duraciones['comparacion']['cambio_variabilidad']:+.0f}",
+            f"{analisis_duraciones['comparacion']['cambio_correlacion']:+.3f}"
         ]
+    })
+
+def plantilla_monto_ganancia():
+    """Layout de las barras agrupadas de monto y ganancia por proyecto"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.update_layout(
+        barmode='group',
+        title="Comparación Monto vs Ganancia",
+        xaxis_title="Proyectos",
+        yaxis_title="Soles (S/.)"
+    )
+    return fig
+
+def trazas_monto_ganancia(montos, ganancias):
+    # Con muchos proyectos las barras pasan a líneas y el eje es el número de proyecto
+    if len(montos) <= MAX_BARRAS:
+        proyectos_nombres = [f"P{i+1}" for i in range(len(montos))]
+    else:
+        proyectos_nombres = np.arange(1, len(montos) + 1)
+    return [
+        traza_barras(proyectos_nombres, montos, name='Monto'),
+        traza_barras(proyectos_nombres, ganancias, name='Ganancia')
+    ]
+
+def panel_configuracion():
+    """
+    Controles de generación (fragmento)
+    
+    Mover un slider sólo reejecuta este panel; al generar proyectos se
+    reejecuta la app completa porque todas las secciones dependen de ellos.
+    
+    Returns:
+        tuple: (cantidad de proyectos, duración promedio) elegidas
+    """
+    import streamlit as st
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        st.subheader("📊 Configuración")
+        cantidad_proyectos = st.slider(
+            "Cantidad de Proyectos por Mes:",
+            min_value=1,
+            max_value=8,
+            value=3,
+            key="cantidad_slider"
+        )
         
-        self.empresas = [
-            "Colquiria S.A.", "San José S.A.", "Cruz del Sur", "Pacasmayo S.A.A.",
-            "Minería S.A.C", "Perú S.A.", "Retamas S.A.", "S.A.", "& Servicios EIRL",
-            "Sucursal Zárate", "SAG", "Industrial"
-        ]
+        # Detectar cambio en cantidad para ajustar duración automáticamente
+        if cantidad_proyectos != st.session_state.cantidad_anterior:
+            nueva_duracion = st.session_state.simulador.calcular_duracion_automatica(cantidad_proyectos)
+            st.session_state.duracion_promedio = nueva_duracion
+            st.session_state.cantidad_anterior = cantidad_proyectos
+        
+        # Inicializar duración si no existe
+        if 'duracion_promedio' not in st.session_state:
+            st.session_state.duracion_promedio = st.session_state.simulador.calcular_duracion_automatica(cantidad_proyectos)
     
-    def calcular_duracion_automatica(self, cantidad_proyectos):
-        """Calcula la duración promedio automáticamente basada en la cantidad"""
-        dias_objetivo = random.randint(self.dias_mes - self.margen_dias, 
-                                     self.dias_mes + self.margen_dias)
-        duracion_promedio = dias_objetivo / cantidad_proyectos
-        return max(1, round(duracion_promedio))
-    
-    def generar_monto(self, duracion):
-        """Genera monto basado en el promedio real con variación y ajuste por tiempo"""
-        # Monto base: promedio de datos reales (S/. 7,250)
-        monto_base = self.datos_reales['monto_promedio_proyecto']
-        
-        # Variación principal aleatoria (±50% del promedio real)
-        variacion_principal = random.uniform(-0.5, 0.8)  # Permite proyectos hasta 80% más caros
-        monto_variado = monto_base * (1 + variacion_principal)
-        
-        # Ajuste sutil por tiempo (±10% basado en duración)
-        factor_tiempo = 1 + (duracion - 8) * 0.015  # Si dura más de 8 días, sube ligeramente
-        monto_ajustado = monto_variado * factor_tiempo
-        
-        # Casos especiales para mayor realismo
-        probabilidad_proyecto_grande = random.random()
-        if probabilidad_proyecto_grande < 0.15:  # 15% chance de proyecto grande
-            monto_ajustado *= random.uniform(1.5, 2.2)  # Proyectos 50-120% más caros
-        elif probabilidad_proyecto_grande > 0.85:  # 15% chance de proyecto pequeño
-            monto_ajustado *= random.uniform(0.3, 0.6)  # Proyectos 30-70% más baratos
-        
-        # Redondear a centenas y asegurar mínimo realista
-        monto_final = max(1500, round(monto_ajustado / 100) * 100)
-        return monto_final
-    
-    def generar_proyectos(self, cantidad_proyectos, duracion_promedio=None):
-        """Genera lista de proyectos"""
-        self.proyectos = []
-        
-        # Si no se especifica duración, calcularla automáticamente
-        if duracion_promedio is None:
-            duracion_promedio = self.calcular_duracion_automatica(cantidad_proyectos)
-        
-        # Calcular días totales objetivo
-        dias_objetivo = random.randint(self.dias_mes - self.margen_dias, 
-                                     self.dias_mes + self.margen_dias)
-        dias_restantes = dias_objetivo
-        
-        for i in range(cantidad_proyectos):
-            # Generar duración con variación
-            if i == cantidad_proyectos - 1:
-                # Último proyecto: usar días restantes
-                duracion = max(1, dias_restantes)
-            else:
-                # Variación del 40% sobre la duración promedio
-                variacion = max(1, int(duracion_promedio * 0.4))
-                duracion_min = max(1, duracion_promedio - variacion)
-                duracion_max = duracion_promedio + variacion
-                
-                # No exceder días restantes
-                dias_max_posible = max(1, dias_restantes // (cantidad_proyectos - i))
-                duracion = min(random.randint(duracion_min, duracion_max), dias_max_posible)
-                duracion = max(1, duracion)
+    with col2:
+        st.subheader("⏱️ Duración Automática")
+        duracion_promedio = st.slider(
+            "Duración Promedio por Proyecto (días):",
+            min_value=1,
+            max_value=20,
+            value=st.session_state.duracion_promedio,
+            key="duracion_slider"
+        )
+        
+        st.info(f"💡 Duración ajustada automáticamente a {st.session_state.duracion_promedio} días para {cantidad_proyectos} proyectos")
+    
+    with col3:
+        st.subheader("🚀 Generar")
+        if st.button("Generar Nuevos Proyectos", type="primary"):
+            with st.spinner("Generando proyectos..."):
+                st.session_state.simulador.generar_proyectos(cantidad_proyectos, duracion_promedio)
+            st.session_state.proyectos_generados = True
+            # Todas las demás secciones dependen de los proyectos: reejecutar la app completa
+            st.rerun()
+        if st.session_state.pop('proyectos_generados', False):
+            st.success("¡Proyectos generados exitosamente!")
+    
+    return cantidad_proyectos, duracion_promedio
+
+def panel_datos_reales(diagnostico_app, comparacion, version):
+    """Tabla de proyectos reales y gráfico comparativo (fragmento): sólo se calculan con el expansor abierto"""
+    import streamlit as st
+    
+    diagnostico = de_fragmento(st, diagnostico_app, "tabla_real")
+    diagnostico.seccion("tabla_real")
+    cache = cache_de_sesion(st)
+    simulador = st.session_state.simulador
+    
+    contenedor, abierto = expansor(st, "📊 Ver Tabla de Proyectos Reales (Enero-Marzo 2025)", "expansor_datos_reales")
+    with contenedor:
+        if abierto:
+            # Depende sólo de los datos reales, que no cambian durante la sesión
+            df_real = cache.obtener('tabla_real', (), simulador.obtener_dataframe_real)
+            st.dataframe(df_real, hide_index=True, use_container_width=True, column_config=formato_tabla(st))
             
-            dias_restantes -= duracion
+            st.markdown("**Fuente:** Datos reales de proyectos hidráulicos de enero-marzo 2025")
             
-            # Generar datos del proyecto
-            nombre = random.choice(self.tipos_proyecto)
-            tipo_cliente = random.choice(self.tipos_cliente)
-            empresa = random.choice(self.empresas)
-            cliente = f"{tipo_cliente} {empresa}"
-            monto = self.generar_monto(duracion)
+            # Gráfico comparativo
+            if comparacion:
+                st.subheader("📈 Gráfico Comparativo: Simulación vs Realidad")
+                
+                diagnostico.seccion("grafico_comparativo.figura")
+                fig_comparativo = fabrica_de_sesion(st).obtener(
+                    'grafico_comparativo', (), version,
+                    plantilla_comparativo_real, lambda: trazas_comparativo_real(comparacion)
+                )
+                
+                diagnostico.seccion("grafico_comparativo.envio")
+                st.plotly_chart(fig_comparativo, use_container_width=True)
+                
+                st.caption("📝 Los proyectos por mes están multiplicados por 1000 para mejor visualización en el gráfico")
+    
+    if diagnostico is not diagnostico_app:
+        diagnostico.registrar()
+
+def panel_tabla_duraciones(analisis_duraciones, version):
+    """Tabla comparativa de duraciones (fragmento): sólo se arma con el expansor abierto"""
+    import streamlit as st
+    
+    cache = cache_de_sesion(st)
+    contenedor, abierto = expansor(st, "📋 Tabla Comparativa Detallada", "expansor_tabla_duraciones")
+    with contenedor:
+        if abierto:
+            tabla_comparativa = cache.obtener(
+                'tabla_comparativa_duraciones', version, lambda: tabla_comparativa_duraciones(analisis_duraciones)
+            )
+            st.dataframe(tabla_comparativa, hide_index=True, use_container_width=True)
+
+def panel_estimacion(diagnostico_app):
+    """
+    Estimación adaptativa del ingreso mensual (fragmento)
+    
+    Usa la cantidad y duración elegidas en los sliders de configuración, aunque
+    todavía no se hayan generado proyectos con ellas.
+    """
+    import streamlit as st
+    
+    diagnostico = de_fragmento(st, diagnostico_app, "estimacion_ingresos")
+    diagnostico.seccion("estimacion_ingresos")
+    
+    contenedor, abierto = expansor(st, "🎯 Estimación del Ingreso Mensual Esperado", "expansor_estimacion")
+    with contenedor:
+        if abierto:
+            col_a, col_b = st.columns(2)
+            with col_a:
+                precision_ingresos = st.number_input(
+                    "Precisión objetivo (± % de la media)", min_value=0.1, max_value=10.0, value=0.5, step=0.1
+                ) / 100
+            with col_b:
+                max_meses = st.number_input(
+                    "Máximo de meses a simular", min_value=1000, max_value=10_000_000, value=1_000_000, step=10_000
+                )
             
-            proyecto = ProyectoHidraulico(nombre, cliente, duracion, monto)
-            self.proyectos.append(proyecto)
-        
-        return self.proyectos
-    
-    def obtener_resumen(self):
-        """Obtiene resumen de los proyectos generados"""
-        if not self.proyectos:
-            return {}
-        
-        total_dias = sum(p.duracion for p in self.proyectos)
-        total_ingresos = sum(p.monto for p in self.proyectos)
-        total_ganancias = sum(p.ganancia for p in self.proyectos)
-        margen_promedio = round((total_ganancias / total_ingresos) * 100, 1) if total_ingresos > 0 else 0
-        duracion_promedio = round(total_dias / len(self.proyectos), 1)
-        
-        return {
-            'total_proyectos': len(self.proyectos),
-            'total_dias': total_dias,
-            'total_ingresos': total_ingresos,
-            'total_ganancias': total_ganancias,
-            'margen_promedio': margen_promedio,
-            'duracion_promedio': duracion_promedio,
-            'ingreso_promedio': round(total_ingresos / len(self.proyectos)),
-            'ganancia_promedio': round(total_ganancias / len(self.proyectos))
-        }
-    
-    def obtener_comparacion_real(self):
-        """Compara los proyectos simulados con los datos reales"""
-        resumen_simulado = self.obtener_resumen()
-        
-        if not resumen_simulado:
-            return {}
-        
-        real = self.datos_reales
-        
-        # Calcular diferencias
-        diff_ingresos = resumen_simulado['total_ingresos'] - real['promedio_mensual']
-        diff_proyectos = resumen_simulado['total_proyectos'] - real['proyectos_por_mes']
-        diff_monto_promedio = resumen_simulado['ingreso_promedio'] - real['monto_promedio_proyecto']
-        
-        # Calcular porcentajes de variación
-        var_ingresos = round((diff_ingresos / real['promedio_mensual']) * 100, 1) if real['promedio_mensual'] > 0 else 0
-        var_proyectos = round((diff_proyectos / real['proyectos_por_mes']) * 100, 1) if real['proyectos_por_mes'] > 0 else 0
-        var_monto_promedio = round((diff_monto_promedio / real['monto_promedio_proyecto']) * 100, 1) if real['monto_promedio_proyecto'] > 0 else 0
-        
-        return {
-            'simulado': resumen_simulado,
-            'real': real,
-            'diferencias': {
-                'ingresos': diff_ingresos,
-                'proyectos': diff_proyectos,
-                'monto_promedio': diff_monto_promedio
-            },
-            'variaciones': {
-                'ingresos': var_ingresos,
-                'proyectos': var_proyectos,
-                'monto_promedio': var_monto_promedio
-            }
-        }
-    
-    def obtener_dataframe_real(self):
-        """Convierte datos reales a DataFrame"""
-        data = []
-        for i, p in enumerate(self.datos_reales['proyectos'], 1):
-            # Estimar duración de manera más realista
-            # Proyectos de mayor monto tienden a durar un poco más, pero no linealmente
-            duracion_base = random.randint(4, 12)  # Duración base aleatoria
-            if p['monto'] > 10000:  # Proyectos grandes
-                duracion_estimada = duracion_base + random.randint(1, 4)
-            elif p['monto'] < 4000:  # Proyectos pequeños
-                duracion_estimada = max(2, duracion_base - random.randint(1, 3))
-            else:
-                duracion_estimada = duracion_base
+            if st.button("Estimar Ingreso Mensual"):
+                with st.spinner("Simulando meses hasta alcanzar la precisión..."):
+                    st.session_state.estimacion_ingresos = st.session_state.simulador.estimar_ingreso_mensual(
+                        st.session_state.cantidad_slider,
+                        st.session_state.duracion_slider,
+                        precision_relativa=precision_ingresos,
+                        max_meses=int(max_meses)
+                    )
             
-            data.append({
-                'N°': i,
-                'Proyecto': p['nombre'][:50] + '...' if len(p['nombre']) > 50 else p['nombre'],
-                'Cliente': p['cliente'],
-                'Duración Estimada (días)': duracion_estimada,
-                'Monto (S/.)': f"S/. {p['monto']:,}",
-                'Estado': p['estado']
-            })
-        
-    def analizar_duraciones(self):
-        """Analiza las duraciones generadas y compara con lógica anterior"""
-        if not self.proyectos:
-            return {}
-        
-        duraciones = [p.duracion for p in self.proyectos]
-        montos = [p.monto for p in self.proyectos]
-        
-        # Estadísticas de duración actual
-        duracion_min = min(duraciones)
-        duracion_max = max(duraciones)
-        duracion_promedio = sum(duraciones) / len(duraciones)
-        duracion_mediana = sorted(duraciones)[len(duraciones)//2]
-        variabilidad_duracion = max(duraciones) - min(duraciones)
-        
-        # Simular lo que habrían sido las duraciones con lógica antigua (basada en precio)
-        duraciones_antiguas = []
-        for monto in montos:
-            # Lógica antigua invertida: duracion = (monto - costo_fijo) / tarifa_promedio
-            tarifa_promedio = 600  # Promedio de 400-800
-            costo_fijo_promedio = 1250  # Promedio de 500-2000
-            duracion_antigua = max(1, round((monto - costo_fijo_promedio) / tarifa_promedio))
-            duraciones_antiguas.append(duracion_antigua)
-        
-        duracion_antigua_promedio = sum(duraciones_antiguas) / len(duraciones_antiguas)
-        variabilidad_antigua = max(duraciones_antiguas) - min(duraciones_antiguas)
-        
-        # Correlación precio-tiempo (nueva vs antigua)
-        correlacion_actual = self.calcular_correlacion(duraciones, montos)
-        correlacion_antigua = self.calcular_correlacion(duraciones_antiguas, montos)
-        
-        return {
-            'actual': {
-                'promedio': round(duracion_promedio, 1),
-                'minimo': duracion_min,
-                'maximo': duracion_max,
-                'mediana': duracion_mediana,
-                'variabilidad': variabilidad_duracion,
-                'correlacion_precio': round(correlacion_actual, 3)
-            },
-            'antigua_logica': {
-                'promedio': round(duracion_antigua_promedio, 1),
-                'minimo': min(duraciones_antiguas),
-                'maximo': max(duraciones_antiguas),
-                'variabilidad': variabilidad_antigua,
-                'correlacion_precio': round(correlacion_antigua, 3),
-                'duraciones': duraciones_antiguas
-            },
-            'comparacion': {
-                'cambio_promedio': round(duracion_promedio - duracion_antigua_promedio, 1),
-                'cambio_variabilidad': variabilidad_duracion - variabilidad_antigua,
-                'cambio_correlacion': round(correlacion_actual - correlacion_antigua, 3)
-            }
-        }
-    
-    def calcular_correlacion(self, x, y):
-        """Calcula correlación simple entre dos listas"""
-        if len(x) != len(y) or len(x) == 0:
-            return 0
-        
-        mean_x = sum(x) / len(x)
-        mean_y = sum(y) / len(y)
-        
-        numerator = sum((x[i] - mean_x) * (y[i] - mean_y) for i in range(len(x)))
-        denominator_x = sum((x[i] - mean_x) ** 2 for i in range(len(x)))
-        denominator_y = sum((y[i] - mean_y) ** 2 for i in range(len(y)))
-        
-        if denominator_x == 0 or denominator_y == 0:
-            return 0
-        
-        return numerator / (denominator_x * denominator_y) ** 0.5
-    
-    def obtener_dataframe(self):
-        """Convierte proyectos a DataFrame para mostrar en tabla"""
-        if not self.proyectos:
-            return pd.DataFrame()
-        
-        data = []
-        for i, p in enumerate(self.proyectos, 1):
-            data.append({
-                'N°': i,
-                'Proyecto': p.nombre,
-                'Cliente': p.cliente,
-                'Duración (días)': p.duracion,
-                'Monto (S/.)': f"S/. {p.monto:,}",
-                'Ganancia (S/.)': f"S/. {p.ganancia:,}",
-                'Margen (%)': f"{p.margen}%"
-            })
-        
-        return pd.DataFrame(data)
+            estimacion = st.session_state.get('estimacion_ingresos')
+            if estimacion:
+                col_a, col_b, col_c = st.columns(3)
+                with col_a:
+                    st.metric("💰 Ingreso Mensual Esperado", f"S/. {estimacion['media']:,.0f}",
+                              delta=f"± S/. {estimacion['semiancho']:,.0f} ({estimacion['confianza']*100:.0f}%)",
+                              delta_color="off")
+                with col_b:
+                    st.metric("🗓️ Meses Simulados", f"{estimacion['muestras']:,}")
+                with col_c:
+                    st.metric("🎯 Precisión Alcanzada", "Sí" if estimacion['convergio'] else "No (presupuesto agotado)")
+    
+    if diagnostico is not diagnostico_app:
+        diagnostico.registrar()
 
 def main():
+    import streamlit as st
+    import pandas as pd
+    
     st.set_page_config(
         page_title="Simulador de Proyectos Hidráulicos",
         page_icon="🔧",
         layout="wide"
     )
+    diagnostico = iniciar_diagnostico(st, "proyectos")
+    cache = cache_de_sesion(st)
+    fabrica = fabrica_de_sesion(st)
+    iniciar_metricas()
+    diagnostico.seccion("entradas")
     
     # CSS personalizado
     st.markdown("""
@@ -368,53 +413,19 @@ def main():
         st.session_state.cantidad_anterior = 3
     
     # Controles en columnas
-    col1, col2, col3 = st.columns([1, 1, 1])
-    
-    with col1:
-        st.subheader("📊 Configuración")
-        cantidad_proyectos = st.slider(
-            "Cantidad de Proyectos por Mes:",
-            min_value=1,
-            max_value=8,
-            value=3,
-            key="cantidad_slider"
-        )
-        
-        # Detectar cambio en cantidad para ajustar duración automáticamente
-        if cantidad_proyectos != st.session_state.cantidad_anterior:
-            nueva_duracion = st.session_state.simulador.calcular_duracion_automatica(cantidad_proyectos)
-            st.session_state.duracion_promedio = nueva_duracion
-            st.session_state.cantidad_anterior = cantidad_proyectos
-        
-        # Inicializar duración si no existe
-        if 'duracion_promedio' not in st.session_state:
-            st.session_state.duracion_promedio = st.session_state.simulador.calcular_duracion_automatica(cantidad_proyectos)
-    
-    with col2:
-        st.subheader("⏱️ Duración Automática")
-        duracion_promedio = st.slider(
-            "Duración Promedio por Proyecto (días):",
-            min_value=1,
-            max_value=20,
-            value=st.session_state.duracion_promedio,
-            key="duracion_slider"
-        )
-        
-        st.info(f"💡 Duración ajustada automáticamente a {st.session_state.duracion_promedio} días para {cantidad_proyectos} proyectos")
-    
-    with col3:
-        st.subheader("🚀 Generar")
-        if st.button("Generar Nuevos Proyectos", type="primary"):
-            with st.spinner("Generando proyectos..."):
-                st.session_state.simulador.generar_proyectos(cantidad_proyectos, duracion_promedio)
-                st.success("¡Proyectos generados exitosamente!")
+    cantidad_proyectos, duracion_promedio = ejecutar_fragmento(st, panel_configuracion)
     
     # Generar proyectos iniciales
+    diagnostico.seccion("resumen")
     if not st.session_state.simulador.proyectos:
         st.session_state.simulador.generar_proyectos(cantidad_proyectos, duracion_promedio)
     
+    # Todo lo que sigue depende sólo de los proyectos generados: se guarda por versión
+    simulador = st.session_state.simulador
+    version = simulador.version
+    
     # Mostrar resumen
-    resumen = st.session_state.simulador.obtener_resumen()
+    resumen = cache.obtener('resumen', version, simulador.obtener_resumen)
     
     if resumen:
         st.subheader("📈 Resumen del Mes")
@@ -451,7 +462,8 @@ def main():
     
     # Comparación con datos reales
     st.subheader("🔍 Comparación con Datos Reales")
-    comparacion = st.session_state.simulador.obtener_comparacion_real()
+    diagnostico.seccion("comparacion_real")
+    comparacion = cache.obtener('comparacion_real', version, simulador.obtener_comparacion_real)
     
     if comparacion:
         col1, col2 = st.columns(2)
@@ -460,24 +472,9 @@ def main():
             st.markdown("### 📊 Simulación vs Realidad")
             
             # Crear DataFrame para comparación
-            datos_comparacion = pd.DataFrame({
-                'Métrica': ['Ingresos Mensuales', 'Proyectos por Mes', 'Monto Promedio por Proyecto'],
-                'Datos Reales': [
-                    f"S/. {comparacion['real']['promedio_mensual']:,}",
-                    f"{comparacion['real']['proyectos_por_mes']} proyectos",
-                    f"S/. {comparacion['real']['monto_promedio_proyecto']:,}"
-                ],
-                'Simulación': [
-                    f"S/. {comparacion['simulado']['total_ingresos']:,}",
-                    f"{comparacion['simulado']['total_proyectos']} proyectos",
-                    f"S/. {comparacion['simulado']['ingreso_promedio']:,}"
-                ],
-                'Variación (%)': [
-                    f"{comparacion['variaciones']['ingresos']:+.1f}%",
-                    f"{comparacion['variaciones']['proyectos']:+.1f}%",
-                    f"{comparacion['variaciones']['monto_promedio']:+.1f}%"
-                ]
-            })
+            datos_comparacion = cache.obtener(
+                'tabla_comparacion_real', version, lambda: tabla_comparacion_real(comparacion)
+            )
             
             st.dataframe(datos_comparacion, hide_index=True, use_container_width=True)
             
@@ -534,48 +531,12 @@ def main():
                 st.error(f"🔄 **Ajuste necesario:** {precision_score:.1f}% - Considera ajustar los parámetros")
     
     # Mostrar datos reales en tabla
-    with st.expander("📊 Ver Tabla de Proyectos Reales (Enero-Marzo 2025)"):
-        df_real = st.session_state.simulador.obtener_dataframe_real()
-        st.dataframe(df_real, hide_index=True, use_container_width=True)
-        
-        st.markdown("**Fuente:** Datos reales de proyectos hidráulicos de enero-marzo 2025")
-        
-        # Gráfico comparativo
-        if comparacion:
-            st.subheader("📈 Gráfico Comparativo: Simulación vs Realidad")
-            
-            # Preparar datos para el gráfico
-            metricas = ['Ingresos Mensuales', 'Proyectos por Mes', 'Monto Promedio']
-            valores_reales = [
-                comparacion['real']['promedio_mensual'],
-                comparacion['real']['proyectos_por_mes'] * 1000,  # Escalar para visualización
-                comparacion['real']['monto_promedio_proyecto']
-            ]
-            valores_simulados = [
-                comparacion['simulado']['total_ingresos'],
-                comparacion['simulado']['total_proyectos'] * 1000,  # Escalar para visualización
-                comparacion['simulado']['ingreso_promedio']
-            ]
-            
-            fig_comparativo = go.Figure(data=[
-                go.Bar(name='Datos Reales', x=metricas, y=valores_reales, marker_color='#e74c3c'),
-                go.Bar(name='Simulación', x=metricas, y=valores_simulados, marker_color='#3498db')
-            ])
-            
-            fig_comparativo.update_layout(
-                barmode='group',
-                title="Comparación Datos Reales vs Simulación",
-                yaxis_title="Valores (S/. para montos, x1000 para proyectos)",
-                showlegend=True
-            )
-            
-            st.plotly_chart(fig_comparativo, use_container_width=True)
-            
-            st.caption("📝 Los proyectos por mes están multiplicados por 1000 para mejor visualización en el gráfico")
+    ejecutar_fragmento(st, panel_datos_reales, diagnostico, comparacion, version)
     
     # Análisis de duraciones
     st.subheader("⏱️ Análisis de Duraciones de Proyectos")
-    analisis_duraciones = st.session_state.simulador.analizar_duraciones()
+    diagnostico.seccion("duraciones.calculo")
+    analisis_duraciones = cache.obtener('analisis_duraciones', version, simulador.analizar_duraciones)
     
     if analisis_duraciones:
         col1, col2 = st.columns(2)
@@ -593,15 +554,14 @@ def main():
                 st.metric("Variabilidad", f"{analisis_duraciones['actual']['variabilidad']} días")
             
             # Gráfico de distribución actual
-            duraciones_actuales = [p.duracion for p in st.session_state.simulador.proyectos]
-            fig_duracion_actual = px.histogram(
-                x=duraciones_actuales,
-                nbins=8,
-                title="Distribución Actual de Duraciones",
-                labels={'x': 'Duración (días)', 'y': 'Cantidad de Proyectos'},
-                color_discrete_sequence=['#3498db']
+            diagnostico.seccion("grafico_duracion_actual.figura")
+            duraciones_actuales = simulador.proyectos.duracion
+            fig_duracion_actual = fabrica.obtener(
+                'grafico_duracion_actual', (), version,
+                lambda: plantilla_histograma("Distribución Actual de Duraciones", 'Duración (días)', alto=300),
+                lambda: trazas_histograma(duraciones_actuales, 8, color='#3498db')
             )
-            fig_duracion_actual.update_layout(showlegend=False, height=300)
+            diagnostico.seccion("grafico_duracion_actual.envio")
             st.plotly_chart(fig_duracion_actual, use_container_width=True)
         
         with col2:
@@ -632,37 +592,17 @@ def main():
                 )
             
             # Gráfico comparativo de distribuciones
-            fig_comparacion_duraciones = go.Figure()
-            
-            # Distribución actual
-            fig_comparacion_duraciones.add_trace(go.Histogram(
-                x=duraciones_actuales,
-                name='Nueva Lógica',
-                opacity=0.7,
-                marker_color='#3498db',
-                nbinsx=8
-            ))
-            
-            # Distribución que habría sido con lógica antigua
-            fig_comparacion_duraciones.add_trace(go.Histogram(
-                x=analisis_duraciones['antigua_logica']['duraciones'],
-                name='Lógica Anterior',
-                opacity=0.7,
-                marker_color='#e74c3c',
-                nbinsx=8
-            ))
-            
-            fig_comparacion_duraciones.update_layout(
-                title="Comparación de Distribuciones",
-                xaxis_title="Duración (días)",
-                yaxis_title="Cantidad de Proyectos",
-                barmode='overlay',
-                height=300
+            diagnostico.seccion("grafico_duraciones.figura")
+            fig_comparacion_duraciones = fabrica.obtener(
+                'grafico_duraciones', (), version, plantilla_comparacion_duraciones,
+                lambda: trazas_comparacion_duraciones(duraciones_actuales, analisis_duraciones['antigua_logica']['duraciones'])
             )
             
+            diagnostico.seccion("grafico_duraciones.envio")
             st.plotly_chart(fig_comparacion_duraciones, use_container_width=True)
         
         # Interpretación de resultados
+        diagnostico.seccion("duraciones.interpretacion")
         st.markdown("### 🔍 Interpretación de Cambios")
         
         correlacion_actual = analisis_duraciones['actual']['correlacion_precio']
@@ -701,48 +641,20 @@ def main():
             """)
         
         # Tabla comparativa detallada
-        with st.expander("📋 Tabla Comparativa Detallada"):
-            tabla_comparativa = pd.DataFrame({
-                'Métrica': [
-                    'Duración Promedio (días)', 
-                    'Duración Mínima (días)', 
-                    'Duración Máxima (días)',
-                    'Variabilidad (días)',
-                    'Correlación con Precio'
-                ],
-                'Lógica Anterior (basada en precio)': [
-                    f"{analisis_duraciones['antigua_logica']['promedio']}",
-                    f"{analisis_duraciones['antigua_logica']['minimo']}",
-                    f"{analisis_duraciones['antigua_logica']['maximo']}",
-                    f"{analisis_duraciones['antigua_logica']['variabilidad']}",
-                    f"{analisis_duraciones['antigua_logica']['correlacion_precio']:.3f}"
-                ],
-                'Nueva Lógica (basada en promedio real)': [
-                    f"{analisis_duraciones['actual']['promedio']}",
-                    f"{analisis_duraciones['actual']['minimo']}",
-                    f"{analisis_duraciones['actual']['maximo']}",
-                    f"{analisis_duraciones['actual']['variabilidad']}",
-                    f"{analisis_duraciones['actual']['correlacion_precio']:.3f}"
-                ],
-                'Cambio': [
-                    f"{analisis_duraciones['comparacion']['cambio_promedio']:+.1f}",
-                    "Variable",
-                    "Variable",
-                    f"{analisis_duraciones['comparacion']['cambio_variabilidad']:+.0f}",
-                    f"{analisis_duraciones['comparacion']['cambio_correlacion']:+.3f}"
-                ]
-            })
-            st.dataframe(tabla_comparativa, hide_index=True, use_container_width=True)
+        ejecutar_fragmento(st, panel_tabla_duraciones, analisis_duraciones, version)
     
     # Tabla de proyectos
     st.subheader("📋 Detalle de Proyectos")
-    df = st.session_state.simulador.obtener_dataframe()
+    diagnostico.seccion("detalle.tabla")
+    df = cache.obtener('tabla_proyectos', version, simulador.obtener_dataframe)
     
     if not df.empty:
+        diagnostico.seccion("detalle.envio")
         st.dataframe(
             df,
             use_container_width=True,
-            hide_index=True
+            hide_index=True,
+            column_config=formato_tabla(st)
         )
         
         # Gráficos
@@ -750,47 +662,41 @@ def main():
         
         with col1:
             st.subheader("📊 Distribución por Duración")
-            duraciones = [p.duracion for p in st.session_state.simulador.proyectos]
-            fig_duracion = px.histogram(
-                x=duraciones,
-                nbins=10,
-                title="Días por Proyecto",
-                labels={'x': 'Duración (días)', 'y': 'Cantidad de Proyectos'}
+            diagnostico.seccion("grafico_duracion.figura")
+            fig_duracion = fabrica.obtener(
+                'grafico_duracion', (), version,
+                lambda: plantilla_histograma("Días por Proyecto", 'Duración (días)'),
+                lambda: trazas_histograma(simulador.proyectos.duracion, 10)
             )
-            fig_duracion.update_layout(showlegend=False)
+            diagnostico.seccion("grafico_duracion.envio")
             st.plotly_chart(fig_duracion, use_container_width=True)
         
         with col2:
             st.subheader("💰 Distribución por Monto")
-            montos = [p.monto for p in st.session_state.simulador.proyectos]
-            fig_monto = px.histogram(
-                x=montos,
-                nbins=8,
-                title="Montos por Proyecto",
-                labels={'x': 'Monto (S/.)', 'y': 'Cantidad de Proyectos'}
+            diagnostico.seccion("grafico_monto.figura")
+            fig_monto = fabrica.obtener(
+                'grafico_monto', (), version,
+                lambda: plantilla_histograma("Montos por Proyecto", 'Monto (S/.)'),
+                lambda: trazas_histograma(simulador.proyectos.monto, 8)
             )
-            fig_monto.update_layout(showlegend=False)
+            diagnostico.seccion("grafico_monto.envio")
             st.plotly_chart(fig_monto, use_container_width=True)
         
         # Gráfico de barras comparativo
         st.subheader("🔄 Comparación Monto vs Ganancia por Proyecto")
-        proyectos_nombres = [f"P{i+1}" for i in range(len(st.session_state.simulador.proyectos))]
-        montos = [p.monto for p in st.session_state.simulador.proyectos]
-        ganancias = [p.ganancia for p in st.session_state.simulador.proyectos]
-        
-        fig_comparacion = go.Figure(data=[
-            go.Bar(name='Monto', x=proyectos_nombres, y=montos),
-            go.Bar(name='Ganancia', x=proyectos_nombres, y=ganancias)
-        ])
-        fig_comparacion.update_layout(
-            barmode='group',
-            title="Comparación Monto vs Ganancia",
-            xaxis_title="Proyectos",
-            yaxis_title="Soles (S/.)"
+        diagnostico.seccion("grafico_monto_ganancia.figura")
+        fig_comparacion = fabrica.obtener(
+            'grafico_monto_ganancia', (), version, plantilla_monto_ganancia,
+            lambda: trazas_monto_ganancia(simulador.proyectos.monto, simulador.proyectos.ganancia)
         )
+        diagnostico.seccion("grafico_monto_ganancia.envio")
         st.plotly_chart(fig_comparacion, use_container_width=True)
     
+    # Estimación adaptativa del ingreso mensual
+    ejecutar_fragmento(st, panel_estimacion, diagnostico)
+    
     # Información adicional
+    diagnostico.seccion("informacion")
     with st.expander("ℹ️ Información del Modelo"):
         st.markdown("""
         ### 🔧 Características del Simulador:
@@ -843,6 +749,9 @@ def main():
             'Porcentaje': ['68.7%', '9.5%', '21.8%']
         })
         st.dataframe(proyectos_resumen, hide_index=True, use_container_width=True)
+    
+    mostrar_diagnostico(st, diagnostico)
+    diagnostico.registrar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
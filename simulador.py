@@ -0,0 +1,591 @@
+"""
+Núcleo de simulación de proyectos hidráulicos
+
+Sólo depende de NumPy; pandas se importa al pedir un DataFrame.
+"""
+import random
+import numpy as np
+
+from estadisticas import AcumuladorCovarianza, AcumuladorEstadistico, simular_hasta_precision
+from metricas import REGISTRO
+
+_MESES = REGISTRO.contador('simulador_meses_total', "Meses generados por SimuladorProyectos.generar_meses")
+_PROYECTOS = REGISTRO.contador('simulador_proyectos_total', "Proyectos generados por SimuladorProyectos.generar_meses")
+
+class ProyectoHidraulico:
+    def __init__(self, nombre, cliente, duracion, monto):
+        self.nombre = nombre
+        self.cliente = cliente
+        self.duracion = duracion  # en días
+        self.monto = monto
+        self.ganancia = self.calcular_ganancia()
+        self.margen = round((self.ganancia / self.monto) * 100, 1) if self.monto > 0 else 0
+    
+    def calcular_ganancia(self):
+        # Margen de ganancia entre 20-35%
+        margen_porcentaje = random.uniform(20, 35)
+        return round(self.monto * margen_porcentaje / 100)
+
+class FilaProyecto:
+    """Vista de una fila de TablaProyectos con los atributos de ProyectoHidraulico"""
+    __slots__ = ('_tabla', '_indice')
+    
+    def __init__(self, tabla, indice):
+        self._tabla = tabla
+        self._indice = indice
+    
+    @property
+    def nombre(self):
+        return self._tabla.categorias_nombre[self._tabla.nombre[self._indice]]
+    
+    @property
+    def cliente(self):
+        return self._tabla.categorias_cliente[self._tabla.cliente[self._indice]]
+    
+    @property
+    def duracion(self):
+        return int(self._tabla.duracion[self._indice])
+    
+    @property
+    def monto(self):
+        return int(self._tabla.monto[self._indice])
+    
+    @property
+    def ganancia(self):
+        return int(self._tabla.ganancia[self._indice])
+    
+    @property
+    def margen(self):
+        return round(float(self._tabla.margen[self._indice]), 1)
+    
+    def __repr__(self):
+        return f"FilaProyecto({self.nombre!r}, {self.cliente!r}, {self.duracion}, {self.monto})"
+
+class TablaProyectos:
+    """
+    Proyectos guardados por columnas: arreglos NumPy para duración, monto,
+    ganancia y margen, y códigos enteros para nombre y cliente.
+    
+    Iterar o indexar devuelve vistas FilaProyecto, compatibles con el código
+    que usaba listas de ProyectoHidraulico.
+    """
+    
+    def __init__(self, duracion, monto, ganancia, margen, nombre, cliente,
+                 categorias_nombre, categorias_cliente):
+        self.duracion = np.asarray(duracion, dtype=np.int32)
+        self.monto = np.asarray(monto, dtype=np.int32)
+        self.ganancia = np.asarray(ganancia, dtype=np.int32)
+        self.margen = np.asarray(margen, dtype=np.float32)
+        self.nombre = np.asarray(nombre, dtype=np.int16)
+        self.cliente = np.asarray(cliente, dtype=np.int16)
+        self.categorias_nombre = categorias_nombre
+        self.categorias_cliente = categorias_cliente
+    
+    @classmethod
+    def desde_meses(cls, meses, simulador):
+        """Aplana el resultado de SimuladorProyectos.generar_meses (mes a mes)"""
+        return cls(
+            meses['duracion'].ravel(),
+            meses['monto'].ravel(),
+            meses['ganancia'].ravel(),
+            meses['margen'].ravel(),
+            meses['nombre'].ravel(),
+            (meses['tipo_cliente'] * len(simulador.empresas) + meses['empresa']).ravel(),
+            simulador.tipos_proyecto,
+            simulador.categorias_cliente
+        )
+    
+    @classmethod
+    def desde_proyectos(cls, proyectos):
+        """Construye la tabla a partir de objetos ProyectoHidraulico"""
+        categorias_nombre = list(dict.fromkeys(p.nombre for p in proyectos))
+        categorias_cliente = list(dict.fromkeys(p.cliente for p in proyectos))
+        codigo_nombre = {nombre: i for i, nombre in enumerate(categorias_nombre)}
+        codigo_cliente = {cliente: i for i, cliente in enumerate(categorias_cliente)}
+        return cls(
+            [p.duracion for p in proyectos],
+            [p.monto for p in proyectos],
+            [p.ganancia for p in proyectos],
+            [p.margen for p in proyectos],
+            [codigo_nombre[p.nombre] for p in proyectos],
+            [codigo_cliente[p.cliente] for p in proyectos],
+            categorias_nombre,
+            categorias_cliente
+        )
+    
+    def __len__(self):
+        return len(self.duracion)
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [FilaProyecto(self, i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de proyecto fuera de rango")
+        return FilaProyecto(self, indice)
+    
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield FilaProyecto(self, indice)
+    
+    def nombres(self):
+        return np.array(self.categorias_nombre, dtype=object)[self.nombre]
+    
+    def clientes(self):
+        return np.array(self.categorias_cliente, dtype=object)[self.cliente]
+    
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.duracion, self.monto, self.ganancia,
+                                      self.margen, self.nombre, self.cliente))
+
+def correlacion_lote(x, y):
+    """
+    Correlación de Pearson por fila entre dos arreglos de la misma forma
+    
+    Con arreglos 1-D devuelve un escalar; con arreglos meses x proyectos, una
+    correlación por mes. Las filas sin variación dan 0.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    dx = x - x.mean(axis=-1, keepdims=True)
+    dy = y - y.mean(axis=-1, keepdims=True)
+    numerador = (dx * dy).sum(axis=-1)
+    denominador = np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    return np.divide(numerador, denominador, out=np.zeros_like(numerador), where=denominador > 0)
+
+def duraciones_logica_antigua(montos):
+    """Duraciones que habría dado la lógica antigua (basada en precio) para cada monto"""
+    # Lógica antigua invertida: duracion = (monto - costo_fijo) / tarifa_promedio
+    tarifa_promedio = 600  # Promedio de 400-800
+    costo_fijo_promedio = 1250  # Promedio de 500-2000
+    return np.maximum(1, np.round((np.asarray(montos) - costo_fijo_promedio) / tarifa_promedio)).astype(np.int64)
+
+def _estadisticas_duracion(duraciones, montos):
+    minimo = duraciones.min(axis=-1)
+    maximo = duraciones.max(axis=-1)
+    return {
+        'promedio': duraciones.mean(axis=-1),
+        'minimo': minimo,
+        'maximo': maximo,
+        'mediana': np.sort(duraciones, axis=-1)[..., duraciones.shape[-1] // 2],
+        'variabilidad': maximo - minimo,
+        'correlacion_precio': correlacion_lote(duraciones, montos)
+    }
+
+def analizar_duraciones_lote(duraciones, montos):
+    """
+    Estadísticas de duración y comparación con la lógica antigua, por mes
+    
+    Args:
+        duraciones, montos: Un mes (1-D) o un lote meses x proyectos (2-D)
+    
+    Returns:
+        dict: Mismas claves que SimuladorProyectos.analizar_duraciones con un
+            escalar (1-D) o un arreglo con un valor por mes (2-D)
+    """
+    duraciones = np.asarray(duraciones, dtype=np.int64)
+    montos = np.asarray(montos, dtype=np.int64)
+    duraciones_antiguas = duraciones_logica_antigua(montos)
+    
+    actual = _estadisticas_duracion(duraciones, montos)
+    antigua = _estadisticas_duracion(duraciones_antiguas, montos)
+    del antigua['mediana']
+    antigua['duraciones'] = duraciones_antiguas
+    
+    return {
+        'actual': actual,
+        'antigua_logica': antigua,
+        'comparacion': {
+            'cambio_promedio': actual['promedio'] - antigua['promedio'],
+            'cambio_variabilidad': actual['variabilidad'] - antigua['variabilidad'],
+            'cambio_correlacion': actual['correlacion_precio'] - antigua['correlacion_precio']
+        }
+    }
+
+class SimuladorProyectos:
+    def __init__(self):
+        self.proyectos = TablaProyectos([], [], [], [], [], [], [], [])
+        self.version = 0  # Cambia cada vez que se generan proyectos (clave de caches externas)
+        self.dias_mes = 30
+        self.margen_dias = 7  # ±7 días de margen
+        
+        # Datos reales de la tabla original (enero-marzo 2025)
+        self.datos_reales = {
+            'proyectos': [
+                {'nombre': 'Reparación de unidad hidráulica de freno de molino SAG', 'cliente': 'Minera Colquiria S.A.', 'monto': 12800, 'estado': 'Finalizado'},
+                {'nombre': 'Fabricación de manifold hidráulico para sistema de izaje', 'cliente': 'Constructora San José S.A.', 'monto': 9450, 'estado': 'Finalizado'},
+                {'nombre': 'Proyecto de Reparación de Camión Lubricador', 'cliente': 'Transporte Pesado Cruz del Sur', 'monto': 5000, 'estado': 'Finalizado'},
+                {'nombre': 'Proyecto de Mantenimiento Neumático Industrial', 'cliente': 'Cementos Pacasmayo S.A.A.', 'monto': 4500, 'estado': 'Finalizado'},
+                {'nombre': 'Mantenimiento de central hidráulica móvil (chasis y válvulas)', 'cliente': 'Cosapi Minería S.A.C', 'monto': 7300, 'estado': 'Finalizado'},
+                {'nombre': 'Reparación de gato hidráulico de 30T – Sucursal Zárate', 'cliente': 'Maestro Perú S.A. (SJL)', 'monto': 2700, 'estado': 'Entregado'},
+                {'nombre': 'Suministro de unidad hidráulica para sistema de refrigeración de prensa', 'cliente': 'Minera Aurífera Retamas S.A.', 'monto': 14200, 'estado': 'En ejecución'},
+                {'nombre': 'Diagnóstico y prueba de banco de válvulas direccionales', 'cliente': 'Haug S.A.', 'monto': 3500, 'estado': 'Entregado'},
+                {'nombre': 'Mantenimiento de prensa hidráulica industrial – 100T', 'cliente': 'Metalurgia & Servicios EIRL', 'monto': 6800, 'estado': 'Finalizado'}
+            ],
+            'total_proyectos': 9,
+            'total_ingresos': 65250,
+            'periodo': '3 meses (enero-marzo 2025)',
+            'promedio_mensual': 21750,  # 65250 / 3 meses
+            'proyectos_por_mes': 3,  # 9 proyectos / 3 meses
+            'monto_promedio_proyecto': 7250  # 65250 / 9 proyectos
+        }
+        
+        # Datos base para generar proyectos realistas
+        self.tipos_proyecto = [
+            "Reparación de unidad hidráulica de freno",
+            "Mantenimiento de sistema hidráulico de molino",
+            "Fabricación de manifold hidráulico para izaje",
+            "Reparación de gato hidráulico de 30T",
+            "Mantenimiento de prensa hidráulica industrial",
+            "Diagnóstico y prueba de banco de válvulas",
+            "Reparación de bomba hidráulica de refrigeración",
+            "Mantenimiento de central hidráulica móvil",
+            "Suministro de unidad hidráulica para sistema",
+            "Proyecto de reparación de camión lubricador"
+        ]
+        
+        self.tipos_cliente = [
+            "Minera", "Constructora", "Transporte", "Cementos", "Maestro Perú",
+            "Metalurgia", "Cosapi", "Haug", "Aurífera", "Pesado Cruz"
+        ]
+        
+        self.empresas = [
+            "Colquiria S.A.", "San José S.A.", "Cruz del Sur", "Pacasmayo S.A.A.",
+            "Minería S.A.C", "Perú S.A.", "Retamas S.A.", "S.A.", "& Servicios EIRL",
+            "Sucursal Zárate", "SAG", "Industrial"
+        ]
+        
+        # Todas las combinaciones "tipo empresa": el código de cliente indexa esta lista
+        self.categorias_cliente = [f"{tipo} {empresa}" for tipo in self.tipos_cliente for empresa in self.empresas]
+    
+    def calcular_duracion_automatica(self, cantidad_proyectos):
+        """Calcula la duración promedio automáticamente basada en la cantidad"""
+        dias_objetivo = random.randint(self.dias_mes - self.margen_dias, 
+                                     self.dias_mes + self.margen_dias)
+        duracion_promedio = dias_objetivo / cantidad_proyectos
+        return max(1, round(duracion_promedio))
+    
+    def generar_monto(self, duracion):
+        """Genera monto basado en el promedio real con variación y ajuste por tiempo"""
+        # Monto base: promedio de datos reales (S/. 7,250)
+        monto_base = self.datos_reales['monto_promedio_proyecto']
+        
+        # Variación principal aleatoria (±50% del promedio real)
+        variacion_principal = random.uniform(-0.5, 0.8)  # Permite proyectos hasta 80% más caros
+        monto_variado = monto_base * (1 + variacion_principal)
+        
+        # Ajuste sutil por tiempo (±10% basado en duración)
+        factor_tiempo = 1 + (duracion - 8) * 0.015  # Si dura más de 8 días, sube ligeramente
+        monto_ajustado = monto_variado * factor_tiempo
+        
+        # Casos especiales para mayor realismo
+        probabilidad_proyecto_grande = random.random()
+        if probabilidad_proyecto_grande < 0.15:  # 15% chance de proyecto grande
+            monto_ajustado *= random.uniform(1.5, 2.2)  # Proyectos 50-120% más caros
+        elif probabilidad_proyecto_grande > 0.85:  # 15% chance de proyecto pequeño
+            monto_ajustado *= random.uniform(0.3, 0.6)  # Proyectos 30-70% más baratos
+        
+        # Redondear a centenas y asegurar mínimo realista
+        monto_final = max(1500, round(monto_ajustado / 100) * 100)
+        return monto_final
+    
+    def generar_proyectos(self, cantidad_proyectos, duracion_promedio=None, semilla=None):
+        """
+        Genera los proyectos de un mes
+        
+        Los proyectos salen de generar_meses, que usa numpy.random.Generator en
+        lugar del módulo random: una misma semilla produce proyectos distintos
+        a los de versiones anteriores. Sin `semilla`, la semilla del generador
+        se toma del módulo random, así que random.seed(...) sigue haciendo
+        reproducibles las corridas.
+        """
+        if semilla is None:
+            semilla = random.getrandbits(64)
+        meses = self.generar_meses(1, cantidad_proyectos, duracion_promedio, semilla)
+        self.proyectos = TablaProyectos.desde_meses(meses, self)
+        self.version += 1
+        return self.proyectos
+    
+    def generar_meses(self, n_meses, cantidad_proyectos, duracion_promedio=None, semilla=None):
+        """
+        Genera muchos meses a la vez con numpy.random.Generator
+        
+        Reproduce la lógica de generar_proyectos (reparto de días, montos con
+        proyectos grandes/pequeños y márgenes) vectorizada sobre los meses: sólo
+        se recorre en Python la posición del proyecto dentro del mes.
+        
+        Args:
+            n_meses (int): Número de meses a simular
+            cantidad_proyectos (int): Proyectos por mes
+            duracion_promedio (int): Duración promedio; si es None se calcula por mes
+            semilla (int | np.random.Generator): Semilla del generador
+        
+        Returns:
+            dict: Arreglos meses x proyectos con 'duracion', 'monto', 'ganancia',
+                'margen' y los códigos 'nombre', 'tipo_cliente', 'empresa'
+                (índices en tipos_proyecto, tipos_cliente y empresas)
+        """
+        rng = np.random.default_rng(semilla)
+        forma = (n_meses, cantidad_proyectos)
+        dias_min = self.dias_mes - self.margen_dias
+        dias_max = self.dias_mes + self.margen_dias
+        
+        if duracion_promedio is None:
+            duracion_promedio = np.maximum(
+                1, np.round(rng.integers(dias_min, dias_max + 1, n_meses) / cantidad_proyectos)
+            ).astype(np.int64)
+        else:
+            duracion_promedio = np.full(n_meses, duracion_promedio, dtype=np.int64)
+        
+        # Reparto de días: misma regla que generar_proyectos, un proyecto a la vez
+        dias_restantes = rng.integers(dias_min, dias_max + 1, n_meses)
+        variacion = np.maximum(1, (duracion_promedio * 0.4).astype(np.int64))
+        duracion_min = np.maximum(1, duracion_promedio - variacion)
+        duracion_max = duracion_promedio + variacion
+        duracion = np.empty(forma, dtype=np.int64)
+        for i in range(cantidad_proyectos):
+            if i == cantidad_proyectos - 1:
+                duracion[:, i] = np.maximum(1, dias_restantes)
+            else:
+                dias_max_posible = np.maximum(1, dias_restantes // (cantidad_proyectos - i))
+                propuesta = rng.integers(duracion_min, duracion_max + 1)
+                duracion[:, i] = np.maximum(1, np.minimum(propuesta, dias_max_posible))
+            dias_restantes = dias_restantes - duracion[:, i]
+        
+        monto = self.generar_montos(duracion, rng)
+        ganancia = np.round(monto * rng.uniform(20, 35, forma) / 100).astype(np.int64)
+        margen = np.round(np.divide(ganancia * 100, monto, out=np.zeros(forma), where=monto > 0), 1)
+        
+        if REGISTRO.habilitado:
+            _MESES.incrementar(n_meses)
+            _PROYECTOS.incrementar(n_meses * cantidad_proyectos)
+        
+        return {
+            'duracion': duracion,
+            'monto': monto,
+            'ganancia': ganancia,
+            'margen': margen,
+            'nombre': rng.integers(0, len(self.tipos_proyecto), forma),
+            'tipo_cliente': rng.integers(0, len(self.tipos_cliente), forma),
+            'empresa': rng.integers(0, len(self.empresas), forma)
+        }
+    
+    def generar_montos(self, duraciones, rng):
+        """Versión vectorizada de generar_monto para un arreglo de duraciones"""
+        duraciones = np.asarray(duraciones)
+        monto_base = self.datos_reales['monto_promedio_proyecto']
+        monto = monto_base * (1 + rng.uniform(-0.5, 0.8, duraciones.shape))
+        monto *= 1 + (duraciones - 8) * 0.015
+        
+        probabilidad_proyecto_grande = rng.random(duraciones.shape)
+        grande = probabilidad_proyecto_grande < 0.15
+        pequeno = probabilidad_proyecto_grande > 0.85
+        monto[grande] *= rng.uniform(1.5, 2.2, grande.sum())
+        monto[pequeno] *= rng.uniform(0.3, 0.6, pequeno.sum())
+        
+        return np.maximum(1500, np.round(monto / 100) * 100).astype(np.int64)
+    
+    def estimar_ingreso_mensual(self, cantidad_proyectos, duracion_promedio=None, precision_relativa=0.005,
+                                confianza=0.95, tam_bloque=10_000, max_meses=1_000_000, semilla=None):
+        """Simula meses por bloques hasta estimar el ingreso mensual medio con la precisión pedida"""
+        def generar_bloque(rng, n_meses):
+            meses = self.generar_meses(n_meses, cantidad_proyectos, duracion_promedio, semilla=rng)
+            return meses['monto'].sum(axis=1)
+        
+        return simular_hasta_precision(
+            generar_bloque,
+            precision_relativa=precision_relativa,
+            confianza=confianza,
+            tam_bloque=tam_bloque,
+            max_muestras=max_meses,
+            semilla=semilla
+        )
+    
+    def acumular_meses(self, meses, acumuladores=None):
+        """
+        Actualiza acumuladores combinables con un bloque de generar_meses
+        
+        Sirve para bloques de cualquier tamaño y para resultados de varios
+        procesos: los acumuladores de cada uno se unen con combinar_acumuladores.
+        
+        Returns:
+            dict: 'ingresos', 'ganancias' y 'dias' por mes; 'duracion', 'monto' y
+                'margen' por proyecto; 'precio_duracion' (covarianza monto-duración)
+        """
+        if acumuladores is None:
+            acumuladores = {clave: AcumuladorEstadistico()
+                            for clave in ('ingresos', 'ganancias', 'dias', 'duracion', 'monto', 'margen')}
+            acumuladores['precio_duracion'] = AcumuladorCovarianza()
+        acumuladores['ingresos'].actualizar(meses['monto'].sum(axis=1))
+        acumuladores['ganancias'].actualizar(meses['ganancia'].sum(axis=1))
+        acumuladores['dias'].actualizar(meses['duracion'].sum(axis=1))
+        acumuladores['duracion'].actualizar(meses['duracion'])
+        acumuladores['monto'].actualizar(meses['monto'])
+        acumuladores['margen'].actualizar(meses['margen'])
+        acumuladores['precio_duracion'].actualizar(meses['duracion'], meses['monto'])
+        return acumuladores
+    
+    @staticmethod
+    def combinar_acumuladores(acumuladores, otros):
+        """Une los acumuladores de otro bloque o proceso (ver acumular_meses)"""
+        for clave, acumulador in otros.items():
+            acumuladores[clave].combinar(acumulador)
+        return acumuladores
+    
+    def obtener_resumen(self):
+        """Obtiene resumen de los proyectos generados"""
+        if not self.proyectos:
+            return {}
+        
+        total_dias = int(self.proyectos.duracion.sum())
+        total_ingresos = int(self.proyectos.monto.sum(dtype=np.int64))
+        total_ganancias = int(self.proyectos.ganancia.sum(dtype=np.int64))
+        margen_promedio = round((total_ganancias / total_ingresos) * 100, 1) if total_ingresos > 0 else 0
+        duracion_promedio = round(total_dias / len(self.proyectos), 1)
+        
+        return {
+            'total_proyectos': len(self.proyectos),
+            'total_dias': total_dias,
+            'total_ingresos': total_ingresos,
+            'total_ganancias': total_ganancias,
+            'margen_promedio': margen_promedio,
+            'duracion_promedio': duracion_promedio,
+            'ingreso_promedio': round(total_ingresos / len(self.proyectos)),
+            'ganancia_promedio': round(total_ganancias / len(self.proyectos))
+        }
+    
+    def obtener_comparacion_real(self):
+        """Compara los proyectos simulados con los datos reales"""
+        resumen_simulado = self.obtener_resumen()
+        
+        if not resumen_simulado:
+            return {}
+        
+        real = self.datos_reales
+        
+        # Calcular diferencias
+        diff_ingresos = resumen_simulado['total_ingresos'] - real['promedio_mensual']
+        diff_proyectos = resumen_simulado['total_proyectos'] - real['proyectos_por_mes']
+        diff_monto_promedio = resumen_simulado['ingreso_promedio'] - real['monto_promedio_proyecto']
+        
+        # Calcular porcentajes de variación
+        var_ingresos = round((diff_ingresos / real['promedio_mensual']) * 100, 1) if real['promedio_mensual'] > 0 else 0
+        var_proyectos = round((diff_proyectos / real['proyectos_por_mes']) * 100, 1) if real['proyectos_por_mes'] > 0 else 0
+        var_monto_promedio = round((diff_monto_promedio / real['monto_promedio_proyecto']) * 100, 1) if real['monto_promedio_proyecto'] > 0 else 0
+        
+        return {
+            'simulado': resumen_simulado,
+            'real': real,
+            'diferencias': {
+                'ingresos': diff_ingresos,
+                'proyectos': diff_proyectos,
+                'monto_promedio': diff_monto_promedio
+            },
+            'variaciones': {
+                'ingresos': var_ingresos,
+                'proyectos': var_proyectos,
+                'monto_promedio': var_monto_promedio
+            }
+        }
+    
+    def obtener_dataframe_real(self):
+        """
+        Convierte datos reales a DataFrame
+        
+        Las columnas numéricas quedan como números; el formato (S/., miles) se
+        aplica al mostrar la tabla.
+        """
+        import pandas as pd
+        
+        data = []
+        for i, p in enumerate(self.datos_reales['proyectos'], 1):
+            # Estimar duración de manera más realista
+            # Proyectos de mayor monto tienden a durar un poco más, pero no linealmente
+            duracion_base = random.randint(4, 12)  # Duración base aleatoria
+            if p['monto'] > 10000:  # Proyectos grandes
+                duracion_estimada = duracion_base + random.randint(1, 4)
+            elif p['monto'] < 4000:  # Proyectos pequeños
+                duracion_estimada = max(2, duracion_base - random.randint(1, 3))
+            else:
+                duracion_estimada = duracion_base
+            
+            data.append({
+                'N°': i,
+                'Proyecto': p['nombre'][:50] + '...' if len(p['nombre']) > 50 else p['nombre'],
+                'Cliente': p['cliente'],
+                'Duración Estimada (días)': duracion_estimada,
+                'Monto (S/.)': p['monto'],
+                'Estado': p['estado']
+            })
+        
+        return pd.DataFrame(data).astype({
+            'N°': np.int32, 'Duración Estimada (días)': np.int32, 'Monto (S/.)': np.int64, 'Estado': 'category'
+        })
+    
+    def analizar_duraciones(self):
+        """Analiza las duraciones generadas y compara con lógica anterior"""
+        if not self.proyectos:
+            return {}
+        
+        analisis = analizar_duraciones_lote(self.proyectos.duracion, self.proyectos.monto)
+        actual, antigua, comparacion = analisis['actual'], analisis['antigua_logica'], analisis['comparacion']
+        
+        return {
+            'actual': {
+                'promedio': round(float(actual['promedio']), 1),
+                'minimo': int(actual['minimo']),
+                'maximo': int(actual['maximo']),
+                'mediana': int(actual['mediana']),
+                'variabilidad': int(actual['variabilidad']),
+                'correlacion_precio': round(float(actual['correlacion_precio']), 3)
+            },
+            'antigua_logica': {
+                'promedio': round(float(antigua['promedio']), 1),
+                'minimo': int(antigua['minimo']),
+                'maximo': int(antigua['maximo']),
+                'variabilidad': int(antigua['variabilidad']),
+                'correlacion_precio': round(float(antigua['correlacion_precio']), 3),
+                'duraciones': antigua['duraciones'].tolist()
+            },
+            'comparacion': {
+                'cambio_promedio': round(float(comparacion['cambio_promedio']), 1),
+                'cambio_variabilidad': int(comparacion['cambio_variabilidad']),
+                'cambio_correlacion': round(float(comparacion['cambio_correlacion']), 3)
+            }
+        }
+    
+    def analizar_meses(self, meses):
+        """analizar_duraciones para todos los meses de un bloque de generar_meses (un valor por mes)"""
+        return analizar_duraciones_lote(meses['duracion'], meses['monto'])
+    
+    def calcular_correlacion(self, x, y):
+        """Calcula correlación simple entre dos listas"""
+        if len(x) != len(y) or len(x) == 0:
+            return 0
+        return float(correlacion_lote(x, y))
+    
+    def obtener_dataframe(self):
+        """
+        Convierte proyectos a DataFrame para mostrar en tabla
+        
+        Se arma directamente desde las columnas de TablaProyectos: números sin
+        formatear (el formato se aplica al mostrar) y nombre y cliente como
+        categorías sobre los códigos ya guardados.
+        """
+        import pandas as pd
+        
+        if not self.proyectos:
+            return pd.DataFrame()
+        
+        tabla = self.proyectos
+        return pd.DataFrame({
+            'N°': np.arange(1, len(tabla) + 1, dtype=np.int32),
+            'Proyecto': pd.Categorical.from_codes(tabla.nombre, tabla.categorias_nombre),
+            'Cliente': pd.Categorical.from_codes(tabla.cliente, tabla.categorias_cliente),
+            'Duración (días)': tabla.duracion,
+            'Monto (S/.)': tabla.monto,
+            'Ganancia (S/.)': tabla.ganancia,
+            'Margen (%)': tabla.margen
+        })
@@ -0,0 +1,42 @@
+"""Implementaciones escalares originales de van.py, usadas como referencia en las pruebas"""
+
+
+def calcular_van(inversion_inicial, flujos_caja, tasa_descuento):
+    van = -inversion_inicial
+    for i, flujo in enumerate(flujos_caja):
+        van += flujo / ((1 + tasa_descuento) ** (i + 1))
+    return van
+
+
+def calcular_tir(inversion_inicial, flujos_caja, max_iter=1000, precision=1e-6):
+    def van_funcion(tasa):
+        van = -inversion_inicial
+        for i, flujo in enumerate(flujos_caja):
+            van += flujo / ((1 + tasa) ** (i + 1))
+        return van
+
+    def derivada_van(tasa):
+        derivada = 0
+        for i, flujo in enumerate(flujos_caja):
+            derivada += -flujo * (i + 1) / ((1 + tasa) ** (i + 2))
+        return derivada
+
+    tasa = 0.1
+
+    for _ in range(max_iter):
+        van_actual = van_funcion(tasa)
+        if abs(van_actual) < precision:
+            return tasa
+
+        derivada = derivada_van(tasa)
+        if abs(derivada) < precision:
+            return None
+
+        tasa_nueva = tasa - van_actual / derivada
+
+        if abs(tasa_nueva - tasa) < precision:
+            return tasa_nueva
+
+        tasa = tasa_nueva
+
+    return None
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from almacenamiento import abrir_escritor, leer_bloques, leer_columna_flujos
+
+
+def test_parquet_fija_el_esquema_al_abrir(tmp_path):
+    pytest.importorskip('pyarrow')
+    ruta = str(tmp_path / 'resultados.parquet')
+
+    with abrir_escritor(ruta, esquema={'id': 'string', 'tir': 'float64'}) as escritor:
+        escritor.escribir({'id': np.array(['', '']), 'tir': np.array([np.nan, np.nan])})
+        escritor.escribir({'id': np.array([3, 4]), 'tir': np.array([0.1, 0.2])})
+
+    bloque, = leer_bloques(ruta)
+    assert bloque['id'].tolist() == ['', '', '3', '4']
+    assert bloque['tir'][2:].tolist() == [0.1, 0.2]
+
+
+def test_parquet_sin_esquema_convierte_al_tipo_del_primer_bloque(tmp_path):
+    pytest.importorskip('pyarrow')
+    ruta = str(tmp_path / 'resultados.parquet')
+
+    with abrir_escritor(ruta) as escritor:
+        escritor.escribir({'valor': np.array([1.5, 2.5])})
+        escritor.escribir({'valor': np.array([3, 4])})
+
+    assert np.concatenate([b['valor'] for b in leer_bloques(ruta)]).tolist() == [1.5, 2.5, 3.0, 4.0]
+
+
+def test_columna_de_flujos_con_separador_de_miles():
+    assert leer_columna_flujos("$1,000.00").tolist() == [1_000.0]
+    assert leer_columna_flujos("1,234.56").tolist() == [1_234.56]
+    assert leer_columna_flujos("Flujo\n$1,000.00\n-2,500\n300").tolist() == [1_000.0, -2_500.0, 300.0]
+
+
+def test_columna_de_flujos_desde_csv_con_comas():
+    assert leer_columna_flujos("Periodo,Flujo\n1,100\n2,200").tolist() == [100.0, 200.0]
+    assert leer_columna_flujos("1,1500\n2,-300").tolist() == [1_500.0, -300.0]
+    assert leer_columna_flujos("1;1,500.50\n2;3").tolist() == [1_500.5, 3.0]
+
+
+def test_columna_de_flujos_con_comas_ambiguas_falla():
+    with pytest.raises(ValueError):
+        leer_columna_flujos("1,5\n2")
+    with pytest.raises(ValueError):
+        leer_columna_flujos("Flujo\n1,5")
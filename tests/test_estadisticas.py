@@ -0,0 +1,61 @@
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from estadisticas import AcumuladorCovarianza, AcumuladorEstadistico, ppf_normal
+
+
+@pytest.fixture
+def valores():
+    return np.random.default_rng(3).lognormal(10, 0.5, 50_000)
+
+
+def test_acumulador_por_bloques_coincide_con_numpy(valores):
+    acumulador = AcumuladorEstadistico()
+    for bloque in np.array_split(valores, 17):
+        acumulador.actualizar(bloque)
+
+    assert acumulador.n == len(valores)
+    assert acumulador.media == pytest.approx(valores.mean())
+    assert acumulador.varianza == pytest.approx(valores.var(ddof=1))
+    assert (acumulador.minimo, acumulador.maximo) == (valores.min(), valores.max())
+    # t-digest: error de cuantil pequeño frente al rango intercuartílico
+    probabilidades = (0.01, 0.05, 0.5, 0.95, 0.99)
+    iqr = np.subtract(*np.percentile(valores, (75, 25)))
+    assert np.abs(acumulador.cuantiles(probabilidades) - np.quantile(valores, probabilidades)).max() < 0.01 * iqr
+
+
+def test_combinar_no_depende_del_orden(valores):
+    partes = [AcumuladorEstadistico().actualizar(b) for b in np.array_split(valores, 4)]
+    directo = AcumuladorEstadistico().actualizar(valores)
+
+    combinado = AcumuladorEstadistico()
+    for parte in reversed(partes):
+        combinado.combinar(parte)
+
+    assert combinado.n == directo.n
+    assert combinado.media == pytest.approx(directo.media)
+    assert combinado.varianza == pytest.approx(directo.varianza)
+
+
+def test_acumulador_covarianza_coincide_con_numpy():
+    rng = np.random.default_rng(4)
+    x = rng.normal(size=10_000)
+    y = 2 * x + rng.normal(size=10_000)
+
+    izquierda, derecha = AcumuladorCovarianza(), AcumuladorCovarianza()
+    izquierda.actualizar(x[:3_000], y[:3_000])
+    derecha.actualizar(x[3_000:], y[3_000:])
+    izquierda.combinar(derecha)
+
+    assert izquierda.covarianza == pytest.approx(np.cov(x, y)[0, 1])
+    assert izquierda.correlacion == pytest.approx(np.corrcoef(x, y)[0, 1])
+
+
+def test_ppf_normal_coincide_con_statistics():
+    probabilidades = np.array([1e-10, 0.001, 0.025, 0.3, 0.5, 0.8, 0.975, 0.999999])
+
+    esperado = [NormalDist().inv_cdf(p) for p in probabilidades]
+
+    assert ppf_normal(probabilidades) == pytest.approx(esperado, abs=1e-8)
@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+
+import referencia
+from finanzas import (TIR_CONVERGIO, TIR_SIN_CAMBIO_SIGNO, CacheFactores, ModeloVanIncremental,
+                      calcular_tir, calcular_tir_lote, calcular_van, calcular_van_lote,
+                      periodo_recuperacion_lote)
+
+
+@pytest.fixture
+def proyectos():
+    rng = np.random.default_rng(7)
+    inversiones = rng.uniform(1_000, 100_000, size=50)
+    flujos = rng.normal(20_000, 15_000, size=(50, 12))
+    tasas = rng.uniform(0.0, 0.3, size=50)
+    return inversiones, flujos, tasas
+
+
+def test_van_lote_coincide_con_escalar(proyectos):
+    inversiones, flujos, tasas = proyectos
+
+    vans = calcular_van_lote(inversiones, flujos, tasas)
+    vans_tasa_comun = calcular_van_lote(inversiones, flujos, 0.1)
+
+    for i in range(len(flujos)):
+        assert vans[i] == pytest.approx(referencia.calcular_van(inversiones[i], flujos[i], tasas[i]))
+        assert vans_tasa_comun[i] == pytest.approx(referencia.calcular_van(inversiones[i], flujos[i], 0.1))
+
+
+def test_calcular_van_con_y_sin_detalle():
+    flujos = [30_000, 40_000, 50_000, 20_000]
+    periodos = list(range(1, len(flujos) + 1))
+    esperado = referencia.calcular_van(100_000, flujos, 0.08)
+
+    van, descontados, detalle = calcular_van(100_000, flujos, 0.08, periodos)
+    assert van == pytest.approx(esperado)
+    assert descontados == pytest.approx([f / 1.08 ** (i + 1) for i, f in enumerate(flujos)])
+    assert [fila['Período'] for fila in detalle] == periodos
+
+    van, descontados, detalle = calcular_van(100_000, flujos, 0.08, periodos, detalle=False)
+    assert van == pytest.approx(esperado)
+    assert descontados is None and detalle is None
+
+
+def test_modelo_incremental_sigue_al_van_escalar():
+    rng = np.random.default_rng(11)
+    flujos = rng.normal(10_000, 5_000, size=40)
+    tasas_sensibilidad = np.linspace(0.0, 0.3, 7)
+    modelo = ModeloVanIncremental(50_000, flujos, 0.1, tasas_sensibilidad=tasas_sensibilidad)
+
+    for _ in range(25):
+        indice = int(rng.integers(len(flujos)))
+        flujos[indice] = rng.normal(10_000, 5_000)
+        modelo.actualizar_flujo(indice, flujos[indice])
+    modelo.actualizar_inversion(60_000)
+    modelo.actualizar_tasa(0.12)
+
+    assert modelo.van == pytest.approx(referencia.calcular_van(60_000, flujos, 0.12))
+    for tasa, van in zip(tasas_sensibilidad, modelo.vans_sensibilidad):
+        assert van == pytest.approx(referencia.calcular_van(60_000, flujos, tasa))
+
+    acumulados = np.cumsum(np.concatenate(([-60_000], flujos)))
+    assert modelo.flujos_acumulados() == pytest.approx(acumulados)
+    recuperado = np.flatnonzero(acumulados > 0)
+    assert modelo.periodo_recuperacion() == (int(recuperado[0]) if recuperado.size else None)
+
+
+def test_modelo_incremental_reconstruye_al_pegar_columna():
+    flujos = np.full(64, 1_000.0)
+    modelo = ModeloVanIncremental(10_000, flujos, 0.05)
+    modelo.flujos_acumulados()
+
+    nuevos = np.arange(64, dtype=float) * 100
+    invalidadas = modelo.actualizar_flujos(nuevos)
+
+    assert modelo.van == pytest.approx(referencia.calcular_van(10_000, nuevos, 0.05))
+    assert modelo.flujo_acumulado(10) == pytest.approx(nuevos[:10].sum() - 10_000)
+    assert invalidadas == {'acumulados'}
+
+
+def test_modelo_incremental_tir_usa_los_parametros_de_calcular_tir():
+    flujos = [30_000.0, 40_000.0, 50_000.0, 20_000.0]
+    modelo = ModeloVanIncremental(100_000, flujos, 0.08)
+
+    assert modelo.tir() == calcular_tir(100_000, flujos)
+    assert ModeloVanIncremental(1_000, [-10.0, -20.0], 0.1).tir() is None
+
+
+def test_modelo_incremental_recalcula_la_sensibilidad_periodicamente():
+    rng = np.random.default_rng(5)
+    flujos = rng.normal(1e9, 5e8, size=16)
+    tasas_sensibilidad = np.linspace(0.0, 0.3, 5)
+    modelo = ModeloVanIncremental(1e9, flujos, 0.1, tasas_sensibilidad=tasas_sensibilidad)
+
+    for _ in range(ModeloVanIncremental.EDICIONES_SENSIBILIDAD * 3 + 1):
+        indice = int(rng.integers(len(flujos)))
+        flujos[indice] = rng.normal(1e9, 5e8)
+        modelo.actualizar_flujo(indice, flujos[indice])
+    assert modelo._ediciones_sensibilidad == 1
+
+    for tasa, van in zip(tasas_sensibilidad, modelo.vans_sensibilidad):
+        assert van == pytest.approx(referencia.calcular_van(1e9, flujos, tasa), rel=1e-12)
+
+
+def _tir_referencia(inversion, flujos):
+    try:
+        tir = referencia.calcular_tir(inversion, flujos)
+    except ZeroDivisionError:
+        return None
+    return None if isinstance(tir, complex) else tir
+
+
+def test_tir_lote_coincide_con_escalar_en_flujos_convencionales(proyectos):
+    inversiones, flujos, _ = proyectos
+    flujos = np.abs(flujos)
+
+    tir, estado, _ = calcular_tir_lote(inversiones, flujos)
+
+    assert (estado == TIR_CONVERGIO).all()
+    for i in range(len(flujos)):
+        assert tir[i] == pytest.approx(referencia.calcular_tir(inversiones[i], flujos[i].tolist()), abs=1e-6)
+
+
+def test_tir_no_pierde_raices_que_encontraba_el_escalar():
+    rng = np.random.default_rng(2024)
+    for _ in range(500):
+        inversion = float(rng.normal(100, 100))
+        flujos = rng.normal(0, 100, size=int(rng.integers(3, 13))).tolist()
+        esperado = _tir_referencia(inversion, flujos)
+        if esperado is None:
+            continue
+
+        tir = calcular_tir(inversion, flujos)
+        assert tir is not None, (inversion, flujos, esperado)
+        # Con varias raíces puede devolver otra distinta, pero siempre una raíz
+        van = referencia.calcular_van(inversion, flujos, tir)
+        escala = abs(inversion) + sum(abs(f / (1 + tir) ** (i + 1)) for i, f in enumerate(flujos))
+        assert abs(van) <= 1e-6 * escala
+
+
+def test_tir_con_dos_raices_cercanas_sin_cambio_de_signo_en_los_limites():
+    # VAN negativo en 0, -0.2, ..., -0.999 y en todos los límites superiores,
+    # con raíces en -0.1 y -0.12: sólo Newton sin intervalo las encuentra
+    # VAN = -(v - 1/0.9)(v - 1/0.88) con v = 1 / (1 + tasa)
+    coeficientes = -np.poly((1 / 0.9, 1 / 0.88))[::-1]
+    inversion, flujos = -coeficientes[0], coeficientes[1:].tolist()
+
+    tir, estado, _ = calcular_tir_lote(inversion, [flujos])
+
+    assert estado[0] == TIR_CONVERGIO
+    assert tir[0] == pytest.approx(-0.1)
+    assert tir[0] == pytest.approx(referencia.calcular_tir(inversion, flujos), abs=1e-5)
+
+
+def test_tir_sin_raiz_queda_marcada():
+    tir, estado, _ = calcular_tir_lote(1_000, [[-10.0, -20.0, -30.0]])
+
+    assert np.isnan(tir[0])
+    assert estado[0] == TIR_SIN_CAMBIO_SIGNO
+    assert calcular_tir(1_000, [-10.0, -20.0, -30.0]) is None
+
+
+def test_tir_de_flujos_nulos_es_la_semilla_original():
+    assert calcular_tir(0, [0] * 5) == referencia.calcular_tir(0, [0] * 5) == 0.1
+
+
+def test_cache_factores_trata_anual_y_none_como_la_misma_clave():
+    cache = CacheFactores()
+
+    factores = cache.obtener(0.1, 12)
+
+    assert cache.obtener(0.1, 12, "Anual") is factores
+    assert cache.estadisticas()['entradas'] == 1
+    assert cache.aciertos == 1
+    assert factores == pytest.approx(1.1 ** np.arange(1, 13))
+
+
+def test_periodo_recuperacion_con_inversion_nula_o_negativa():
+    periodos = periodo_recuperacion_lote(
+        [100, 0, 0, 0, -5],
+        [[60, 60], [5, 1], [-5, 10], [-1, -1], [-1, -1]]
+    )
+
+    assert periodos[:3].tolist() == [2.0, 1.0, 2.0]
+    assert np.isnan(periodos[3])
+    assert periodos[4] == 0
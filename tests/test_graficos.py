@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+
+from almacenamiento import histograma_por_bloques
+from graficos import bordes_histograma, lttb, reducir_serie
+
+
+def _lttb_referencia(x, y, n_salida):
+    """LTTB escalar de la descripción original (Steinarsson, 2013)"""
+    n = len(x)
+    cada = (n - 2) / (n_salida - 2)
+    elegidos = [0]
+    a = 0
+    for i in range(n_salida - 2):
+        inicio = math.floor(i * cada) + 1
+        fin = math.floor((i + 1) * cada) + 1
+        siguiente_fin = min(math.floor((i + 2) * cada) + 1, n)
+        x_prom = sum(x[fin:siguiente_fin]) / (siguiente_fin - fin)
+        y_prom = sum(y[fin:siguiente_fin]) / (siguiente_fin - fin)
+        mejor, mayor_area = inicio, -1.0
+        for j in range(inicio, fin):
+            area = abs((x[a] - x_prom) * (y[j] - y[a]) - (x[a] - x[j]) * (y_prom - y[a]))
+            if area > mayor_area:
+                mejor, mayor_area = j, area
+        elegidos.append(mejor)
+        a = mejor
+    elegidos.append(n - 1)
+    return elegidos
+
+
+def test_lttb_coincide_con_la_version_escalar():
+    rng = np.random.default_rng(8)
+    x = np.arange(5_000, dtype=float)
+    y = np.cumsum(rng.normal(size=5_000))
+
+    for n_salida in (3, 10, 257, 1_000):
+        assert lttb(x, y, n_salida).tolist() == _lttb_referencia(x.tolist(), y.tolist(), n_salida)
+
+
+def test_reducir_serie_conserva_extremos_y_picos():
+    x = np.arange(100_000)
+    y = np.zeros(100_000)
+    y[37_123] = 50.0
+
+    x_red, y_red = reducir_serie(x, y, max_puntos=500)
+
+    assert len(x_red) == 500
+    assert (x_red[0], x_red[-1]) == (0, 99_999)
+    assert 37_123 in x_red and y_red.max() == 50.0
+
+
+def test_histograma_por_bloques_coincide_con_numpy():
+    valores = np.random.default_rng(9).normal(size=25_001)
+    valores[::1_000] = np.nan
+
+    conteos, bordes = histograma_por_bloques(valores, bins=40, tam_bloque=4_096)
+
+    finitos = valores[np.isfinite(valores)]
+    esperados, bordes_numpy = np.histogram(finitos, bins=40)
+    assert np.array_equal(conteos, esperados)
+    assert np.allclose(bordes, bordes_numpy)
+
+
+def test_bordes_de_enteros_cubren_valores_completos():
+    bordes = bordes_histograma(np.array([3, 7, 12, 30]), bins=5)
+
+    assert bordes[0] == 2.5 and bordes[-1] >= 30.5
+    assert np.all(np.diff(bordes) == np.diff(bordes)[0]) and np.diff(bordes)[0] % 1 == 0
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import referencia
+from montecarlo import (Distribucion, comparar_muestreadores, flujos_inciertos, muestreadores_disponibles,
+                        muestrear_flujos, simular_van)
+
+FLUJOS = [30_000.0, 40_000.0, 50_000.0, 20_000.0, 15_000.0]
+
+
+def test_flujos_constantes_reproducen_van_y_tir_escalares():
+    resumen = simular_van(100_000, FLUJOS, 0.08, 1_000, semilla=1)
+
+    assert np.allclose(resumen['vans'], referencia.calcular_van(100_000, FLUJOS, 0.08))
+    assert np.allclose(resumen['tirs'], referencia.calcular_tir(100_000, FLUJOS), atol=1e-6)
+    assert resumen['prob_van_negativo'] == 0.0
+
+
+def test_van_medio_converge_al_van_de_las_medias():
+    # El VAN es lineal en los flujos: su media es el VAN de los flujos medios
+    flujos = flujos_inciertos(FLUJOS, 'triangular', 0.3)
+    esperado = referencia.calcular_van(100_000, FLUJOS, 0.08)
+
+    resumen = simular_van(100_000, flujos, 0.08, 50_000, semilla=2, incluir_tir=False)
+
+    assert abs(resumen['van_medio'] - esperado) < 4 * resumen['error_van_medio']
+
+
+def test_semilla_hace_reproducible_la_simulacion():
+    flujos = flujos_inciertos(FLUJOS, 'normal', 0.2)
+    tasa = Distribucion.normal(0.08, 0.01)
+
+    primera = simular_van(100_000, flujos, tasa, 5_000, semilla=3)
+    segunda = simular_van(100_000, flujos, tasa, 5_000, semilla=3)
+
+    assert np.array_equal(primera['vans'], segunda['vans'])
+    assert np.array_equal(primera['tirs'], segunda['tirs'], equal_nan=True)
+
+
+def test_tir_por_escenario_coincide_con_escalar():
+    flujos = flujos_inciertos(FLUJOS, 'normal', 0.2)
+
+    resumen = simular_van(100_000, flujos, 0.08, 20, semilla=4, tam_bloque=7)
+
+    # Mismo generador y mismos bloques que simular_van: los mismos escenarios
+    rng = np.random.default_rng(4)
+    muestras = np.concatenate([muestrear_flujos(flujos, n, rng) for n in (7, 7, 6)])
+    for muestra, van, tir in zip(muestras, resumen['vans'], resumen['tirs']):
+        assert van == pytest.approx(referencia.calcular_van(100_000, muestra.tolist(), 0.08))
+        assert tir == pytest.approx(referencia.calcular_tir(100_000, muestra.tolist()), abs=1e-6)
+
+
+@pytest.mark.parametrize('muestreador', muestreadores_disponibles())
+def test_cada_muestreador_estima_el_van_medio_sin_sesgo(muestreador):
+    flujos = flujos_inciertos(FLUJOS, 'normal', 0.3)
+    esperado = referencia.calcular_van(100_000, FLUJOS, 0.08)
+
+    # Con 32 réplicas el error estimado de 'hipercubo' y 'sobol' es estable
+    resumen = simular_van(100_000, flujos, 0.08, 4_096, semilla=5, incluir_tir=False,
+                          muestreador=muestreador, replicas=32)
+
+    assert resumen['muestreador'] == muestreador
+    assert abs(resumen['van_medio'] - esperado) <= 4 * resumen['error_van_medio'] + 1e-6 * abs(esperado)
+
+
+def test_muestreadores_reducen_la_varianza_del_van_medio():
+    flujos = flujos_inciertos(FLUJOS, 'normal', 0.3)
+
+    reporte = comparar_muestreadores(100_000, flujos, 0.08, 1_000, repeticiones=10, semilla=6,
+                                     muestreadores=('pseudo', 'antitetico', 'hipercubo'))
+
+    reduccion = {fila['muestreador']: fila['reduccion_van_medio'] for fila in reporte}
+    assert reduccion['pseudo'] == 1.0
+    assert reduccion['antitetico'] > 10
+    assert reduccion['hipercubo'] > 10
+
+
+def test_sin_muestreadores_compara_solo_los_disponibles():
+    reporte = comparar_muestreadores(100_000, flujos_inciertos(FLUJOS, 'normal', 0.3), 0.08, 64,
+                                     repeticiones=2, semilla=7)
+
+    assert tuple(fila['muestreador'] for fila in reporte) == muestreadores_disponibles()
+
+
+def test_antitetico_empareja_bien_los_bloques_impares():
+    # Con flujos normales y tasa fija cada par u / 1 - u promedia el VAN
+    # determinista: sólo la fila central de cada bloque impar aporta varianza
+    resumen = simular_van(100_000, flujos_inciertos(FLUJOS, 'normal', 0.3), 0.08, 1_001,
+                          semilla=3, tam_bloque=333, muestreador='antitetico')
+
+    assert resumen['error_van_medio'] < resumen['van_desviacion'] / 200
+    assert resumen['van_medio'] == pytest.approx(referencia.calcular_van(100_000, FLUJOS, 0.08), rel=0.01)
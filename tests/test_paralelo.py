@@ -0,0 +1,26 @@
+import numpy as np
+
+from paralelo import resumir_meses_paralelo, simular_meses_paralelo
+from simulador import SimuladorProyectos
+
+
+def test_meses_paralelo_no_depende_del_numero_de_procesos():
+    uno = simular_meses_paralelo(25, 4, semilla=9, max_workers=1, tam_bloque=10)
+    dos = simular_meses_paralelo(25, 4, semilla=9, max_workers=2, tam_bloque=10)
+
+    assert uno['monto'].shape == (25, 4)
+    assert all(np.array_equal(uno[columna], dos[columna]) for columna in uno)
+    assert resumir_meses_paralelo(25, 4, semilla=9, max_workers=1, tam_bloque=10)['ingresos'].n == 25
+
+
+def test_cero_meses_devuelve_el_resultado_vacio_de_la_version_serie():
+    simulador = SimuladorProyectos()
+    serie = simulador.generar_meses(0, 4, semilla=1)
+
+    meses = simular_meses_paralelo(0, 4, semilla=1)
+    acumuladores = resumir_meses_paralelo(0, 4, semilla=1)
+
+    assert meses.keys() == serie.keys()
+    assert all(meses[columna].shape == serie[columna].shape for columna in serie)
+    assert acumuladores.keys() == simulador.acumular_meses(serie).keys()
+    assert acumuladores['ingresos'].n == 0
@@ -0,0 +1,37 @@
+import random
+
+import numpy as np
+
+from simulador import SimuladorProyectos
+
+
+def _montos(semilla=None):
+    return np.asarray(SimuladorProyectos().generar_proyectos(5, semilla=semilla).monto)
+
+
+def test_random_seed_hace_reproducible_generar_proyectos():
+    random.seed(123)
+    primera = _montos()
+    random.seed(123)
+    segunda = _montos()
+
+    assert np.array_equal(primera, segunda)
+
+
+def test_semilla_explicita_no_depende_del_modulo_random():
+    random.seed(1)
+    primera = _montos(semilla=7)
+    random.seed(2)
+    segunda = _montos(semilla=7)
+
+    assert np.array_equal(primera, segunda)
+
+
+def test_tabla_proyectos_admite_slices_como_la_lista_original():
+    tabla = SimuladorProyectos().generar_proyectos(5, semilla=3)
+    montos = [proyecto.monto for proyecto in tabla]
+
+    assert [proyecto.monto for proyecto in tabla[1:4]] == montos[1:4]
+    assert [proyecto.monto for proyecto in tabla[::-2]] == montos[::-2]
+    assert tabla[-1].monto == montos[-1]
+    assert tabla[10:] == []
@@ -1,86 +1,317 @@
-import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 
-def calcular_van(inversion_inicial, flujos_caja, tasa_descuento, periodos):
+from cache_sesion import cache_de_sesion
+from almacenamiento import leer_columna_flujos
+from diagnostico import de_fragmento, iniciar as iniciar_diagnostico, mostrar_panel as mostrar_diagnostico
+from metricas import iniciar_desde_entorno as iniciar_metricas
+from fragmentos import ejecutar_fragmento, expansor
+from graficos import fabrica_de_sesion, traza_barras, traza_histograma, traza_linea
+from finanzas import calcular_van, calcular_tir, tasa_periodica, ModeloVanIncremental
+from montecarlo import Distribucion, comparar_muestreadores, flujos_inciertos, muestreadores_disponibles, simular_van
+
+# Por encima de este horizonte los flujos se editan sólo en la tabla (un widget por período es lento)
+MAX_CAMPOS_FLUJO = 50
+MAX_PERIODOS = 10_000
+MODOS_ENTRADA = ("Campos por período", "Tabla / pegar columna")
+
+def aplicar_entrada_masiva(st):
     """
-    Calcula el Valor Actual Neto (VAN)
+    Callback del formulario de flujos: aplica la columna subida o pegada o,
+    si no hay ninguna, las celdas editadas en la tabla
     
-    Args:
-        inversion_inicial (float): Inversión inicial del proyecto
-        flujos_caja (list): Lista de flujos de caja por período
-        tasa_descuento (float): Tasa de descuento (como decimal)
-        periodos (list): Lista de períodos
-    
-    Returns:
-        tuple: (VAN, flujos_descontados, detalles_calculo)
+    Corre antes de la reejecución, así que puede ajustar el número de períodos
+    al largo de la columna cargada. Al terminar cambia las claves del editor y
+    del archivo para que la tabla se muestre sin las ediciones ya aplicadas y el
+    archivo subido no vuelva a aplicarse sobre las ediciones siguientes.
     """
-    flujos_descontados = []
-    detalles_calculo = []
-    
-    for i, flujo in enumerate(flujos_caja):
-        periodo = i + 1
-        factor_descuento = (1 + tasa_descuento) ** periodo
-        flujo_descontado = flujo / factor_descuento
-        flujos_descontados.append(flujo_descontado)
-        
-        detalles_calculo.append({
-            'Período': periodo,
-            'Flujo de Caja': flujo,
-            'Factor de Descuento': factor_descuento,
-            'Flujo Descontado': flujo_descontado
-        })
-    
-    van = -inversion_inicial + sum(flujos_descontados)
-    
-    return van, flujos_descontados, detalles_calculo
+    archivo = st.session_state.get(clave_archivo_flujos(st))
+    texto = st.session_state.get('flujos_texto', '')
+    if archivo is not None or texto.strip():
+        try:
+            flujos = leer_columna_flujos(archivo.getvalue().decode('utf-8') if archivo is not None else texto)
+        except (ValueError, UnicodeDecodeError) as error:
+            st.session_state.error_flujos = str(error)
+            return
+        if not 1 <= len(flujos) <= MAX_PERIODOS:
+            st.session_state.error_flujos = f"La columna debe tener entre 1 y {MAX_PERIODOS:,} flujos ({len(flujos):,} leídos)"
+            return
+        st.session_state.flujos_caja = flujos.tolist()
+        st.session_state.num_periodos = len(flujos)
+        st.session_state.flujos_texto = ''
+    else:
+        # Sólo las celdas modificadas: {fila: {columna: valor}}
+        edicion = st.session_state.get(clave_editor_flujos(st)) or {}
+        for fila, cambios in edicion.get('edited_rows', {}).items():
+            if cambios.get('Flujo') is not None:
+                st.session_state.flujos_caja[int(fila)] = float(cambios['Flujo'])
+    st.session_state.version_editor_flujos = st.session_state.get('version_editor_flujos', 0) + 1
 
-def calcular_tir(inversion_inicial, flujos_caja, max_iter=1000, precision=1e-6):
-    """
-    Calcula la Tasa Interna de Retorno (TIR) usando el método de Newton-Raphson
-    """
-    def van_funcion(tasa):
-        van = -inversion_inicial
-        for i, flujo in enumerate(flujos_caja):
-            van += flujo / ((1 + tasa) ** (i + 1))
-        return van
-    
-    def derivada_van(tasa):
-        derivada = 0
-        for i, flujo in enumerate(flujos_caja):
-            derivada += -flujo * (i + 1) / ((1 + tasa) ** (i + 2))
-        return derivada
-    
-    # Estimación inicial
-    tasa = 0.1
-    
-    for _ in range(max_iter):
-        van_actual = van_funcion(tasa)
-        if abs(van_actual) < precision:
-            return tasa
-        
-        derivada = derivada_van(tasa)
-        if abs(derivada) < precision:
-            return None  # No se puede calcular
-        
-        tasa_nueva = tasa - van_actual / derivada
-        
-        if abs(tasa_nueva - tasa) < precision:
-            return tasa_nueva
-        
-        tasa = tasa_nueva
+def clave_editor_flujos(st):
+    return f"editor_flujos_{st.session_state.get('version_editor_flujos', 0)}"
+
+def clave_archivo_flujos(st):
+    return f"flujos_archivo_{st.session_state.get('version_editor_flujos', 0)}"
+
+def tabla_detalle(detalles_calculo):
+    """Tabla de detalle por período con columnas numéricas (el formato lo aplica formato_detalle)"""
+    import pandas as pd
     
-    return None  # No convergió
+    return pd.DataFrame(detalles_calculo)
+
+def formato_detalle(st):
+    """Formato de montos y factores de la tabla de detalle, aplicado al mostrarla"""
+    return {
+        'Flujo de Caja': st.column_config.NumberColumn(format="$%,.2f"),
+        'Factor de Descuento': st.column_config.NumberColumn(format="%.4f"),
+        'Flujo Descontado': st.column_config.NumberColumn(format="$%,.2f")
+    }
+
+# Cada gráfico se arma en dos partes para FabricaFiguras: la plantilla (layout,
+# se arma una vez) y las trazas (se reemplazan cuando cambian los datos)
+
+def plantilla_flujos():
+    """Layout del gráfico de barras de los flujos de caja"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.update_layout(
+        title="Flujos de Caja por Período",
+        xaxis_title="Período",
+        yaxis_title="Flujo de Caja ($)",
+        showlegend=False
+    )
+    return fig
+
+def trazas_flujos(inversion_inicial, flujos_caja):
+    """Barras de los flujos de caja (período 0 = inversión)"""
+    flujos_totales = np.concatenate(([-inversion_inicial], np.asarray(flujos_caja, dtype=float)))
+    periodos = np.arange(len(flujos_totales))
+    
+    return [traza_barras(
+        periodos,
+        flujos_totales,
+        color_positivo='green',
+        color_negativo='red',
+        name="Flujos de Caja"
+    )]
+
+def plantilla_acumulados():
+    """Layout de los flujos acumulados con la línea de equilibrio"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Punto de Equilibrio")
+    
+    fig.update_layout(
+        title="Flujos de Caja Acumulados",
+        xaxis_title="Período",
+        yaxis_title="Flujo Acumulado ($)",
+        showlegend=False
+    )
+    return fig
+
+def trazas_acumulados(flujos_acumulados):
+    return [traza_linea(
+        np.arange(len(flujos_acumulados)),
+        flujos_acumulados,
+        mode='lines+markers',
+        name="Flujos Acumulados",
+        line=dict(color='blue', width=3)
+    )]
+
+def plantilla_sensibilidad(tasa_descuento_pct):
+    """Layout de la sensibilidad del VAN, marcando la tasa actual"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="VAN = 0")
+    fig.add_vline(x=tasa_descuento_pct, line_dash="dash", line_color="blue", annotation_text="Tasa Actual")
+    
+    fig.update_layout(
+        title="Sensibilidad del VAN a la Tasa de Descuento",
+        xaxis_title="Tasa de Descuento (%)",
+        yaxis_title="VAN ($)"
+    )
+    return fig
+
+def trazas_sensibilidad(tasas_test, vans_sensibilidad):
+    return [traza_linea(
+        tasas_test * 100,
+        vans_sensibilidad,
+        mode='lines',
+        name="VAN vs Tasa de Descuento",
+        line=dict(color='purple', width=2)
+    )]
+
+def plantilla_distribucion_van():
+    """Layout del histograma de los VAN simulados"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="VAN = 0")
+    fig.update_layout(
+        title="Distribución Simulada del VAN",
+        xaxis_title="VAN ($)",
+        yaxis_title="Escenarios",
+        showlegend=False
+    )
+    return fig
+
+def trazas_distribucion_van(vans):
+    """Histograma agrupado en el servidor: se envían 60 barras, no los escenarios"""
+    return [traza_histograma(vans, 60, marker_color='#8e44ad', name="Escenarios")]
+
+def panel_sensibilidad(diagnostico_app, modelo, tasas_test, tasa_descuento_pct, entradas_proyecto):
+    """Curva de sensibilidad del VAN (fragmento): no se calcula mientras el expansor está cerrado"""
+    import streamlit as st
+    
+    diagnostico = de_fragmento(st, diagnostico_app, "sensibilidad")
+    diagnostico.seccion("sensibilidad.expansor")
+    fabrica = fabrica_de_sesion(st)
+    
+    contenedor, abierto = expansor(st, "Ver Análisis de Sensibilidad de la Tasa de Descuento", "expansor_sensibilidad")
+    with contenedor:
+        if abierto:
+            diagnostico.seccion("sensibilidad.figura")
+            fig3 = fabrica.obtener(
+                'sensibilidad', tasa_descuento_pct, entradas_proyecto,
+                lambda: plantilla_sensibilidad(tasa_descuento_pct),
+                lambda: trazas_sensibilidad(tasas_test, modelo.vans_sensibilidad)
+            )
+            
+            diagnostico.seccion("sensibilidad.envio")
+            st.plotly_chart(fig3, use_container_width=True)
+    
+    if diagnostico is not diagnostico_app:
+        diagnostico.registrar()
+
+def panel_montecarlo(diagnostico_app, inversion_inicial, flujos_caja, tasa_periodo, tipo_periodo):
+    """Simulación de riesgo (fragmento): sus controles sólo reejecutan este panel"""
+    import streamlit as st
+    import pandas as pd
+    
+    diagnostico = de_fragmento(st, diagnostico_app, "montecarlo")
+    diagnostico.seccion("montecarlo.entradas")
+    fabrica = fabrica_de_sesion(st)
+    
+    contenedor, abierto = expansor(st, "Simular el VAN con flujos inciertos", "expansor_montecarlo")
+    with contenedor:
+        if abierto:
+            col_sim1, col_sim2, col_sim3 = st.columns(3)
+            with col_sim1:
+                tipo_distribucion = st.selectbox("Distribución de los flujos", ["normal", "triangular", "lognormal"])
+                variacion_flujos = st.number_input("Variación de los flujos (%)", min_value=0.0, value=20.0, step=1.0) / 100
+            with col_sim2:
+                variacion_tasa = st.number_input("Desviación de la tasa (puntos %)", min_value=0.0, value=0.0, step=0.5) / 100
+                n_escenarios = st.number_input("Escenarios", min_value=1000, max_value=1_000_000, value=100_000, step=10_000)
+            with col_sim3:
+                semilla = st.number_input("Semilla", min_value=0, value=42, step=1)
+                muestreador = st.selectbox(
+                    "Muestreador",
+                    list(muestreadores_disponibles()),
+                    help="antitetico, control, hipercubo y sobol reducen la varianza frente al muestreo simple"
+                )
+                incluir_tir = st.checkbox("Calcular TIR por escenario", value=False)
+            
+            tasa_simulada = tasa_periodo
+            if variacion_tasa > 0:
+                tasa_simulada = Distribucion.normal(tasa_periodo, tasa_periodica(variacion_tasa, tipo_periodo))
+            flujos_simulados = flujos_inciertos(flujos_caja, tipo_distribucion, variacion_flujos)
+            
+            diagnostico.seccion("montecarlo.simulacion")
+            col_btn_sim1, col_btn_sim2 = st.columns(2)
+            with col_btn_sim1:
+                if st.button("▶️ Ejecutar Simulación"):
+                    with st.spinner("Simulando escenarios..."):
+                        st.session_state.simulacion_van = simular_van(
+                            inversion_inicial,
+                            flujos_simulados,
+                            tasa_simulada,
+                            int(n_escenarios),
+                            semilla=int(semilla),
+                            incluir_tir=incluir_tir,
+                            tipo_periodo=tipo_periodo,
+                            muestreador=muestreador
+                        )
+            with col_btn_sim2:
+                if st.button("⚖️ Comparar Muestreadores"):
+                    with st.spinner("Repitiendo la simulación con cada muestreador..."):
+                        st.session_state.comparacion_muestreadores = comparar_muestreadores(
+                            inversion_inicial,
+                            flujos_simulados,
+                            tasa_simulada,
+                            min(int(n_escenarios), 20_000),
+                            semilla=int(semilla),
+                            tipo_periodo=tipo_periodo
+                        )
+            
+            diagnostico.seccion("montecarlo.resultados")
+            comparacion_muestreadores = st.session_state.get('comparacion_muestreadores')
+            if comparacion_muestreadores:
+                st.markdown("**Reducción de varianza frente al muestreo simple**")
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Muestreador': r['muestreador'],
+                        'P(VAN < 0)': f"{r['prob_van_negativo']*100:.2f}%",
+                        'Reducción P(VAN < 0)': f"{r['reduccion_prob']:.1f}x",
+                        'Reducción VAN medio': f"{r['reduccion_van_medio']:.1f}x",
+                        'Escenarios equivalentes': f"{r['escenarios_equivalentes']:,.0f}"
+                    }
+                    for r in comparacion_muestreadores
+                ]), hide_index=True, use_container_width=True)
+            
+            simulacion = st.session_state.get('simulacion_van')
+            if simulacion:
+                col_res1, col_res2, col_res3 = st.columns(3)
+                with col_res1:
+                    st.metric("💰 VAN Medio", f"${simulacion['van_medio']:,.2f}")
+                with col_res2:
+                    st.metric(
+                        "⚠️ P(VAN < 0)",
+                        f"{simulacion['prob_van_negativo']*100:.2f}%",
+                        delta=(
+                            f"±{1.96*simulacion['error_prob_van_negativo']*100:.2f}% (95%)"
+                            if simulacion['error_prob_van_negativo'] is not None else None
+                        ),
+                        delta_color="off"
+                    )
+                with col_res3:
+                    if simulacion.get('tir_media') is not None:
+                        st.metric("📈 TIR Media", f"{simulacion['tir_media']*100:.2f}%")
+                    else:
+                        st.metric("📊 Desviación del VAN", f"${simulacion['van_desviacion']:,.2f}")
+            
+                st.dataframe(pd.DataFrame({
+                    'Percentil': [f"P{p}" for p in simulacion['percentiles_van']],
+                    'VAN': [f"${v:,.2f}" for v in simulacion['percentiles_van'].values()]
+                }), hide_index=True, use_container_width=True)
+            
+                diagnostico.seccion("grafico_montecarlo.figura")
+                fig4 = fabrica.obtener(
+                    'grafico_montecarlo', (), simulacion['vans'],
+                    plantilla_distribucion_van, lambda: trazas_distribucion_van(simulacion['vans'])
+                )
+                diagnostico.seccion("grafico_montecarlo.envio")
+                st.plotly_chart(fig4, use_container_width=True)
+    
+    if diagnostico is not diagnostico_app:
+        diagnostico.registrar()
 
 def main():
+    import streamlit as st
+    import pandas as pd
+    
     st.set_page_config(
         page_title="Calculadora VAN - Valor Actual Neto",
         page_icon="💰",
         layout="wide"
     )
+    diagnostico = iniciar_diagnostico(st, "van")
+    cache = cache_de_sesion(st)
+    fabrica = fabrica_de_sesion(st)
+    iniciar_metricas()
+    diagnostico.seccion("entradas")
     
     st.title("💰 Calculadora de Valor Actual Neto (VAN)")
     st.markdown("---")
@@ -116,19 +347,18 @@ def main():
     )
     
     # Ajustar tasa para períodos mensuales
+    tasa_periodo = tasa_periodica(tasa_descuento, tipo_periodo)
     if tipo_periodo == "Mensual":
-        tasa_periodo = (1 + tasa_descuento) ** (1/12) - 1
         st.sidebar.info(f"Tasa mensual equivalente: {tasa_periodo*100:.3f}%")
-    else:
-        tasa_periodo = tasa_descuento
     
     # Número de períodos
     num_periodos = st.sidebar.number_input(
         f"🔢 Número de {tipo_periodo.lower()}s",
         min_value=1,
-        max_value=50,
+        max_value=MAX_PERIODOS,
         value=5,
-        step=1
+        step=1,
+        key="num_periodos"
     )
     
     st.sidebar.markdown("---")
@@ -152,25 +382,56 @@ def main():
                 # Reducir períodos
                 st.session_state.flujos_caja = st.session_state.flujos_caja[:num_periodos]
         
-        # Crear inputs para cada período
-        flujos_caja = []
-        
-        # Organizar en columnas para mejor visualización
-        cols_per_row = 3
-        for i in range(0, num_periodos, cols_per_row):
-            cols = st.columns(cols_per_row)
-            for j in range(cols_per_row):
-                if i + j < num_periodos:
-                    periodo_num = i + j + 1
-                    with cols[j]:
-                        flujo = st.number_input(
-                            f"Período {periodo_num}",
-                            value=st.session_state.flujos_caja[i + j],
-                            step=1000.0,
-                            key=f"flujo_{periodo_num}"
-                        )
-                        flujos_caja.append(flujo)
-                        st.session_state.flujos_caja[i + j] = flujo
+        modo_flujos = st.radio("Entrada de flujos", MODOS_ENTRADA, horizontal=True, key="modo_flujos")
+        if modo_flujos == MODOS_ENTRADA[0] and num_periodos > MAX_CAMPOS_FLUJO:
+            st.info(f"Con más de {MAX_CAMPOS_FLUJO} períodos los flujos se editan en la tabla")
+            modo_flujos = MODOS_ENTRADA[1]
+        
+        if modo_flujos == MODOS_ENTRADA[0]:
+            # Crear inputs para cada período
+            flujos_caja = []
+            
+            # Organizar en columnas para mejor visualización
+            cols_per_row = 3
+            for i in range(0, num_periodos, cols_per_row):
+                cols = st.columns(cols_per_row)
+                for j in range(cols_per_row):
+                    if i + j < num_periodos:
+                        periodo_num = i + j + 1
+                        with cols[j]:
+                            flujo = st.number_input(
+                                f"Período {periodo_num}",
+                                value=st.session_state.flujos_caja[i + j],
+                                step=1000.0,
+                                key=f"flujo_{periodo_num}"
+                            )
+                            flujos_caja.append(flujo)
+                            st.session_state.flujos_caja[i + j] = flujo
+        else:
+            # Un solo widget para todo el horizonte; el formulario aplica los cambios en una reejecución
+            with st.form("form_flujos"):
+                st.data_editor(
+                    pd.DataFrame(
+                        {'Flujo': st.session_state.flujos_caja},
+                        index=pd.RangeIndex(1, num_periodos + 1, name='Período')
+                    ),
+                    key=clave_editor_flujos(st),
+                    num_rows="fixed",
+                    height=min(400, 35 * (num_periodos + 1) + 3),
+                    use_container_width=True
+                )
+                st.text_area(
+                    "O pega una columna de flujos (uno por línea; reemplaza todos los períodos)",
+                    key="flujos_texto",
+                    height=100
+                )
+                st.file_uploader("O sube un CSV/TXT de una columna", type=["csv", "txt"], key=clave_archivo_flujos(st))
+                st.form_submit_button("Aplicar flujos", on_click=aplicar_entrada_masiva, args=(st,))
+            
+            error_flujos = st.session_state.pop('error_flujos', None)
+            if error_flujos:
+                st.error(error_flujos)
+            flujos_caja = list(st.session_state.flujos_caja)
         
         # Botones de ayuda
         st.markdown("### 🔧 Herramientas Rápidas")
@@ -199,11 +460,29 @@ def main():
     
     with col2:
         st.header("📊 Resultados")
+        diagnostico.seccion("resultados.calculo")
         
-        # Calcular VAN
-        van, flujos_descontados, detalles_calculo = calcular_van(
-            inversion_inicial, flujos_caja, tasa_periodo, list(range(1, num_periodos + 1))
-        )
+        # Modelo incremental guardado en la sesión: editar un período sólo
+        # actualiza ese período en lugar de recalcular todo el proyecto
+        tasas_test = np.arange(0.01, 0.30, 0.01)
+        modelo = st.session_state.get('modelo_van')
+        if (modelo is None
+                or modelo.num_periodos != num_periodos
+                or st.session_state.get('modelo_van_tipo') != tipo_periodo):
+            tasas_test_periodo = [tasa_periodica(float(tasa), tipo_periodo) for tasa in tasas_test]
+            modelo = ModeloVanIncremental(
+                inversion_inicial, flujos_caja, tasa_periodo, tasas_test_periodo, tipo_periodo
+            )
+            st.session_state.modelo_van = modelo
+            st.session_state.modelo_van_tipo = tipo_periodo
+        else:
+            modelo.actualizar_tasa(tasa_periodo)
+            modelo.actualizar_inversion(inversion_inicial)
+            modelo.actualizar_flujos(flujos_caja)
+        
+        van = modelo.van
+        detalles_calculo = modelo.detalle()
+        diagnostico.seccion("resultados.metricas")
         
         # Mostrar resultados principales
         st.metric("💰 VAN", f"${van:,.2f}", delta=None)
@@ -216,7 +495,7 @@ def main():
             st.warning("⚠️ Proyecto en punto de equilibrio")
         
         # Calcular TIR
-        tir = calcular_tir(inversion_inicial, flujos_caja)
+        tir = modelo.tir()
         if tir is not None:
             st.metric("📈 TIR", f"{tir*100:.2f}%")
             if tir > tasa_descuento:
@@ -227,12 +506,7 @@ def main():
             st.warning("⚠️ No se pudo calcular la TIR")
         
         # Período de recuperación simple
-        flujos_acumulados = np.cumsum([-inversion_inicial] + flujos_caja)
-        periodo_recuperacion = None
-        for i, flujo_acum in enumerate(flujos_acumulados):
-            if flujo_acum > 0:
-                periodo_recuperacion = i
-                break
+        periodo_recuperacion = modelo.periodo_recuperacion()
         
         if periodo_recuperacion is not None:
             st.metric("⏱️ Período de Recuperación", f"{periodo_recuperacion} {tipo_periodo.lower()}s")
@@ -243,12 +517,15 @@ def main():
     st.markdown("---")
     st.header("📋 Detalle de Cálculos")
     
-    df_detalles = pd.DataFrame(detalles_calculo)
-    df_detalles['Flujo de Caja'] = df_detalles['Flujo de Caja'].apply(lambda x: f"${x:,.2f}")
-    df_detalles['Factor de Descuento'] = df_detalles['Factor de Descuento'].apply(lambda x: f"{x:.4f}")
-    df_detalles['Flujo Descontado'] = df_detalles['Flujo Descontado'].apply(lambda x: f"${x:,.2f}")
+    diagnostico.seccion("detalle.tabla")
+    # Entradas de las que dependen las secciones siguientes
+    # Como arreglo la clave de cache se resume de una vez y no elemento por elemento
+    flujos_arreglo = np.asarray(flujos_caja, dtype=float)
+    entradas_proyecto = (inversion_inicial, flujos_arreglo, tasa_periodo, tipo_periodo)
+    df_detalles = cache.obtener('detalle', entradas_proyecto, lambda: tabla_detalle(detalles_calculo))
     
-    st.dataframe(df_detalles, use_container_width=True)
+    diagnostico.seccion("detalle.envio")
+    st.dataframe(df_detalles, use_container_width=True, column_config=formato_detalle(st))
     
     # Gráficos
     st.markdown("---")
@@ -258,85 +535,39 @@ def main():
     
     with col_graf1:
         # Gráfico de flujos de caja
-        fig1 = go.Figure()
-        
-        periodos = list(range(0, num_periodos + 1))
-        flujos_totales = [-inversion_inicial] + flujos_caja
-        
-        fig1.add_trace(go.Bar(
-            x=periodos,
-            y=flujos_totales,
-            name="Flujos de Caja",
-            marker_color=['red' if x < 0 else 'green' for x in flujos_totales]
-        ))
-        
-        fig1.update_layout(
-            title="Flujos de Caja por Período",
-            xaxis_title="Período",
-            yaxis_title="Flujo de Caja ($)",
-            showlegend=False
+        diagnostico.seccion("grafico_flujos.figura")
+        fig1 = fabrica.obtener(
+            'grafico_flujos', (), (inversion_inicial, flujos_arreglo),
+            plantilla_flujos, lambda: trazas_flujos(inversion_inicial, flujos_arreglo)
         )
         
+        diagnostico.seccion("grafico_flujos.envio")
         st.plotly_chart(fig1, use_container_width=True)
     
     with col_graf2:
         # Gráfico de flujos acumulados
-        flujos_acumulados = np.cumsum(flujos_totales)
-        
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(
-            x=periodos,
-            y=flujos_acumulados,
-            mode='lines+markers',
-            name="Flujos Acumulados",
-            line=dict(color='blue', width=3)
-        ))
-        
-        fig2.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Punto de Equilibrio")
-        
-        fig2.update_layout(
-            title="Flujos de Caja Acumulados",
-            xaxis_title="Período",
-            yaxis_title="Flujo Acumulado ($)",
-            showlegend=False
+        diagnostico.seccion("grafico_acumulados.figura")
+        fig2 = fabrica.obtener(
+            'grafico_acumulados', (), (inversion_inicial, flujos_arreglo),
+            plantilla_acumulados, lambda: trazas_acumulados(modelo.flujos_acumulados())
         )
         
+        diagnostico.seccion("grafico_acumulados.envio")
         st.plotly_chart(fig2, use_container_width=True)
     
     # Análisis de sensibilidad
     st.markdown("---")
     st.header("🔍 Análisis de Sensibilidad")
     
-    with st.expander("Ver Análisis de Sensibilidad de la Tasa de Descuento"):
-        tasas_test = np.arange(0.01, 0.30, 0.01)
-        vans_sensibilidad = []
-        
-        for tasa_test in tasas_test:
-            tasa_test_periodo = (1 + tasa_test) ** (1/12) - 1 if tipo_periodo == "Mensual" else tasa_test
-            van_test, _, _ = calcular_van(inversion_inicial, flujos_caja, tasa_test_periodo, list(range(1, num_periodos + 1)))
-            vans_sensibilidad.append(van_test)
-        
-        fig3 = go.Figure()
-        fig3.add_trace(go.Scatter(
-            x=tasas_test * 100,
-            y=vans_sensibilidad,
-            mode='lines',
-            name="VAN vs Tasa de Descuento",
-            line=dict(color='purple', width=2)
-        ))
-        
-        fig3.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="VAN = 0")
-        fig3.add_vline(x=tasa_descuento_pct, line_dash="dash", line_color="blue", annotation_text="Tasa Actual")
-        
-        fig3.update_layout(
-            title="Sensibilidad del VAN a la Tasa de Descuento",
-            xaxis_title="Tasa de Descuento (%)",
-            yaxis_title="VAN ($)"
-        )
-        
-        st.plotly_chart(fig3, use_container_width=True)
+    ejecutar_fragmento(st, panel_sensibilidad, diagnostico, modelo, tasas_test, tasa_descuento_pct, entradas_proyecto)
+    
+    # Simulación Monte Carlo
+    st.markdown("---")
+    st.header("🎲 Simulación de Riesgo (Monte Carlo)")
+    ejecutar_fragmento(st, panel_montecarlo, diagnostico, inversion_inicial, flujos_caja, tasa_periodo, tipo_periodo)
     
     # Información adicional
+    diagnostico.seccion("informacion")
     st.markdown("---")
     st.info("""
     **📚 Información sobre el VAN:**
@@ -349,6 +580,9 @@ def main():
     - **TIR**: Tasa que hace el VAN igual a cero
     - **Período de Recuperación**: Tiempo necesario para recuperar la inversión inicial
     """)
+    
+    mostrar_diagnostico(st, diagnostico)
+    diagnostico.registrar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
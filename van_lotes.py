@@ -0,0 +1,142 @@
+"""
+Cálculo por lotes de VAN, TIR y períodos de recuperación sin interfaz gráfica
+
+Lee un CSV o Parquet de proyectos con las columnas
+
+    inversion, tasa, tipo_periodo, flujo_1, flujo_2, ..., flujo_N
+
+(tasa anual en decimal, tipo_periodo "Anual" o "Mensual", opcional; los flujos
+vacíos de proyectos con horizonte más corto cuentan como 0) y escribe un
+archivo de resultados con una fila por proyecto. Procesa el archivo por
+bloques, así que la memoria no depende del número de filas.
+
+Uso:
+    python van_lotes.py proyectos.csv resultados.parquet --tam-bloque 100000
+"""
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+
+from almacenamiento import abrir_escritor, esquema_entrada, leer_bloques
+from finanzas import (calcular_tir_lote, calcular_van_lote, periodo_recuperacion_lote,
+                      tasa_periodica_lote, TIR_CONVERGIO)
+
+COLUMNA_FLUJO = re.compile(r'^flujo_(\d+)$')
+COLUMNAS_ENTRADA = ('inversion', 'tasa', 'tipo_periodo')
+
+# Tipos de las columnas calculadas, fijos para todos los bloques de la salida
+ESQUEMA_RESULTADOS = {
+    'van': 'float64',
+    'tir': 'float64',
+    'tir_estado': 'int8',
+    'tir_iteraciones': 'int32',
+    'recuperacion': 'float64',
+    'recuperacion_descontada': 'float64'
+}
+
+
+def _columna_real(valores):
+    """Columna numérica; las celdas vacías (texto '') se leen como NaN"""
+    valores = np.asarray(valores)
+    if valores.dtype.kind in 'USO':
+        valores = np.where(valores == '', 'nan', valores)
+    return valores.astype(float)
+
+
+def columnas_flujo(nombres):
+    """Nombres de las columnas flujo_k ordenados por período"""
+    flujos = sorted((int(m.group(1)), nombre) for nombre in nombres if (m := COLUMNA_FLUJO.match(nombre)))
+    if not flujos:
+        raise ValueError("El archivo no tiene columnas flujo_1..flujo_N")
+    return [nombre for _, nombre in flujos]
+
+
+def esquema_salida(entrada, formato_entrada=None):
+    """
+    Esquema de la salida Parquet: columnas copiadas con el tipo de la entrada
+    (texto si viene de un CSV) y las calculadas con ESQUEMA_RESULTADOS
+    """
+    esquema = {nombre: tipo for nombre, tipo in esquema_entrada(entrada, formato_entrada).items()
+               if nombre not in COLUMNAS_ENTRADA and not COLUMNA_FLUJO.match(nombre)}
+    esquema.update(ESQUEMA_RESULTADOS)
+    return esquema
+
+
+def evaluar_bloque(bloque, max_iter=100, precision=1e-9):
+    """
+    Calcula los indicadores de un bloque de proyectos
+
+    Args:
+        bloque (dict): Columnas leídas con almacenamiento.leer_bloques
+
+    Returns:
+        dict: Columnas de resultados (las columnas que no son de entrada, como un
+            identificador, se copian tal cual)
+    """
+    nombres_flujo = columnas_flujo(bloque)
+    flujos = np.nan_to_num(np.column_stack([_columna_real(bloque[c]) for c in nombres_flujo]))
+    inversiones = _columna_real(bloque['inversion'])
+    tipos = bloque.get('tipo_periodo', np.full(len(inversiones), 'Anual'))
+    tasas = tasa_periodica_lote(_columna_real(bloque['tasa']), tipos)
+
+    tir, estado, iteraciones = calcular_tir_lote(inversiones, flujos, max_iter=max_iter, precision=precision)
+    resultados = {c: v for c, v in bloque.items() if c not in COLUMNAS_ENTRADA and c not in nombres_flujo}
+    resultados.update({
+        'van': calcular_van_lote(inversiones, flujos, tasas),
+        'tir': np.where(estado == TIR_CONVERGIO, tir, np.nan),
+        'tir_estado': estado,
+        'tir_iteraciones': iteraciones,
+        'recuperacion': periodo_recuperacion_lote(inversiones, flujos),
+        'recuperacion_descontada': periodo_recuperacion_lote(inversiones, flujos, tasas)
+    })
+    return resultados
+
+
+def procesar_archivo(entrada, salida, tam_bloque=100_000, formato_entrada=None, formato_salida=None,
+                     max_iter=100, precision=1e-9):
+    """
+    Procesa un archivo de proyectos bloque a bloque
+
+    Returns:
+        dict: Filas procesadas, proyectos con VAN negativo y sin TIR
+    """
+    filas = van_negativo = sin_tir = 0
+    with abrir_escritor(salida, formato_salida, esquema_salida(entrada, formato_entrada)) as escritor:
+        for bloque in leer_bloques(entrada, tam_bloque, formato_entrada):
+            resultados = evaluar_bloque(bloque, max_iter, precision)
+            escritor.escribir(resultados)
+            filas += len(resultados['van'])
+            van_negativo += int((resultados['van'] < 0).sum())
+            sin_tir += int((resultados['tir_estado'] != TIR_CONVERGIO).sum())
+    return {'filas': filas, 'van_negativo': van_negativo, 'sin_tir': sin_tir}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VAN, TIR y períodos de recuperación por lotes")
+    parser.add_argument('entrada', help="CSV o Parquet con inversion, tasa, tipo_periodo y flujo_1..flujo_N")
+    parser.add_argument('salida', help="Archivo de resultados (.csv, .parquet o .pq)")
+    parser.add_argument('--tam-bloque', type=int, default=100_000, help="Filas por bloque (por defecto 100000)")
+    parser.add_argument('--formato-entrada', choices=('csv', 'parquet'), help="Forzar el formato de entrada")
+    parser.add_argument('--formato-salida', choices=('csv', 'parquet'), help="Forzar el formato de salida")
+    parser.add_argument('--max-iter', type=int, default=100, help="Iteraciones máximas de la TIR")
+    parser.add_argument('--precision', type=float, default=1e-9, help="Tolerancia de la TIR")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        resumen = procesar_archivo(args.entrada, args.salida, args.tam_bloque, args.formato_entrada,
+                                   args.formato_salida, args.max_iter, args.precision)
+    except (OSError, ValueError, KeyError, ImportError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    print(f"{resumen['filas']:,} proyectos en {time.perf_counter() - inicio:.1f} s -> {args.salida} "
+          f"(VAN negativo: {resumen['van_negativo']:,}, sin TIR: {resumen['sin_tir']:,})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
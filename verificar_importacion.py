@@ -0,0 +1,83 @@
+"""
+Verifica el tiempo de importación de los módulos de cálculo
+
+Importa cada módulo en un proceso nuevo con `python -X importtime` y falla si
+supera el presupuesto o si arrastra dependencias de interfaz (streamlit,
+pandas, plotly), que sólo deben cargarse dentro de main() o al pedir un
+DataFrame.
+
+Uso:
+    python verificar_importacion.py                      # módulos por defecto
+    python verificar_importacion.py finanzas --presupuesto-ms 200
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULOS = ('finanzas', 'estadisticas', 'montecarlo', 'simulador', 'almacenamiento',
+           'procesamiento', 'paralelo', 'graficos', 'van_lotes', 'van', 'proyectos')
+PROHIBIDOS = ('streamlit', 'pandas', 'plotly')
+
+
+def medir_importacion(modulo):
+    """
+    Importa `modulo` en un intérprete nuevo
+
+    Returns:
+        dict: tiempo acumulado en ms, paquetes de primer nivel importados y los
+            módulos más lentos (ms propios)
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if resultado.returncode != 0:
+        raise ImportError(f"No se pudo importar {modulo}:\n{resultado.stderr.strip().splitlines()[-1]}")
+
+    tiempos = {}
+    for linea in resultado.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        tiempos[nombre.strip()] = (int(propio) / 1000, int(acumulado) / 1000)
+
+    return {
+        'modulo': modulo,
+        'ms': tiempos.get(modulo, (0.0, 0.0))[1],
+        'paquetes': {nombre.split('.')[0] for nombre in tiempos},
+        'mas_lentos': sorted(((ms, nombre) for nombre, (ms, _) in tiempos.items()), reverse=True)[:5]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de importación")
+    parser.add_argument('modulos', nargs='*', default=MODULOS, help="Módulos a verificar")
+    parser.add_argument('--presupuesto-ms', type=float, default=400.0,
+                        help="Tiempo máximo de importación por módulo (por defecto 400 ms)")
+    args = parser.parse_args(argv)
+
+    fallos = 0
+    for modulo in args.modulos:
+        try:
+            medicion = medir_importacion(modulo)
+        except ImportError as error:
+            print(f"ERROR {error}")
+            fallos += 1
+            continue
+
+        prohibidos = sorted(medicion['paquetes'] & set(PROHIBIDOS))
+        correcto = medicion['ms'] <= args.presupuesto_ms and not prohibidos
+        fallos += not correcto
+        print(f"{'OK   ' if correcto else 'FALLA'} {modulo:<16} {medicion['ms']:8.1f} ms"
+              + (f"  importa {', '.join(prohibidos)}" if prohibidos else ""))
+        if not correcto:
+            for ms, nombre in medicion['mas_lentos']:
+                print(f"        {ms:8.1f} ms  {nombre}")
+
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())